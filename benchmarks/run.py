@@ -0,0 +1,177 @@
+"""Benchmarks da API de previsão (rodar da raiz do repositório).
+
+    python benchmarks/run.py micro -o bench/base.json
+    python benchmarks/run.py load --concurrency 16 --duration 10 -o bench/base.json
+    python benchmarks/run.py replay benchmarks/cenario.ndjson -o bench/base.json
+    python benchmarks/run.py compare bench/base.json bench/novo.json
+
+Cada comando acrescenta sua seção ao JSON de saída (``micro`` ou ``load``),
+então uma rodada completa pode ser montada em passos. ``compare`` sai com
+código 1 se alguma métrica piorou além da tolerância.
+"""
+import json
+import os
+import random
+import sys
+import warnings
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import typer
+from rich.console import Console
+from rich.table import Table
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+from mlops_deploy import bench  # noqa: E402
+from mlops_deploy.features import CAMPOS, COLUNAS  # noqa: E402
+
+DATA_PATH = os.path.join(RAIZ, "data", "processed", "data_set.csv")
+
+app = typer.Typer()
+console = Console()
+
+
+def carregar_app():
+    # Silencia o aviso de versão do sklearn ao importar/carregar o modelo
+    warnings.simplefilter("ignore")
+    import main
+
+    return main
+
+
+def payloads(seed: int = 0):
+    """Payloads ``Dados`` a partir das linhas reais do data_set, em ordem aleatória fixa."""
+    import pandas as pd
+
+    df = pd.read_csv(DATA_PATH, usecols=list(COLUNAS))[list(COLUNAS)]
+    registros = [dict(zip(CAMPOS, linha)) for linha in df.itertuples(index=False, name=None)]
+    random.Random(seed).shuffle(registros)
+    return registros
+
+
+def salvar(saida: Optional[Path], secao: str, resultados: dict) -> None:
+    if saida is None:
+        console.print_json(data=resultados)
+        return
+    dados = json.loads(saida.read_text()) if saida.exists() else {}
+    dados["meta"] = bench.metadados()
+    dados.setdefault(secao, {}).update(resultados)
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(dados, indent=2, ensure_ascii=False))
+    console.print(f"Resultados em {saida}")
+
+
+def tabela(titulo: str, resultados: dict) -> None:
+    t = Table(title=titulo)
+    colunas = sorted({k for r in resultados.values() for k in r if not isinstance(r[k], dict)})
+    t.add_column("nome")
+    for c in colunas:
+        t.add_column(c, justify="right")
+    for nome, r in resultados.items():
+        t.add_row(nome, *[str(r.get(c, "")) for c in colunas])
+    console.print(t)
+
+
+@app.command()
+def micro(saida: Optional[Path] = typer.Option(None, "-o", "--output")):
+    """Micro-benchmarks: prever(), codificação de município e predict por tamanho de lote."""
+    main = carregar_app()
+    main.load_model()
+    main.registry.parar_watcher()
+    modelo = main.registry.atual
+    registros = payloads()
+    linhas = [[r[c] for c in CAMPOS] for r in registros]
+    for linha in linhas:
+        linha[1] = main.encoder.encode(linha[1])
+    X = np.array(linhas, dtype=np.float64)
+    X1k = X[np.arange(1000) % len(X)]
+    args = list(registros[0].values())
+
+    resultados = {
+        "encode_one": bench.micro(lambda: main.encoder.encode("Afogados da Ingazeira")),
+        "encode_many_100": bench.micro(lambda: main.encoder.encode_many([r["municipio"] for r in registros[:100]])),
+        "prever_cache_hit": bench.micro(lambda: main.prever(*args)),
+    }
+    # prever sem cache: troca o cache global por um desligado durante a medida
+    cache = main.cache_previsoes
+    main.cache_previsoes = main.LRUCache(maxsize=0)
+    try:
+        resultados["prever_no_cache"] = bench.micro(lambda: main.prever(*args))
+    finally:
+        main.cache_previsoes = cache
+    resultados["predict_one"] = bench.micro(lambda: modelo.predict_one(linhas[0]))
+    for n in (1, 10, 100, 1000):
+        resultados[f"predict_batch_{n}"] = bench.micro(lambda n=n: modelo.predict(X1k[:n]))
+        resultados[f"predict_sklearn_{n}"] = bench.micro(lambda n=n: modelo.predict_sklearn(X1k[:n]))
+    tabela("micro (µs por chamada)", resultados)
+    salvar(saida, "micro", resultados)
+
+
+@app.command()
+def load(
+    concurrency: int = typer.Option(8, "--concurrency", "-c", min=1),
+    duration: float = typer.Option(5.0, "--duration", "-d", help="Segundos de carga"),
+    endpoint: str = typer.Option("/previsao-total-crimes/", "--endpoint"),
+    nome: str = typer.Option("post_single", "--name", help="Nome da seção no JSON"),
+    saida: Optional[Path] = typer.Option(None, "-o", "--output"),
+):
+    """Carga em processo (ASGI) com POSTs das linhas reais do data_set, em ciclo."""
+    main = carregar_app()
+    registros = payloads()
+
+    def requisicoes():
+        i = 0
+        while True:
+            yield {"method": "POST", "path": endpoint, "json": registros[i % len(registros)]}
+            i += 1
+
+    resultado = bench.carga(main.app, requisicoes(), concorrencia=concurrency, duracao=duration)
+    tabela("carga", {nome: resultado})
+    salvar(saida, "load", {nome: resultado})
+
+
+@app.command()
+def replay(
+    cenario: Path = typer.Argument(..., exists=True, dir_okay=False, help="NDJSON com uma requisição por linha"),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", min=1),
+    nome: Optional[str] = typer.Option(None, "--name", help="Nome da seção (padrão: nome do arquivo)"),
+    saida: Optional[Path] = typer.Option(None, "-o", "--output"),
+):
+    """Reproduz um cenário de requisições, na ordem do arquivo."""
+    main = carregar_app()
+    requisicoes = bench.ler_cenario(str(cenario))
+    if not requisicoes:
+        raise typer.BadParameter(f"Nenhuma requisição com 'path' em {cenario}")
+    resultado = bench.carga(main.app, requisicoes, concorrencia=concurrency)
+    nome = nome or f"replay_{cenario.stem}"
+    tabela("replay", {nome: resultado})
+    salvar(saida, "load", {nome: resultado})
+
+
+@app.command()
+def compare(
+    base: Path = typer.Argument(..., exists=True, dir_okay=False),
+    atual: Path = typer.Argument(..., exists=True, dir_okay=False),
+    tolerancia: float = typer.Option(0.10, "--tolerance", help="Piora relativa aceita (0.10 = 10%)"),
+):
+    """Compara duas execuções e marca regressões."""
+    linhas = bench.comparar(json.loads(base.read_text()), json.loads(atual.read_text()), tolerancia)
+    t = Table(title=f"{base.name} -> {atual.name}")
+    for c in ("métrica", "base", "atual", "variação"):
+        t.add_column(c, justify="left" if c == "métrica" else "right")
+    for linha in linhas:
+        cor = "red" if linha["regression"] else ""
+        t.add_row(linha["metric"], str(linha["base"]), str(linha["current"]), f"{linha['change']:+.1%}", style=cor)
+    console.print(t)
+    regressoes = [linha for linha in linhas if linha["regression"]]
+    if regressoes:
+        console.print(f"[red]{len(regressoes)} regressão(ões) acima de {tolerancia:.0%}[/red]")
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,14 +1,46 @@
-cat > main.py <<'PY'
-from fastapi import FastAPI, HTTPException
+import time
+INICIO_IMPORT = time.perf_counter()  # relatório de cold start (ver load_model)
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
-from typing import Optional
-import pandas as pd
-import joblib
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Dict, List, Literal, Optional
+import numpy as np
+import hmac
+import json
+import math
 import os
+import random
+import sys
 import logging
-from urllib.parse import urlencode
+
+# O pacote mlops_deploy fica em src/ (layout do cookiecutter)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from mlops_deploy.batching import MicroBatcher  # noqa: E402
+from mlops_deploy.cache import LRUCache  # noqa: E402
+from mlops_deploy.metrics import Metricas  # noqa: E402
+from mlops_deploy.municipios import MunicipioInvalido, encoder, normalizar  # noqa: E402
+from mlops_deploy.registry import ModelRegistry  # noqa: E402
+from mlops_deploy import ui  # noqa: E402
+from mlops_deploy.features import CAMPOS, COLUNAS, IDX_MUNICIPIO  # noqa: E402
+from mlops_deploy import formatos  # noqa: E402
+from mlops_deploy.explicacao import Explicador  # noqa: E402
+from mlops_deploy.singleflight import SingleFlight  # noqa: E402
+from mlops_deploy.admissao import BAIXA, NORMAL, Admissao, Sobrecarga  # noqa: E402
+from mlops_deploy.ranking import MatrizPrevisoes  # noqa: E402
+from mlops_deploy.store import carregar_store  # noqa: E402
+from mlops_deploy.drift import MonitorDrift, Referencia  # noqa: E402
+from mlops_deploy.auditoria import Auditoria  # noqa: E402
+from mlops_deploy.sombra import CANDIDATO, PRINCIPAL, Sombra  # noqa: E402
+from mlops_deploy import sweep  # noqa: E402
+from mlops_deploy import horizonte  # noqa: E402
+
+# pandas, joblib e sklearn não entram aqui: com o artefato compacto (models/model.npz)
+# o servidor sobe e responde sem eles
+DURACAO_IMPORT = time.perf_counter() - INICIO_IMPORT
 
 # -----------------------------------------------------------------------------
 # Configuração de logs e caminho do modelo
@@ -16,6 +48,59 @@ from urllib.parse import urlencode
 logging.basicConfig(level=logging.INFO)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(BASE_DIR, "models", "model.pkl"))
+# Origem opcional do artefato (gs://..., file://... ou diretório local), baixada para
+# MODEL_DOWNLOAD_PATH (gravável e compartilhado pelos workers); se falhar, serve MODEL_PATH
+MODEL_GCS_URI = os.getenv("MODEL_GCS_URI")
+MODEL_DOWNLOAD_PATH = os.getenv("MODEL_DOWNLOAD_PATH")
+# Hot reload: cada worker checa o artefato a cada N segundos (0 desliga). É assim que
+# uma recarga feita via /admin/reload-model num worker chega aos outros (-w 2).
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "30"))
+# Arrays do artefato compacto mapeados do arquivo: os workers dividem as mesmas páginas
+MODEL_MMAP = os.getenv("MODEL_MMAP", "1").lower() in ("1", "true", "yes")
+# Carrega o modelo no import (no master, com gunicorn --preload) em vez de no startup de cada worker
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "0").lower() in ("1", "true", "yes")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Cache de previsões: 0 desliga; TTL em segundos (0 = sem expiração)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "0"))
+# Modo assíncrono com micro-batching do POST (opt-in)
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "0").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_ROWS = int(os.getenv("MICROBATCH_MAX_ROWS", "64"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+# Requisições idênticas simultâneas (POST e UI) compartilham um só cálculo
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "1").lower() in ("1", "true", "yes")
+# Controle de admissão por worker: cálculos em voo (0 desliga), fila e espera máxima na fila
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "16"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "32"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "500"))
+# Vagas que lote, stream, varredura e UI não ocupam (ficam para a previsão unitária)
+ADMISSION_RESERVED_NORMAL = int(os.getenv("ADMISSION_RESERVED_NORMAL", "4"))
+ADMISSION_RETRY_AFTER = float(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+# Features por (município, ano) para GET /previsao-total-crimes/{municipio}/{ano}
+FEATURE_STORE_PATH = os.getenv("FEATURE_STORE_PATH", os.path.join(BASE_DIR, "data", "processed", "data_set.csv"))
+# Pontos máximos de uma varredura "e se" (produto dos passos dos eixos)
+SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "10000"))
+# Anos à frente permitidos na projeção por município
+HORIZON_MAX_YEARS = int(os.getenv("HORIZON_MAX_YEARS", "10"))
+# Monitor de drift das entradas contra o data_set (faixas por quantis; mínimo de linhas para classificar)
+DRIFT_ENABLED = os.getenv("DRIFT_ENABLED", "1").lower() in ("1", "true", "yes")
+DRIFT_BINS = int(os.getenv("DRIFT_BINS", "10"))
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "100"))
+# Log de auditoria (SQLite em WAL, gravado em lote por uma thread); sem caminho, desligado.
+# Buffer em linhas; cheio, "descartar" recusa na hora e "bloquear" espera até AUDIT_BLOCK_TIMEOUT s
+AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH")
+AUDIT_BUFFER_ROWS = int(os.getenv("AUDIT_BUFFER_ROWS", "100000"))
+AUDIT_FLUSH_ROWS = int(os.getenv("AUDIT_FLUSH_ROWS", "1000"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))
+AUDIT_POLICY = os.getenv("AUDIT_POLICY", "descartar")
+AUDIT_BLOCK_TIMEOUT = float(os.getenv("AUDIT_BLOCK_TIMEOUT", "1"))
+# Modelo candidato: pontuado em sombra (fora da requisição, sobre a mesma matriz) e comparado
+# com o principal; CANARY_PERCENT% das requisições são servidas por ele (0 = só sombra)
+CANDIDATE_MODEL_PATH = os.getenv("CANDIDATE_MODEL_PATH")
+CANARY_PERCENT = float(os.getenv("CANARY_PERCENT", "0"))
+# Fração das previsões servidas comparadas com o outro modelo e tamanho da fila da sombra
+SHADOW_SAMPLE_PERCENT = float(os.getenv("SHADOW_SAMPLE_PERCENT", "100"))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "1000"))
 
 app = FastAPI(title="API de Previsão de Crimes")
 
@@ -27,6 +112,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# -----------------------------------------------------------------------------
+# Métricas (Prometheus em /metrics; cada worker exporta as suas)
+# -----------------------------------------------------------------------------
+metricas = Metricas()
+metricas.descrever("http_requests_total", "counter", "Requisições por endpoint, método, status e versão do modelo")
+metricas.descrever("http_request_duration_seconds", "histogram", "Latência total da requisição por endpoint")
+metricas.descrever("prediction_stage_duration_seconds", "histogram", "Latência por estágio da previsão")
+
+
+class MetricasMiddleware:
+    """Mede cada requisição HTTP (ASGI puro: não bufferiza respostas em streaming)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+        status = 500
+
+        async def enviar(msg):
+            nonlocal status
+            if msg["type"] == "http.response.start":
+                status = msg["status"]
+            await send(msg)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            # Rota (template do path) em vez da URL: cardinalidade fixa
+            rota = scope.get("route")
+            endpoint = getattr(rota, "path", "other")
+            modelo = registry.atual
+            metricas.incrementar(
+                "http_requests_total",
+                endpoint=endpoint, method=scope["method"], status=status,
+                model_version=modelo.versao if modelo is not None else "none",
+            )
+            metricas.observar("http_request_duration_seconds", time.perf_counter() - inicio, endpoint=endpoint)
+
+
+def estagio(nome: str):
+    return metricas.span("prediction_stage_duration_seconds", stage=nome)
+
+
+app.add_middleware(MetricasMiddleware)
+
 # -----------------------------------------------------------------------------
 # Entrada (POST)
 # -----------------------------------------------------------------------------
@@ -44,59 +178,370 @@ class Dados(BaseModel):
     ensino_medio_escolas: float
     ensino_medio_matriculas: float
 
-# -----------------------------------------------------------------------------
-# Label encoding dos municípios
-# -----------------------------------------------------------------------------
-municipios = [
-    'abreu e lima', 'afogados da ingazeira', 'agrestina', 'altinho',
-    'amaraji', 'angelim', 'araripina', 'arcoverde', 'barra de guabiraba',
-    'barreiros', 'belo jardim', 'bezerros', 'bom conselho', 'bom jardim',
-    'bonito', 'brejo da madre de deus', 'buenos aires',
-    'cabo de santo agostinho', 'cachoeirinha', 'camaragibe', 'camutanga',
-    'canhotinho', 'capoeiras', 'carpina', 'caruaru', 'casinhas', 'catende',
-    'cedro', 'condado', 'correntes', 'cumaru', 'cupira', 'dormentes', 'escada',
-    'exu', 'feira nova', 'ferreiros', 'flores', 'floresta', 'frei miguelinho',
-    'gameleira', 'garanhuns', 'goiana', 'granito', 'iati', 'ibimirim',
-    'ibirajuba', 'igarassu', 'ipojuca', 'ipubi', 'itacuruba', 'itapissuma',
-    'itaquitinga', 'jaqueira', 'joaquim nabuco', 'jucati', 'jupi', 'jurema',
-    'lagoa do carro', 'lagoa do ouro', 'lagoa dos gatos', 'lagoa grande',
-    'lajedo', 'limoeiro', 'macaparana', 'machados', 'maraial', 'mirandiba',
-    'moreno', 'olinda', 'ouricuri', 'palmares', 'palmeirina', 'panelas',
-    'paranatama', 'parnamirim', 'passira', 'paudalho', 'paulista', 'pedra',
-    'pesqueira', 'petrolina', 'pombos', 'primavera', 'recife',
-    'riacho das almas', 'rio formoso', 'salgueiro', 'santa cruz',
-    'santa cruz da baixa verde', 'santa cruz do capibaribe',
-    'santa filomena', 'santa maria da boa vista', 'serra talhada', 'serrita',
-    'surubim', 'tabira', 'tacaratu', 'taquaritinga do norte', 'terezinha',
-    'terra nova', 'toritama', 'trindade', 'triunfo', 'tupanatinga',
-    'venturosa', 'verdejante', 'brejinho', 'carnaubeira da penha',
-    'itapetim', 'manari', 'quixaba', 'santa terezinha', 'tuparetama',
-    'ingazeira', 'salgadinho'
-]
+
+# Campos que podem ser varridos (todos os numéricos)
+CampoNumerico = Literal[tuple(c for c in CAMPOS if c != "municipio")]
+
+
+class EixoVarredura(BaseModel):
+    campo: CampoNumerico
+    inicio: float
+    fim: float
+    passos: int = Field(ge=2)
+
+
+class Varredura(BaseModel):
+    base: Dados
+    eixos: List[EixoVarredura] = Field(min_length=1, max_length=2)
+
+
+CampoExtrapolado = Literal[tuple(c for c in CAMPOS if c not in ("ano", "municipio"))]
+
+
+class Projecao(BaseModel):
+    municipios: List[str] = Field(min_length=1, max_length=len(encoder))
+    anos: int = Field(5, ge=1, le=HORIZON_MAX_YEARS)
+    politica: Literal["ultimo", "tendencia", "taxas"] = "tendencia"
+    # Só com politica="taxas": variação por ano, nas unidades (padronizadas) dos campos da API
+    taxas: Dict[CampoExtrapolado, float] = {}
 
 # -----------------------------------------------------------------------------
 # Carregamento do modelo NO STARTUP (sem derrubar o app se falhar)
 # -----------------------------------------------------------------------------
-model = None
+registry = ModelRegistry(MODEL_PATH, source_uri=MODEL_GCS_URI, download_path=MODEL_DOWNLOAD_PATH, mmap=MODEL_MMAP)
+# Candidato com registry próprio (mesmo watcher/hot reload), sem os ganchos de troca do principal
+candidato = ModelRegistry(CANDIDATE_MODEL_PATH, mmap=MODEL_MMAP) if CANDIDATE_MODEL_PATH else None
+cache_previsoes = LRUCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+# Entradas do modelo antigo nunca batem (a chave tem o hash), mas liberam memória
+registry.ao_trocar(lambda _: cache_previsoes.clear())
+metricas.gauge(
+    "model_info", "Versão do modelo em uso (valor 1)",
+    lambda: {(("version", registry.atual.versao),): 1.0} if registry.atual is not None else {},
+)
+metricas.gauge(
+    "prediction_cache", "Estado do cache de previsões",
+    lambda: {(("stat", k),): float(v) for k, v in cache_previsoes.stats().items() if k in ("size", "hits", "misses", "evictions")},
+)
+
+# Um single-flight por endpoint; sem cache: só junta o que está em voo ao mesmo tempo
+singleflight = {"post": SingleFlight(), "ui": SingleFlight()} if SINGLEFLIGHT_ENABLED else {}
+metricas.gauge(
+    "singleflight_requests", "Requisições por papel no single-flight (leader calcula, follower reaproveita)",
+    lambda: {
+        (("endpoint", e), ("role", papel)): float(n)
+        for e, sf in singleflight.items() for papel, n in (("leader", sf.lideres), ("follower", sf.seguidores))
+    },
+)
+metricas.gauge(
+    "singleflight_coalescing_ratio", "Fração das requisições atendidas por um cálculo já em voo",
+    lambda: {(("endpoint", e),): sf.taxa for e, sf in singleflight.items()},
+)
+
+
+async def coalescer(endpoint: str, chave, calcular):
+    """``await calcular()``, compartilhado com requisições simultâneas de mesma chave."""
+    sf = singleflight.get(endpoint)
+    if sf is None:
+        return await calcular()
+    return await sf.executar(chave, calcular)
+
+# Limite de cálculos em voo neste worker; o excesso espera pouco ou recebe 503.
+# Healthcheck, métricas, ranking, explicação e respostas já em cache não passam por aqui.
+admissao = Admissao(
+    ADMISSION_MAX_IN_FLIGHT,
+    max_fila=ADMISSION_QUEUE_SIZE,
+    prazo=ADMISSION_QUEUE_TIMEOUT_MS / 1000,
+    reserva=ADMISSION_RESERVED_NORMAL,
+    retry_after=ADMISSION_RETRY_AFTER,
+) if ADMISSION_MAX_IN_FLIGHT > 0 else None
+metricas.descrever("admission_shed_total", "counter", "Requisições recusadas (503) pela admissão, por prioridade e motivo")
+metricas.gauge(
+    "admission_in_flight", "Cálculos admitidos em andamento neste worker",
+    lambda: {(): float(admissao.em_voo)} if admissao is not None else {},
+)
+metricas.gauge(
+    "admission_queue_depth", "Requisições esperando vaga, por prioridade",
+    lambda: {(("priority", p),): float(n) for p, n in admissao.stats()["queue_depth"].items()} if admissao is not None else {},
+)
+
+
+async def admitido(prioridade: str, calcular):
+    """``await calcular()`` dentro de uma vaga da admissão (levanta Sobrecarga se não houver)."""
+    if admissao is None:
+        return await calcular()
+    async with admissao.vaga(prioridade):
+        return await calcular()
+
+
+@app.exception_handler(Sobrecarga)
+async def recusar_sobrecarga(request: Request, e: Sobrecarga):
+    metricas.incrementar("admission_shed_total", priority=e.prioridade, reason=e.motivo)
+    return JSONResponse(
+        status_code=503, content={"detail": str(e)}, headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+# Dados do data_set.csv em memória (colunar, float32); None se o arquivo não existir
+feature_store = carregar_store(FEATURE_STORE_PATH)
+# Previsões de todo (município, ano) do store, refeitas a cada troca de modelo
+matriz_previsoes = None
+
+
+def reconstruir_matriz(modelo):
+    global matriz_previsoes
+    if feature_store is not None:
+        matriz_previsoes = MatrizPrevisoes(feature_store, modelo)
+
+
+registry.ao_trocar(reconstruir_matriz)
+
+# Último valor e tendência de cada feature por município, para as projeções
+tendencias = horizonte.Tendencias(feature_store) if feature_store is not None else None
+
+# Distribuição das entradas previstas contra a do data_set (referência calculada uma vez)
+monitor_drift = (
+    MonitorDrift(Referencia.do_store(feature_store, DRIFT_BINS), min_linhas=DRIFT_MIN_ROWS)
+    if DRIFT_ENABLED and feature_store is not None else None
+)
+metricas.gauge(
+    "drift_observed_rows", "Linhas de entrada observadas pelo monitor de drift neste worker",
+    lambda: {(): float(monitor_drift.linhas)} if monitor_drift is not None else {},
+)
+metricas.gauge(
+    "drift_psi", "PSI de cada feature de entrada contra o data_set de treino",
+    lambda: {
+        (("feature", campo),): f["psi"]
+        for campo, f in monitor_drift.status()["features"].items() if f["psi"] is not None
+    } if monitor_drift is not None else {},
+)
+
+
+def monitorar_linha(linha):
+    if monitor_drift is not None:
+        monitor_drift.observar(linha)
+
+
+def monitorar_lote(X):
+    if monitor_drift is not None:
+        with estagio("drift"):
+            monitor_drift.observar_lote(X)
+
+# Registro de toda previsão servida; a gravação em disco fica numa thread
+auditoria = Auditoria(
+    AUDIT_LOG_PATH,
+    capacidade=AUDIT_BUFFER_ROWS,
+    lote=AUDIT_FLUSH_ROWS,
+    intervalo=AUDIT_FLUSH_INTERVAL,
+    politica=AUDIT_POLICY,
+    espera=AUDIT_BLOCK_TIMEOUT,
+) if AUDIT_LOG_PATH else None
+metricas.gauge(
+    "audit_rows", "Linhas do log de auditoria por estado (received, written, dropped, pending)",
+    lambda: {
+        (("state", k),): float(v) for k, v in auditoria.stats().items()
+        if k in ("received", "written", "dropped", "pending")
+    } if auditoria is not None else {},
+)
+
+
+def auditar(endpoint: str, modelo, linha, y):
+    if auditoria is not None:
+        auditoria.registrar(endpoint, modelo.versao, linha, y)
+
+
+def auditar_lote(endpoint: str, modelo, X, y):
+    if auditoria is not None:
+        auditoria.registrar_lote(endpoint, modelo.versao, X, y)
+
+# Comparação candidato x principal numa thread; a requisição só enfileira
+sombra = Sombra(SHADOW_QUEUE_SIZE) if candidato is not None else None
+metricas.descrever("canary_requests_total", "counter", "Requisições roteadas para cada modelo com o candidato ativo")
+metricas.gauge(
+    "shadow_rows", "Linhas da sombra por estado (compared, dropped, pending)",
+    lambda: {
+        (("state", estado),): float(sombra.stats()[k])
+        for estado, k in (("compared", "rows"), ("dropped", "dropped"), ("pending", "pending"))
+    } if sombra is not None else {},
+)
+metricas.gauge(
+    "shadow_delta", "Diferença candidato - principal sobre as mesmas linhas",
+    lambda: {
+        (("stat", k),): float(v) for k, v in sombra.comparador.stats().items()
+        if k in ("mean_delta", "mean_abs_delta", "rmse_delta", "max_abs_delta", "disagreement_rate") and v is not None
+    } if sombra is not None else {},
+)
+
+
+def rotear():
+    """Modelo que atende a requisição: o candidato em CANARY_PERCENT% delas, senão o principal."""
+    principal = modelo_atual()
+    cand = candidato.atual if candidato is not None else None
+    if cand is None:
+        return principal
+    if CANARY_PERCENT > 0 and random.random() * 100 < CANARY_PERCENT:
+        metricas.incrementar("canary_requests_total", model=CANDIDATO)
+        return cand
+    metricas.incrementar("canary_requests_total", model=PRINCIPAL)
+    return principal
+
+
+def sombrear(endpoint: str, modelo, X, y):
+    """Agenda o outro modelo sobre a mesma matriz ``X`` (a resposta não espera)."""
+    if sombra is None:
+        return
+    cand, principal = candidato.atual, registry.atual
+    if cand is None or principal is None or cand.sha256 == principal.sha256:
+        return
+    if SHADOW_SAMPLE_PERCENT < 100 and random.random() * 100 >= SHADOW_SAMPLE_PERCENT:
+        return
+    if modelo.sha256 == cand.sha256:
+        sombra.enviar(endpoint, CANDIDATO, principal, X, y)
+    else:
+        sombra.enviar(endpoint, PRINCIPAL, cand, X, y)
+
+# Caminhos e contribuições por folha do modelo em uso (cache preenchido sob demanda)
+explicador = None
+
+
+def reconstruir_explicador(modelo):
+    global explicador
+    explicador = Explicador(modelo.arvore, modelo.versao) if modelo.arvore is not None else None
+
+
+registry.ao_trocar(reconstruir_explicador)
+
+# Tempos de cold start deste worker (também no healthcheck)
+startup = {"import_seconds": round(DURACAO_IMPORT, 4)}
+
+
+def carregar_modelo_inicial():
+    # Falha na carga fica registrada em registry.info() sem derrubar o servidor
+    inicio = time.perf_counter()
+    registry.recarregar(forcar=True, baixar=True)
+    startup["load_seconds"] = round(time.perf_counter() - inicio, 4)
+    modelo = registry.atual
+    if modelo is not None:
+        t = time.perf_counter()
+        modelo.predict_one([0.0] * len(COLUNAS))
+        startup["first_predict_seconds"] = round(time.perf_counter() - t, 6)
+        startup["artifact"] = modelo.formato
+    startup["sklearn_imported"] = "sklearn" in sys.modules
+    logging.info(
+        "Startup: import %.3fs, carga do modelo %.3fs, primeiro predict %s s (artefato %s, sklearn importado: %s)",
+        startup["import_seconds"], startup["load_seconds"], startup.get("first_predict_seconds"),
+        startup.get("artifact"), startup["sklearn_imported"],
+    )
+
+
+# Pré-carga antes do fork: os workers herdam o modelo (e o mapeamento do .npz)
+# sem carregar de novo. Nenhuma thread é criada aqui; o watcher sobe em cada worker.
+if MODEL_PRELOAD:
+    carregar_modelo_inicial()
+    startup["preloaded"] = True
 
 @app.on_event("startup")
 def load_model():
-    global model
-    try:
-        model = joblib.load(MODEL_PATH)
-        logging.info("Modelo carregado com sucesso de %s (exists=%s)", MODEL_PATH, os.path.exists(MODEL_PATH))
-    except Exception as e:
-        logging.exception("Falha ao carregar modelo de %s: %s", MODEL_PATH, e)
-        model = None  # não derruba o servidor
+    if not (MODEL_PRELOAD and registry.atual is not None):
+        carregar_modelo_inicial()
+    # Depois do fork cada worker vigia o artefato e remapeia ao recarregar
+    registry.iniciar_watcher(MODEL_RELOAD_INTERVAL)
+
+@app.on_event("shutdown")
+def stop_model_watcher():
+    registry.parar_watcher()
+
+@app.on_event("startup")
+def iniciar_auditoria():
+    if auditoria is not None:
+        auditoria.iniciar()
+
+@app.on_event("startup")
+def carregar_candidato():
+    if candidato is None:
+        return
+    candidato.recarregar(forcar=True)
+    candidato.iniciar_watcher(MODEL_RELOAD_INTERVAL)
+    sombra.iniciar()
+
+@app.on_event("shutdown")
+def parar_candidato():
+    if candidato is None:
+        return
+    candidato.parar_watcher()
+    sombra.parar()
+
+@app.on_event("shutdown")
+def parar_auditoria():
+    # Grava o que ainda está no buffer antes do worker sair
+    if auditoria is not None:
+        auditoria.parar()
+
+
+def modelo_atual():
+    # Cada requisição pega a referência uma vez; uma troca no meio não a afeta
+    modelo = registry.atual
+    if modelo is None:
+        raise HTTPException(status_code=500, detail="Modelo não carregado no servidor.")
+    return modelo
 
 # Healthcheck para ver rapidamente se o modelo está carregado
 @app.get("/", tags=["health"])
 def health():
-    return {"status": "ok", "model_loaded": model is not None, "model_path": MODEL_PATH}
+    return {
+        "status": "ok",
+        "model_loaded": registry.atual is not None,
+        "model_path": MODEL_PATH,
+        "model": registry.info(),
+        "cache": cache_previsoes.stats(),
+        "microbatch": microbatcher.stats() if microbatcher is not None else None,
+        "startup": startup,
+        "feature_store": feature_store.stats() if feature_store is not None else None,
+        "prediction_matrix": matriz_previsoes.info() if matriz_previsoes is not None else None,
+        "singleflight": {e: sf.stats() for e, sf in singleflight.items()},
+        "audit": auditoria.stats() if auditoria is not None else None,
+        "candidate": {
+            "model": candidato.info(),
+            "canary_percent": CANARY_PERCENT,
+            "shadow_sample_percent": SHADOW_SAMPLE_PERCENT,
+            "shadow": sombra.stats(),
+        } if candidato is not None else None,
+        "admission": admissao.stats() if admissao is not None else None,
+    }
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(metricas.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/drift", tags=["health"], summary="Drift das entradas deste worker contra o data_set de treino (PSI/KS)")
+def drift():
+    if monitor_drift is None:
+        raise HTTPException(status_code=503, detail="Monitor de drift desligado ou sem feature store.")
+    return monitor_drift.status()
 
 # -----------------------------------------------------------------------------
 # Função comum de previsão
 # -----------------------------------------------------------------------------
+MAX_BATCH = int(os.getenv("MAX_BATCH", "10000"))
+# Linhas pontuadas por vez no endpoint NDJSON: memória constante, qualquer tamanho de arquivo
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "1000"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", "65536"))
+
+
+def codificar_municipio(municipio: str) -> int:
+    try:
+        return encoder.encode(municipio)
+    except MunicipioInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def linha_dados(d: Dados, municipio_cod: float) -> list:
+    return [
+        d.ano, municipio_cod, d.ideb,
+        d.ensino_fundamental_docentes, d.ensino_fundamental_escolas, d.ensino_fundamental_matriculas,
+        d.ensino_infantil_docentes, d.ensino_infantil_escolas, d.ensino_infantil_matriculas,
+        d.ensino_medio_docentes, d.ensino_medio_escolas, d.ensino_medio_matriculas,
+    ]
+
+
 def prever(
     ano: float,
     municipio: str,
@@ -104,51 +549,750 @@ def prever(
     ef_doc: float, ef_esc: float, ef_mat: float,
     ei_doc: float, ei_esc: float, ei_mat: float,
     em_doc: float, em_esc: float, em_mat: float,
+    modelo=None,
 ):
-    if model is None:
-        raise HTTPException(status_code=500, detail="Modelo não carregado no servidor.")
+    modelo = modelo if modelo is not None else modelo_atual()
+    with estagio("municipio"):
+        municipio_cod = codificar_municipio(municipio)
+    with estagio("matriz"):
+        linha = [
+            ano, municipio_cod, ideb,
+            ef_doc, ef_esc, ef_mat,
+            ei_doc, ei_esc, ei_mat,
+            em_doc, em_esc, em_mat,
+        ]
+    return prever_linha(modelo, linha)
 
-    m = municipio.strip().lower()
-    if m not in municipios:
-        raise HTTPException(status_code=400, detail=f"Município '{municipio}' inválido")
-
-    municipio_cod = municipios.index(m)
-    df = pd.DataFrame({
-        'Ano': [ano],
-        'Municipio': [municipio_cod],
-        'IDEB': [ideb],
-        'Ensino fundamental_docentes': [ef_doc],
-        'Ensino fundamental_escolas': [ef_esc],
-        'Ensino fundamental_matrículas': [ef_mat],
-        'Ensino infantil_docentes': [ei_doc],
-        'Ensino infantil_escolas': [ei_esc],
-        'Ensino infantil_matrículas': [ei_mat],
-        'Ensino médio_docentes': [em_doc],
-        'Ensino médio_escolas': [em_esc],
-        'Ensino médio_matrículas': [em_mat],
-    })
+
+def prever_linha(modelo, linha: list):
+    """Previsão (com cache) de uma linha já codificada, na ordem de COLUNAS."""
+    with estagio("cache"):
+        chave = chave_cache(modelo, linha)
+        y = cache_previsoes.get(chave)
+    if y is not None:
+        return {"TotalCrimesPrevisto": y}
 
     try:
-        y = model.predict(df)
-        return {"TotalCrimesPrevisto": round(float(y[0]), 2)}
+        with estagio("predict"):
+            y = round(float(modelo.predict_one(linha)), 2)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao prever: {e}")
+    cache_previsoes.put(chave, y)
+    return {"TotalCrimesPrevisto": y}
+
+
+def chave_cache(modelo, linha: list) -> tuple:
+    # A chave inclui o hash do modelo: trocar o modelo invalida as entradas antigas
+    return (modelo.sha256, tuple(linha))
+
+
+def previsao_em_cache(modelo, d: Dados):
+    """Resposta de ``d`` se já estiver no cache (sem contar miss), senão None."""
+    try:
+        linha = linha_dados(d, encoder.encode(d.municipio))
+    except MunicipioInvalido:
+        return None
+    y = cache_previsoes.get(chave_cache(modelo, linha), contar_miss=False)
+    return {"TotalCrimesPrevisto": y} if y is not None else None
+
+
+async def prever_async(d: Dados, modelo=None):
+    """Mesmo contrato de prever(), mas a previsão passa pelo micro-batcher."""
+    modelo = modelo if modelo is not None else modelo_atual()
+    with estagio("municipio"):
+        municipio_cod = codificar_municipio(d.municipio)
+    with estagio("matriz"):
+        linha = linha_dados(d, municipio_cod)
+    with estagio("cache"):
+        chave = chave_cache(modelo, linha)
+        y = cache_previsoes.get(chave)
+    if y is not None:
+        return {"TotalCrimesPrevisto": y}
+
+    try:
+        # Inclui a espera na fila do micro-batcher
+        with estagio("predict"):
+            y = round(await microbatcher.submit(modelo, linha), 2)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao prever: {e}")
+    cache_previsoes.put(chave, y)
+    return {"TotalCrimesPrevisto": y}
+
+
+def explicador_de(modelo) -> Explicador:
+    """Explicador do ``modelo`` (o global, se ainda for o mesmo modelo)."""
+    exp = explicador
+    if exp is None or exp.versao != modelo.versao:
+        if modelo.arvore is None:
+            raise HTTPException(status_code=503, detail="Explicação requer a árvore compilada do modelo.")
+        exp = Explicador(modelo.arvore, modelo.versao)
+    return exp
+
+
+def explicar_linha(modelo, linha: list) -> dict:
+    """Caminho de decisão e contribuições de uma linha já codificada."""
+    exp = explicador_de(modelo)
+    try:
+        with estagio("explicacao"):
+            folha, contribuicoes, caminho = exp.explicar_um(linha)
+            return {"base": exp.base, "folha": folha, "contribuicoes": contribuicoes, "caminho": caminho}
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao explicar: {e}")
+
+
+def pontuar_registros(modelo, registros: List[Dados], explicar: bool = False, origem: str = "batch") -> list:
+    """Codifica os registros e roda um único predict vetorizado sobre os válidos.
+
+    Devolve um dict por registro, na ordem de entrada: a previsão ou o erro
+    daquele registro (município inválido), sem derrubar os demais. Com
+    ``explicar``, o mesmo ``apply`` dá a folha e as contribuições de cada um.
+    """
+    with estagio("municipio"):
+        codigos = encoder.encode_many([d.municipio for d in registros])
+    validos = np.flatnonzero(codigos >= 0)
+    resultados = [{"erro": f"Município '{d.municipio}' inválido"} for d in registros]
+
+    if len(validos):
+        with estagio("matriz"):
+            X = np.array([linha_dados(registros[i], codigos[i]) for i in validos], dtype=np.float64)
+        monitorar_lote(X)
+        exp = explicador_de(modelo) if explicar else None
+        try:
+            with estagio("predict"):
+                if exp is None:
+                    y = modelo.predict(X)
+                else:
+                    folhas = exp.arvore.apply(X)
+                    y = exp.arvore.value[folhas]
+                    folhas = folhas.tolist()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erro ao prever: {e}")
+        auditar_lote(origem, modelo, X, y)
+        sombrear(origem, modelo, X, y)
+        for j, (i, v) in enumerate(zip(validos.tolist(), y.tolist())):
+            resultados[i] = {"municipio": encoder.decode(codigos[i]), "TotalCrimesPrevisto": round(v, 2)}
+            if exp is not None:
+                resultados[i]["explicacao"] = {
+                    "base": exp.base, "folha": folhas[j], "contribuicoes": exp.contribuicoes_campos(folhas[j]),
+                }
+
+    return resultados
+
+
+def prever_lote(registros: List[Dados], resposta: str = formatos.JSON, explicar: bool = False):
+    """Previsão de uma lista de registros; a resposta mantém a ordem de entrada."""
+    resultados = pontuar_registros(rotear(), registros, explicar=explicar and resposta == formatos.JSON)
+    if resposta != formatos.JSON:
+        return resposta_compacta([r.get("TotalCrimesPrevisto", np.nan) for r in resultados], resposta)
+    return {"resultados": [{"indice": i, **r} for i, r in enumerate(resultados)]}
+
+
+def ler_compacto(formato: str, corpo: bytes):
+    """Matriz já codificada de um corpo em formato compacto (400/415 se inválido)."""
+    try:
+        with estagio("validacao"):
+            return formatos.ler(formato, corpo, encoder)
+    except formatos.FormatoNaoSuportado as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except formatos.FormatoInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def resposta_compacta(y, formato: str) -> Response:
+    with estagio("serializacao"):
+        return Response(formatos.serializar(y, formato), media_type=formato)
+
+
+def prever_compacto(formato: str, corpo: bytes, resposta: str):
+    """Uma linha em formato compacto: mesmo caminho (e cache) do JSON."""
+    modelo = rotear()
+    X, _ = ler_compacto(formato, corpo)
+    if len(X) != 1:
+        raise HTTPException(status_code=400, detail="Envie uma única linha (para várias, use /previsao-total-crimes/batch)")
+    if X[0, IDX_MUNICIPIO] < 0:
+        raise HTTPException(status_code=400, detail="Município inválido")
+    linha = X[0].tolist()
+    monitorar_linha(linha)
+    r = prever_linha(modelo, linha)
+    auditar("post", modelo, linha, r["TotalCrimesPrevisto"])
+    sombrear("post", modelo, linha, r["TotalCrimesPrevisto"])
+    if resposta == formatos.JSON:
+        return r
+    return resposta_compacta([r["TotalCrimesPrevisto"]], resposta)
+
+
+def prever_lote_compacto(formato: str, corpo: bytes, resposta: str):
+    """Lote em formato compacto: a matriz decodificada vai direto para um único predict."""
+    modelo = rotear()
+    X, _ = ler_compacto(formato, corpo)
+    if len(X) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Lote excede o limite de {MAX_BATCH} registros")
+    validos = X[:, IDX_MUNICIPIO] >= 0
+    y = np.full(len(X), np.nan)
+    if validos.any():
+        monitorar_lote(X if validos.all() else X[validos])
+        try:
+            with estagio("predict"):
+                y[validos] = modelo.predict(X if validos.all() else X[validos])
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erro ao prever: {e}")
+        Xv = X if validos.all() else X[validos]
+        auditar_lote("batch", modelo, Xv, y[validos])
+        sombrear("batch", modelo, Xv, y[validos])
+    if resposta != formatos.JSON:
+        return resposta_compacta(y, resposta)
+    codigos = X[:, IDX_MUNICIPIO].astype(np.intp).tolist()
+    return {"resultados": [
+        {"indice": i, "municipio": encoder.decode(c), "TotalCrimesPrevisto": round(v, 2)} if c >= 0
+        else {"indice": i, "erro": "Município inválido"}
+        for i, (c, v) in enumerate(zip(codigos, y.tolist()))
+    ]}
+
+
+async def linhas_ndjson(chunks, max_bytes: int):
+    """Quebra um fluxo de bytes em linhas sem bufferizar o corpo inteiro.
+
+    Linhas maiores que ``max_bytes`` são descartadas enquanto chegam e viram
+    ``None``, para a memória não crescer com uma linha sem quebra.
+    """
+    resto = b""
+    descartando = False  # no meio de uma linha longa demais
+    async for chunk in chunks:
+        resto += chunk
+        *linhas, resto = resto.split(b"\n")
+        for linha in linhas:
+            if descartando:
+                descartando = False
+                yield None
+            else:
+                yield linha if len(linha) <= max_bytes else None
+        if len(resto) > max_bytes:
+            descartando = True
+            resto = b""
+    if descartando:
+        yield None
+    elif resto:
+        yield resto if len(resto) <= max_bytes else None
+
+
+def pontuar_bloco_ndjson(modelo, bloco: list) -> bytes:
+    """Valida e pontua um bloco de linhas NDJSON (número da linha, bytes ou None)."""
+    itens, dados = [], []
+    with estagio("validacao"):
+        for n, linha in bloco:
+            if linha is None:
+                itens.append((n, f"Linha excede {STREAM_MAX_LINE_BYTES} bytes"))
+                continue
+            try:
+                dados.append(Dados.model_validate_json(linha))
+                itens.append((n, None))
+            except ValidationError as e:
+                itens.append((n, f"Registro inválido: {e.errors(include_url=False)}"))
+    pontuados = iter(pontuar_registros(modelo, dados, origem="stream")) if dados else iter(())
+    saida = []
+    for n, erro in itens:
+        r = next(pontuados) if erro is None else {"erro": erro}
+        saida.append(json.dumps({"linha": n, **r}, ensure_ascii=False))
+    return ("\n".join(saida) + "\n").encode("utf-8")
+
+
+async def prever_stream(modelo, chunks):
+    """Lê NDJSON de ``chunks`` e devolve linhas NDJSON de resultado, em blocos."""
+    bloco = []
+    n = 0
+    async for linha in linhas_ndjson(chunks, STREAM_MAX_LINE_BYTES):
+        n += 1
+        if linha is not None and not linha.strip():
+            continue
+        bloco.append((n, linha))
+        if len(bloco) >= STREAM_CHUNK_ROWS:
+            # Validação + predict de um bloco inteiro: fora do event loop
+            yield await run_in_threadpool(pontuar_bloco_ndjson, modelo, bloco)
+            bloco = []
+    if bloco:
+        yield await run_in_threadpool(pontuar_bloco_ndjson, modelo, bloco)
+
+
+class NDJSONStreamResponse(Response):
+    """Resposta NDJSON em streaming que lê o próprio corpo da requisição.
+
+    O StreamingResponse do Starlette 0.27 escuta desconexão chamando
+    ``receive()`` em paralelo, e essa tarefa consome as mensagens do corpo.
+    Aqui só o gerador chama ``receive()``; uma desconexão encerra o stream.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, gerar, ao_terminar=None):
+        # gerar(chunks) -> iterador assíncrono de bytes; ao_terminar() roda no fim, com ou sem erro
+        self.gerar = gerar
+        self.ao_terminar = ao_terminar
+        self.status_code = 200
+        self.background = None
+        self.init_headers()
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self._enviar(scope, receive, send)
+        finally:
+            if self.ao_terminar is not None:
+                self.ao_terminar()
+
+    async def _enviar(self, scope, receive, send):
+        desconectou = False
+
+        async def corpo():
+            nonlocal desconectou
+            while True:
+                msg = await receive()
+                if msg["type"] == "http.disconnect":
+                    desconectou = True
+                    return
+                yield msg.get("body", b"")
+                if not msg.get("more_body", False):
+                    return
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        async for parte in self.gerar(corpo()):
+            if desconectou:
+                return
+            await send({"type": "http.response.body", "body": parte, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+# -----------------------------------------------------------------------------
+# Micro-batching (MICROBATCH_ENABLED=1)
+# -----------------------------------------------------------------------------
+microbatcher = None
+
+@app.on_event("startup")
+async def iniciar_microbatch():
+    global microbatcher
+    if not MICROBATCH_ENABLED:
+        return
+    microbatcher = MicroBatcher(
+        lambda modelo, X: modelo.predict(X),
+        max_rows=MICROBATCH_MAX_ROWS,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+        # Sem árvore compilada o predict é pandas + sklearn: não pode rodar no event loop
+        em_thread=lambda modelo: modelo.arvore is None,
+    )
+    await microbatcher.start()
+    logging.info("Micro-batching ativo: até %d linhas / %.1f ms", MICROBATCH_MAX_ROWS, MICROBATCH_MAX_WAIT_MS)
+
+@app.on_event("shutdown")
+async def parar_microbatch():
+    global microbatcher
+    if microbatcher is not None:
+        await microbatcher.stop()
+        microbatcher = None
 
 # -----------------------------------------------------------------------------
 # Endpoints
 # -----------------------------------------------------------------------------
-@app.post("/previsao-total-crimes/", summary="Previsão via POST (JSON)")
-def previsao_total_crimes_post(d: Dados):
-    return prever(
-        d.ano, d.municipio, d.ideb,
-        d.ensino_fundamental_docentes, d.ensino_fundamental_escolas, d.ensino_fundamental_matriculas,
-        d.ensino_infantil_docentes, d.ensino_infantil_escolas, d.ensino_infantil_matriculas,
-        d.ensino_medio_docentes, d.ensino_medio_escolas, d.ensino_medio_matriculas,
+@app.post("/admin/reload-model", tags=["admin"], summary="Recarrega o modelo sem reiniciar o worker")
+def admin_reload_model(force: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    if not ADMIN_TOKEN or not hmac.compare_digest((x_admin_token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    # Roda no threadpool: download, carga, paridade e warm-up ficam fora do event loop.
+    # Só este worker troca agora; os outros pegam o novo arquivo pelo watcher.
+    falhas_antes = registry.falhas
+    trocou = registry.recarregar(forcar=force, baixar=True)
+    info = registry.info()
+    if registry.falhas > falhas_antes:
+        raise HTTPException(status_code=500, detail=f"Falha ao recarregar: {info['last_error']}")
+    return {"reloaded": trocou, "model": info}
+
+# Schemas dos formatos compactos (validados no handler, fora do FastAPI)
+CONTEUDO_COMPACTO = {
+    formatos.POSICIONAL: {"schema": {
+        "type": "array", "items": {},
+        "description": f"Uma linha (ou lista de linhas) na ordem {list(CAMPOS)}; município por nome ou código",
+    }},
+    formatos.NPY: {"schema": {
+        "type": "string", "format": "binary",
+        "description": f".npy (n, {len(COLUNAS)}) float64 na ordem {list(COLUNAS)}, município como código",
+    }},
+    formatos.ARROW: {"schema": {
+        "type": "string", "format": "binary",
+        "description": "Arrow IPC stream com as colunas de Dados (requer pyarrow no servidor)",
+    }},
+}
+ListaDados = TypeAdapter(List[Dados])
+
+
+@app.post(
+    "/previsao-total-crimes/",
+    summary="Previsão via POST (JSON ou formato compacto pelo Content-Type)",
+    # O corpo é validado no handler (para medir o estágio); o schema segue documentado
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": Dados.model_json_schema()}, **CONTEUDO_COMPACTO,
+    }}},
+)
+async def previsao_total_crimes_post(
+    request: Request,
+    explicar: bool = Query(False, description="Inclui caminho de decisão e contribuições (só resposta JSON)"),
+):
+    corpo = await request.body()
+    formato = formatos.tipo_midia(request.headers.get("content-type"))
+    resposta = formatos.formato_resposta(
+        request.headers.get("accept"), formato if formato in formatos.COMPACTOS else formatos.JSON,
+    )
+    if formato in formatos.COMPACTOS:
+        return await admitido(NORMAL, lambda: run_in_threadpool(prever_compacto, formato, corpo, resposta))
+    try:
+        with estagio("validacao"):
+            d = Dados.model_validate_json(corpo)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False), body=corpo)
+    monitorar_linha(linha_dados(d, 0.0))
+    modelo = rotear()
+    # Já no cache: resposta barata, sem vaga de admissão nem single-flight
+    r = previsao_em_cache(modelo, d)
+    if r is None:
+        if microbatcher is not None:
+            prever_d = lambda: prever_async(d, modelo)  # noqa: E731
+        else:
+            prever_d = lambda: run_in_threadpool(  # noqa: E731
+                prever,
+                d.ano, d.municipio, d.ideb,
+                d.ensino_fundamental_docentes, d.ensino_fundamental_escolas, d.ensino_fundamental_matriculas,
+                d.ensino_infantil_docentes, d.ensino_infantil_escolas, d.ensino_infantil_matriculas,
+                d.ensino_medio_docentes, d.ensino_medio_escolas, d.ensino_medio_matriculas,
+                modelo=modelo,
+            )
+        # Chave normalizada: município sem acento/caixa, valores já como float, e o modelo em uso.
+        # Só a líder ocupa vaga: as seguidoras não acrescentam trabalho.
+        chave = (modelo.sha256, *linha_dados(d, normalizar(d.municipio)))
+        r = await coalescer("post", chave, lambda: admitido(NORMAL, prever_d))
+    linha = linha_dados(d, encoder.encode(d.municipio))
+    auditar("post", modelo, linha, r["TotalCrimesPrevisto"])
+    sombrear("post", modelo, linha, r["TotalCrimesPrevisto"])
+    if resposta != formatos.JSON:
+        return resposta_compacta([r["TotalCrimesPrevisto"]], resposta)
+    if explicar:
+        r = {**r, "explicacao": explicar_linha(modelo, linha)}
+    return r
+
+@app.post(
+    "/previsao-total-crimes/explicacao",
+    summary="Previsão com o caminho de decisão na árvore e a contribuição de cada campo",
+)
+def previsao_total_crimes_explicacao(d: Dados):
+    modelo = modelo_atual()
+    with estagio("municipio"):
+        codigo = codificar_municipio(d.municipio)
+    linha = linha_dados(d, codigo)
+    explicacao = explicar_linha(modelo, linha)
+    y = round(float(modelo.arvore.value[explicacao["folha"]]), 2)
+    auditar("explicacao", modelo, linha, y)
+    return {
+        "municipio": encoder.decode(codigo),
+        "TotalCrimesPrevisto": y,
+        "model_version": modelo.versao,
+        **explicacao,
+    }
+
+@app.post(
+    "/previsao-total-crimes/stream",
+    summary="Previsão em massa via NDJSON (streaming)",
+    response_class=NDJSONStreamResponse,
+    status_code=200,
+)
+async def previsao_total_crimes_stream():
+    # Uma linha JSON de Dados por linha; cada linha de saída traz o número da linha de entrada
+    modelo = rotear()
+    if admissao is None:
+        return NDJSONStreamResponse(lambda chunks: prever_stream(modelo, chunks))
+    # A vaga fica ocupada durante todo o stream
+    await admissao.entrar(BAIXA)
+    return NDJSONStreamResponse(lambda chunks: prever_stream(modelo, chunks), ao_terminar=admissao.sair)
+
+@app.post(
+    "/previsao-total-crimes/batch",
+    summary="Previsão em lote via POST (lista JSON ou formato compacto pelo Content-Type)",
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": ListaDados.json_schema()}, **CONTEUDO_COMPACTO,
+    }}},
+)
+async def previsao_total_crimes_batch(
+    request: Request,
+    explicar: bool = Query(False, description="Inclui folha e contribuições por registro (só resposta JSON)"),
+):
+    corpo = await request.body()
+    formato = formatos.tipo_midia(request.headers.get("content-type"))
+    resposta = formatos.formato_resposta(
+        request.headers.get("accept"), formato if formato in formatos.COMPACTOS else formatos.JSON,
     )
+    if formato in formatos.COMPACTOS:
+        return await admitido(BAIXA, lambda: run_in_threadpool(prever_lote_compacto, formato, corpo, resposta))
+    try:
+        with estagio("validacao"):
+            registros = ListaDados.validate_json(corpo)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False), body=corpo)
+    if len(registros) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Lote excede o limite de {MAX_BATCH} registros")
+    return await admitido(BAIXA, lambda: run_in_threadpool(prever_lote, registros, resposta, explicar))
+
+@app.post("/previsao-total-crimes/sweep", summary="Varredura \"e se\" de 1 ou 2 campos sobre um registro base")
+async def previsao_total_crimes_sweep(v: Varredura):
+    campos = [e.campo for e in v.eixos]
+    if len(set(campos)) != len(campos):
+        raise HTTPException(status_code=400, detail="Os eixos precisam ser de campos diferentes")
+    pontos = int(np.prod([e.passos for e in v.eixos]))
+    if pontos > SWEEP_MAX_POINTS:
+        raise HTTPException(
+            status_code=413, detail=f"Grade de {pontos} pontos excede o limite de {SWEEP_MAX_POINTS}",
+        )
+    return await admitido(BAIXA, lambda: run_in_threadpool(varrer, v))
+
+
+def varrer(v: Varredura):
+    modelo = modelo_atual()
+    with estagio("municipio"):
+        codigo = codificar_municipio(v.base.municipio)
+    with estagio("matriz"):
+        base = linha_dados(v.base, codigo)
+        eixos = [(CAMPOS.index(e.campo), np.linspace(e.inicio, e.fim, e.passos)) for e in v.eixos]
+        X = sweep.grade(base, eixos)
+    try:
+        with estagio("predict"):
+            y = np.round(np.asarray(modelo.predict(X), dtype=np.float64), 2)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao prever: {e}")
+    auditar_lote("sweep", modelo, X, y)
+
+    # Pontos de corte lidos da árvore: com 1 eixo, só onde a previsão muda de
+    # fato; com 2, todos os thresholds alcançáveis no intervalo de cada eixo
+    breakpoints = None
+    if modelo.arvore is not None:
+        colunas = [c for c, _ in eixos]
+        breakpoints = {}
+        for e, (coluna, _) in zip(v.eixos, eixos):
+            inicio, fim = sorted((e.inicio, e.fim))
+            if len(eixos) == 1:
+                breakpoints[e.campo] = [
+                    {"valor": t, "antes": round(a, 2), "depois": round(d, 2)}
+                    for t, a, d in sweep.degraus(modelo.arvore, base, coluna, inicio, fim)
+                ]
+            else:
+                breakpoints[e.campo] = [
+                    {"valor": t} for t in sweep.cortes(modelo.arvore, base, colunas, coluna, inicio, fim)
+                ]
+    return {
+        "model_version": modelo.versao,
+        "eixos": [{"campo": e.campo, "valores": valores.tolist()} for e, (_, valores) in zip(v.eixos, eixos)],
+        # 1 eixo: curva; 2 eixos: superfície [i][j] = (eixo 0 no valor i, eixo 1 no valor j)
+        "TotalCrimesPrevisto": y.reshape([e.passos for e in v.eixos]).tolist(),
+        "breakpoints": breakpoints,
+    }
+
+@app.post(
+    "/previsao-total-crimes/horizonte",
+    summary="Trajetória prevista de municípios nos próximos anos (features extrapoladas do histórico)",
+)
+async def previsao_total_crimes_horizonte(p: Projecao):
+    if tendencias is None:
+        raise HTTPException(status_code=503, detail="Feature store indisponível neste servidor.")
+    if (p.politica == horizonte.TAXAS) != bool(p.taxas):
+        raise HTTPException(status_code=400, detail="Informe 'taxas' se, e somente se, politica='taxas'")
+    codigos = encoder.encode_many(p.municipios)
+    invalidos = [m for m, c in zip(p.municipios, codigos.tolist()) if c < 0]
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Municípios inválidos: {invalidos}")
+    sem_dados = [m for m, tem in zip(p.municipios, tendencias.tem_historico(codigos).tolist()) if not tem]
+    if sem_dados:
+        raise HTTPException(status_code=404, detail=f"Sem histórico no data_set para: {sem_dados}")
+    return await admitido(BAIXA, lambda: run_in_threadpool(projetar, p, codigos))
+
+
+def projetar(p: Projecao, codigos):
+    modelo = modelo_atual()
+    with estagio("matriz"):
+        anos, X = tendencias.tensor(codigos, p.anos, p.politica, p.taxas)
+    try:
+        with estagio("predict"):
+            y = np.round(np.asarray(modelo.predict(X), dtype=np.float64), 2)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao prever: {e}")
+    auditar_lote("horizonte", modelo, X, y)
+    y = y.reshape(anos.shape)
+    return {
+        "model_version": modelo.versao,
+        "politica": p.politica,
+        # Um ano à frente = espaçamento entre anos do data_set (Ano é padronizado)
+        "passo_ano": tendencias.passo,
+        "trajetorias": [
+            {
+                "municipio": encoder.decode(c),
+                "ultimo_ano": float(tendencias.ultimo_ano[c]),
+                "anos": [round(a, 4) for a in t],
+                "TotalCrimesPrevisto": v,
+            }
+            for c, t, v in zip(codigos.tolist(), anos.tolist(), y.tolist())
+        ],
+    }
+
+
+@app.get(
+    "/previsao-total-crimes/{municipio}/{ano}",
+    summary="Previsão com as features do data_set para (município, ano), com ajustes opcionais",
+)
+async def previsao_por_municipio_ano(
+    municipio: str,
+    ano: float,
+    ideb: Optional[float] = None,
+    ensino_fundamental_docentes: Optional[float] = None,
+    ensino_fundamental_escolas: Optional[float] = None,
+    ensino_fundamental_matriculas: Optional[float] = None,
+    ensino_infantil_docentes: Optional[float] = None,
+    ensino_infantil_escolas: Optional[float] = None,
+    ensino_infantil_matriculas: Optional[float] = None,
+    ensino_medio_docentes: Optional[float] = None,
+    ensino_medio_escolas: Optional[float] = None,
+    ensino_medio_matriculas: Optional[float] = None,
+):
+    # Ajustes "e se": qualquer campo numérico pode ser sobrescrito pela query string
+    ajustes = {
+        campo: valor for campo, valor in (
+            ("ideb", ideb),
+            ("ensino_fundamental_docentes", ensino_fundamental_docentes),
+            ("ensino_fundamental_escolas", ensino_fundamental_escolas),
+            ("ensino_fundamental_matriculas", ensino_fundamental_matriculas),
+            ("ensino_infantil_docentes", ensino_infantil_docentes),
+            ("ensino_infantil_escolas", ensino_infantil_escolas),
+            ("ensino_infantil_matriculas", ensino_infantil_matriculas),
+            ("ensino_medio_docentes", ensino_medio_docentes),
+            ("ensino_medio_escolas", ensino_medio_escolas),
+            ("ensino_medio_matriculas", ensino_medio_matriculas),
+        ) if valor is not None
+    }
+    return await admitido(NORMAL, lambda: run_in_threadpool(consultar, municipio, ano, ajustes))
+
+
+def consultar(municipio: str, ano: float, ajustes: dict):
+    # "ano" é o valor padronizado do dataset (ver /), comparado com 4 casas decimais
+    if feature_store is None:
+        raise HTTPException(status_code=503, detail="Feature store indisponível neste servidor.")
+    modelo = rotear()
+    with estagio("municipio"):
+        codigo = codificar_municipio(municipio)
+    with estagio("matriz"):
+        linha = feature_store.linha(codigo, ano)
+        if linha is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Sem dados para '{municipio}' com ano={ano}; anos disponíveis: {feature_store.anos}",
+            )
+        for campo, valor in ajustes.items():
+            linha[CAMPOS.index(campo)] = valor
+    r = prever_linha(modelo, linha)
+    auditar("lookup", modelo, linha, r["TotalCrimesPrevisto"])
+    sombrear("lookup", modelo, linha, r["TotalCrimesPrevisto"])
+    return {
+        "municipio": encoder.decode(codigo),
+        "ano": linha[0],
+        **r,
+        "ajustes": ajustes,
+    }
+
+@app.get("/ranking", summary="Top-k municípios por previsão num ano do data_set")
+def ranking(
+    ano: float,
+    k: int = Query(10, ge=1, le=len(encoder)),
+    order: Literal["asc", "desc"] = "desc",
+    municipios: Optional[str] = Query(None, description="Lista separada por vírgulas para restringir o ranking"),
+):
+    matriz = matriz_previsoes
+    if matriz is None:
+        raise HTTPException(status_code=503, detail="Matriz de previsões indisponível (modelo ou feature store).")
+    codigos = None
+    if municipios:
+        nomes = [m.strip() for m in municipios.split(",") if m.strip()]
+        cod = encoder.encode_many(nomes)
+        invalidos = [n for n, c in zip(nomes, cod.tolist()) if c < 0]
+        if invalidos:
+            raise HTTPException(status_code=400, detail=f"Municípios inválidos: {invalidos}")
+        codigos = cod
+    try:
+        topo = matriz.ranking(ano, k, order, codigos)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Ano {ano} fora do data_set; anos disponíveis: {matriz.anos}")
+    return {
+        "ano": matriz.anos[matriz.coluna(ano)],
+        "order": order,
+        "model_version": matriz.versao,
+        "ranking": [
+            {"rank": i, "municipio": encoder.decode(c), "TotalCrimesPrevisto": round(v, 2)}
+            for i, (c, v) in enumerate(topo, start=1)
+        ],
+    }
 
 # --- UI BONITINHA (GET com form + resultado) ---
+# Segundos de cache no navegador para o formulário vazio (revalidado por ETag depois)
+UI_CACHE_MAX_AGE = int(os.getenv("UI_CACHE_MAX_AGE", "300"))
+
+# Casca da página (CSS, datalist, campos) montada uma vez; o formulário vazio já em bytes
+pagina_ui = ui.Pagina(encoder.nomes)
+ui_vazia = ui.Variante.de_html(pagina_ui.render({}, ui.DICA))
+# Página dos valores de exemplo, por versão do modelo (o resultado depende dele)
+ui_exemplo: dict = {}
+registry.ao_trocar(lambda _: ui_exemplo.clear())
+
+
+def resposta_variante(request: Request, variante: ui.Variante, cache_control: str) -> Response:
+    """Serve uma página pré-comprimida, com 304 se o ETag do cliente confere."""
+    headers = {"ETag": variante.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if ui.etag_confere(request.headers.get("if-none-match"), variante.etag):
+        return Response(status_code=304, headers=headers)
+    corpo, codificacao = variante.codificada(request.headers.get("accept-encoding"))
+    if codificacao is not None:
+        headers["Content-Encoding"] = codificacao
+    return Response(corpo, media_type="text/html; charset=utf-8", headers=headers)
+
+
+def pagina_resultado(valores: dict) -> tuple:
+    """Página com o resultado (ou o erro) da previsão e o tempo gasto no prever()."""
+    inicio = time.perf_counter()
+    try:
+        res = prever(*(valores[c] for c, _, _ in ui.CAMPOS_UI))
+    except HTTPException as e:
+        res, erro = None, str(e.detail)
+    except Exception as e:
+        res, erro = None, str(e)
+    tempo_prever = time.perf_counter() - inicio
+    if res is None:
+        resultado = ui.erro_html(erro)
+    else:
+        municipio = encoder.canonico(valores["municipio"]).title()
+        resultado = ui.resultado_html(municipio, valores["ano"], res["TotalCrimesPrevisto"])
+        modelo = registry.atual
+        linha = [valores[c] for c in CAMPOS]
+        linha[IDX_MUNICIPIO] = encoder.encode(valores["municipio"])
+        if modelo is not None:
+            auditar("ui", modelo, linha, res["TotalCrimesPrevisto"])
+        if modelo is not None and modelo.arvore is not None:
+            exp = explicar_linha(modelo, linha)
+            resultado += ui.explicacao_html(exp["base"], exp["contribuicoes"])
+    return pagina_ui.render(valores, resultado), tempo_prever
+
+
+def variante_exemplo(sha256: str) -> ui.Variante:
+    variante = ui_exemplo[sha256] = ui.Variante.de_html(pagina_resultado(ui.EXEMPLO)[0])
+    return variante
+
+
+def renderizar_resultado(valores: dict) -> str:
+    # Estágio "html": tempo da renderização menos o prever() (que mede os próprios estágios)
+    inicio = time.perf_counter()
+    pagina, tempo_prever = pagina_resultado(valores)
+    metricas.observar("prediction_stage_duration_seconds", time.perf_counter() - inicio - tempo_prever, stage="html")
+    return pagina
+
+
 @app.get("/previsao-total-crimes/ui", response_class=HTMLResponse)
-def previsao_total_crimes_ui(
+async def previsao_total_crimes_ui(
+    request: Request,
     ano: Optional[float] = None,
     municipio: Optional[str] = None,
     ideb: Optional[float] = None,
@@ -162,165 +1306,48 @@ def previsao_total_crimes_ui(
     ensino_medio_escolas: Optional[float] = None,
     ensino_medio_matriculas: Optional[float] = None,
 ):
-    base_top = """
-    <!doctype html>
-    <html lang="pt-br">
-    <head>
-      <meta charset="utf-8" />
-      <meta name="viewport" content="width=device-width, initial-scale=1" />
-      <title>Previsão de Crimes</title>
-      <style>
-        :root { --bg:#0b1020; --card:#121a36; --text:#e7ecff; --muted:#9db0ff; --accent:#6ea8fe; }
-        * { box-sizing: border-box; }
-        body{ margin:0; font-family:Inter,system-ui,Segoe UI,Roboto,Arial,sans-serif; background:linear-gradient(180deg,#0b1020,#0e1330); color:var(--text); }
-        .container{ max-width:980px; margin:40px auto; padding:0 20px; }
-        .title{ font-weight:700; font-size:28px; margin:6px 0 16px; letter-spacing:.2px; }
-        .subtitle{ color:var(--muted); margin-bottom:24px; }
-        .card{ background:var(--card); border:1px solid rgba(255,255,255,.08); border-radius:16px; padding:20px; box-shadow:0 10px 30px rgba(0,0,0,.35);}
-        .grid{ display:grid; grid-template-columns:repeat(2,minmax(0,1fr)); gap:14px;}
-        .field label{ font-size:13px; color:var(--muted); display:block; margin-bottom:6px;}
-        .field input, .field select{
-          width:100%; background:#0e1530; color:var(--text);
-          border:1px solid rgba(255,255,255,.08); border-radius:10px; padding:10px 12px;
-          outline:none;
-        }
-        .actions{ margin-top:16px; display:flex; gap:10px; }
-        .btn{
-          background:var(--accent); color:#0b1020; border:none; border-radius:10px;
-          padding:10px 14px; font-weight:600; cursor:pointer;
-        }
-        .result{ margin-top:18px; display:flex; gap:16px; align-items:center;}
-        .badge{ background:#0e1530; border:1px solid rgba(255,255,255,.08); padding:6px 10px; border-radius:999px; color:var(--muted); font-size:12px;}
-        .total{ font-size:34px; font-weight:800; letter-spacing:.4px;}
-        .err{ margin-top:16px; padding:12px; border-radius:10px; background:#2a0f15; border:1px solid #7a2a35; color:#ffcbd1; }
-        .muted{ color:var(--muted); font-size:13px; }
-        @media (max-width:760px){ .grid{ grid-template-columns:1fr; } }
-      </style>
-    </head>
-    <body>
-      <div class="container">
-        <div class="title">Previsão de Crimes</div>
-        <div class="subtitle">Informe os parâmetros e visualize a previsão em tempo real.</div>
-        <div class="card">
-          <form method="get" action="/previsao-total-crimes/ui">
-            <div class="grid">
-    """
-
-    municipios_options = "".join([f"<option value='{m.title()}'>" for m in municipios])
-    form_fields = f"""
-      <div class="field">
-        <label>Ano</label>
-        <input type="number" step="1" name="ano" value="{'' if ano is None else ano}">
-      </div>
-      <div class="field">
-        <label>Município</label>
-        <input list="municipios" name="municipio" placeholder="Ex.: Recife" value="{'' if municipio is None else municipio}">
-        <datalist id="municipios">{municipios_options}</datalist>
-      </div>
-      <div class="field">
-        <label>IDEB</label>
-        <input type="number" step="0.01" name="ideb" value="{'' if ideb is None else ideb}">
-      </div>
-      <div class="field">
-        <label>EF - Docentes</label>
-        <input type="number" step="0.01" name="ensino_fundamental_docentes" value="{'' if ensino_fundamental_docentes is None else ensino_fundamental_docentes}">
-      </div>
-      <div class="field">
-        <label>EF - Escolas</label>
-        <input type="number" step="0.01" name="ensino_fundamental_escolas" value="{'' if ensino_fundamental_escolas is None else ensino_fundamental_escolas}">
-      </div>
-      <div class="field">
-        <label>EF - Matrículas</label>
-        <input type="number" step="0.01" name="ensino_fundamental_matriculas" value="{'' if ensino_fundamental_matriculas is None else ensino_fundamental_matriculas}">
-      </div>
-      <div class="field">
-        <label>EI - Docentes</label>
-        <input type="number" step="0.01" name="ensino_infantil_docentes" value="{'' if ensino_infantil_docentes is None else ensino_infantil_docentes}">
-      </div>
-      <div class="field">
-        <label>EI - Escolas</label>
-        <input type="number" step="0.01" name="ensino_infantil_escolas" value="{'' if ensino_infantil_escolas is None else ensino_infantil_escolas}">
-      </div>
-      <div class="field">
-        <label>EI - Matrículas</label>
-        <input type="number" step="0.01" name="ensino_infantil_matriculas" value="{'' if ensino_infantil_matriculas is None else ensino_infantil_matriculas}">
-      </div>
-      <div class="field">
-        <label>EM - Docentes</label>
-        <input type="number" step="0.01" name="ensino_medio_docentes" value="{'' if ensino_medio_docentes is None else ensino_medio_docentes}">
-      </div>
-      <div class="field">
-        <label>EM - Escolas</label>
-        <input type="number" step="0.01" name="ensino_medio_escolas" value="{'' if ensino_medio_escolas is None else ensino_medio_escolas}">
-      </div>
-      <div class="field">
-        <label>EM - Matrículas</label>
-        <input type="number" step="0.01" name="ensino_medio_matriculas" value="{'' if ensino_medio_matriculas is None else ensino_medio_matriculas}">
-      </div>
-    """
+    valores = {
+        "ano": ano, "municipio": municipio, "ideb": ideb,
+        "ensino_fundamental_docentes": ensino_fundamental_docentes,
+        "ensino_fundamental_escolas": ensino_fundamental_escolas,
+        "ensino_fundamental_matriculas": ensino_fundamental_matriculas,
+        "ensino_infantil_docentes": ensino_infantil_docentes,
+        "ensino_infantil_escolas": ensino_infantil_escolas,
+        "ensino_infantil_matriculas": ensino_infantil_matriculas,
+        "ensino_medio_docentes": ensino_medio_docentes,
+        "ensino_medio_escolas": ensino_medio_escolas,
+        "ensino_medio_matriculas": ensino_medio_matriculas,
+    }
 
-    base_mid = """
-            </div>
-            <div class="actions">
-              <button class="btn" type="submit">Calcular previsão</button>
-              <a class="btn" style="background:#0e1530;color:#e7ecff;border:1px solid rgba(255,255,255,.12)" href="/previsao-total-crimes/ui">Limpar</a>
-            </div>
-          </form>
-    """
+    # Formulário vazio (a maioria das visitas): bytes prontos
+    if all(v is None for v in valores.values()):
+        return resposta_variante(request, ui_vazia, f"public, max-age={UI_CACHE_MAX_AGE}")
 
-    faltando = any(v is None for v in [
-        ano, municipio, ideb,
-        ensino_fundamental_docentes, ensino_fundamental_escolas, ensino_fundamental_matriculas,
-        ensino_infantil_docentes, ensino_infantil_escolas, ensino_infantil_matriculas,
-        ensino_medio_docentes, ensino_medio_escolas, ensino_medio_matriculas
-    ])
-
-    result_html = ""
-    if not faltando:
-        try:
-            res = prever(
-                ano, municipio, ideb,
-                ensino_fundamental_docentes, ensino_fundamental_escolas, ensino_fundamental_matriculas,
-                ensino_infantil_docentes, ensino_infantil_escolas, ensino_infantil_matriculas,
-                ensino_medio_docentes, ensino_medio_escolas, ensino_medio_matriculas,
+    # Valores de exemplo: página inteira em cache por versão do modelo; revalida sempre
+    modelo = registry.atual
+    if valores == ui.EXEMPLO and modelo is not None:
+        variante = ui_exemplo.get(modelo.sha256)
+        if variante is None:
+            variante = await coalescer(
+                "ui", ("exemplo", modelo.sha256), lambda: run_in_threadpool(variante_exemplo, modelo.sha256),
             )
-            total = res["TotalCrimesPrevisto"]
-            result_html = f"""
-            <div class="result">
-              <span class="badge">{municipio.title()} · {int(ano)}</span>
-              <div>
-                <div class="muted">Total de Crimes Previsto</div>
-                <div class="total">{total}</div>
-              </div>
-            </div>
-            """
-        except Exception as e:
-            result_html = f"""<div class="err">Erro ao calcular: {str(e)}</div>"""
-    else:
-        hint_params = {
-            "ano": 2024, "municipio": "Recife", "ideb": 5.2,
-            "ensino_fundamental_docentes": 1000, "ensino_fundamental_escolas": 200, "ensino_fundamental_matriculas": 30000,
-            "ensino_infantil_docentes": 500, "ensino_infantil_escolas": 100, "ensino_infantil_matriculas": 15000,
-            "ensino_medio_docentes": 800, "ensino_medio_escolas": 150, "ensino_medio_matriculas": 25000
-        }
-        sample = "/previsao-total-crimes/ui?" + urlencode(hint_params)
-        result_html = f"""
-          <div class="muted">Preencha os campos e clique em <b>Calcular previsão</b>.
-            Exemplo rápido: <a href="{sample}" style="color:var(--accent)">usar valores de exemplo</a>.
-          </div>
-        """
-
-    base_bottom = """
-        </div>
-      </div>
-    </body>
-    </html>
-    """
+        return resposta_variante(request, variante, "no-cache")
+
+    if any(v is None for v in valores.values()):
+        inicio = time.perf_counter()
+        pagina = pagina_ui.render(valores, ui.DICA)
+        metricas.observar("prediction_stage_duration_seconds", time.perf_counter() - inicio, stage="html")
+        return HTMLResponse(pagina)
 
-    return base_top + form_fields + base_mid + result_html + base_bottom
+    monitorar_linha([valores[c] for c in CAMPOS])
+    # Abas com a mesma query string ao mesmo tempo: uma renderiza, as outras recebem a mesma página
+    chave = (modelo.sha256 if modelo is not None else None, *valores.values())
+    pagina = await coalescer(
+        "ui", chave, lambda: admitido(BAIXA, lambda: run_in_threadpool(renderizar_resultado, valores)),
+    )
+    return HTMLResponse(pagina)
 
 # Execução local (não usado no App Engine, mas útil para testes)
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=int(os.getenv("PORT", "8000")), reload=False)
-PY
@@ -0,0 +1,158 @@
+"""Controle de admissão: limite de previsões em voo por worker, com fila curta.
+
+Cada worker aceita até ``max_em_voo`` cálculos ao mesmo tempo; o excedente
+espera numa fila limitada por no máximo ``prazo`` segundos e, se não houver
+vaga até lá (ou a fila estiver cheia), recebe :class:`Sobrecarga` na hora,
+que a API devolve como 503 com ``Retry-After``. Assim a latência de quem é
+admitido fica limitada e o excesso é recusado em vez de empilhado.
+
+Há duas prioridades. ``NORMAL`` (previsão unitária, consultas) pode ocupar
+todas as vagas; ``BAIXA`` (lote, stream, varredura, UI) nunca ocupa as
+``reserva`` últimas, só é acordada quando não há ``NORMAL`` esperando e, com
+a fila cheia, cede o lugar a uma ``NORMAL`` que chega. Healthcheck, métricas
+e respostas já em cache não passam por aqui.
+
+Tudo roda no event loop do worker: sem locks.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict
+
+NORMAL = "normal"
+BAIXA = "baixa"
+PRIORIDADES = (NORMAL, BAIXA)  # ordem de atendimento da fila
+
+
+class Sobrecarga(Exception):
+    """Requisição recusada pela admissão (vira 503 com ``Retry-After``)."""
+
+    def __init__(self, prioridade: str, motivo: str, retry_after: float) -> None:
+        super().__init__(f"Servidor sobrecarregado ({prioridade}: {motivo})")
+        self.prioridade = prioridade
+        self.motivo = motivo
+        self.retry_after = retry_after
+
+
+class Admissao:
+    """Semáforo com prioridades, fila limitada e prazo de espera."""
+
+    def __init__(
+        self,
+        max_em_voo: int,
+        max_fila: int = 0,
+        prazo: float = 1.0,
+        reserva: int = 0,
+        retry_after: float = 1.0,
+    ) -> None:
+        if max_em_voo < 1:
+            raise ValueError("max_em_voo deve ser >= 1")
+        self.max_em_voo = max_em_voo
+        self.max_fila = max(0, max_fila)
+        self.prazo = prazo
+        # Vagas que BAIXA não ocupa (sempre sobra ao menos uma para ela)
+        self.reserva = min(max(0, reserva), max_em_voo - 1)
+        self.retry_after = retry_after
+        self.em_voo = 0
+        self._filas: Dict[str, Deque["asyncio.Future[None]"]] = {p: deque() for p in PRIORIDADES}
+        self.admitidas: Counter = Counter()
+        self.recusadas: Counter = Counter()  # (prioridade, motivo) -> n
+
+    def _limite(self, prioridade: str) -> int:
+        return self.max_em_voo if prioridade == NORMAL else self.max_em_voo - self.reserva
+
+    def _pode_entrar(self, prioridade: str) -> bool:
+        # Ninguém de prioridade igual ou maior na fila: não fura a fila
+        for p in PRIORIDADES:
+            if self._filas[p]:
+                return False
+            if p == prioridade:
+                break
+        return self.em_voo < self._limite(prioridade)
+
+    @property
+    def profundidade(self) -> int:
+        return sum(len(f) for f in self._filas.values())
+
+    def _recusar(self, prioridade: str, motivo: str) -> Sobrecarga:
+        self.recusadas[(prioridade, motivo)] += 1
+        return Sobrecarga(prioridade, motivo, self.retry_after)
+
+    async def entrar(self, prioridade: str = NORMAL) -> None:
+        """Ocupa uma vaga (esperando até ``prazo``) ou levanta :class:`Sobrecarga`."""
+        if prioridade not in self._filas:
+            raise ValueError(f"Prioridade desconhecida: {prioridade!r}")
+        if self._pode_entrar(prioridade):
+            self.em_voo += 1
+            self.admitidas[prioridade] += 1
+            return
+        if self.profundidade >= self.max_fila:
+            baixas = self._filas[BAIXA]
+            if prioridade != NORMAL or not baixas:
+                raise self._recusar(prioridade, "fila_cheia")
+            # Fila cheia: a BAIXA mais recente sai para a NORMAL entrar
+            vitima = baixas.pop()
+            if not vitima.done():
+                vitima.set_exception(self._recusar(BAIXA, "desalojada"))
+
+        loop = asyncio.get_running_loop()
+        espera: "asyncio.Future[None]" = loop.create_future()
+        fila = self._filas[prioridade]
+        fila.append(espera)
+        expira = loop.call_later(self.prazo, self._expirar, prioridade, espera)
+        try:
+            await espera
+        except asyncio.CancelledError:
+            # Cliente desistiu; se a vaga já tinha sido entregue, devolve
+            if espera.done() and not espera.cancelled() and espera.exception() is None:
+                self.sair()
+            elif espera in fila:
+                fila.remove(espera)
+            raise
+        finally:
+            expira.cancel()
+
+    def _expirar(self, prioridade: str, espera: "asyncio.Future[None]") -> None:
+        if not espera.done():
+            self._filas[prioridade].remove(espera)
+            espera.set_exception(self._recusar(prioridade, "prazo"))
+
+    def sair(self) -> None:
+        """Libera a vaga e a entrega ao próximo da fila que couber."""
+        self.em_voo -= 1
+        for p in PRIORIDADES:
+            fila = self._filas[p]
+            while fila and self.em_voo < self._limite(p):
+                espera = fila.popleft()
+                if espera.done():  # cancelada, ainda saindo da fila
+                    continue
+                self.em_voo += 1
+                self.admitidas[p] += 1
+                espera.set_result(None)
+            if fila:
+                break  # NORMAL ainda esperando: BAIXA não passa na frente
+
+    @asynccontextmanager
+    async def vaga(self, prioridade: str = NORMAL) -> AsyncIterator[None]:
+        await self.entrar(prioridade)
+        try:
+            yield
+        finally:
+            self.sair()
+
+    def stats(self) -> Dict[str, object]:
+        recusadas: Dict[str, Dict[str, int]] = {}
+        for (p, motivo), n in sorted(self.recusadas.items()):
+            recusadas.setdefault(p, {})[motivo] = n
+        return {
+            "max_in_flight": self.max_em_voo,
+            "reserved_normal": self.reserva,
+            "in_flight": self.em_voo,
+            "queue_size": self.max_fila,
+            "queue_depth": {p: len(f) for p, f in self._filas.items()},
+            "queue_timeout_seconds": self.prazo,
+            "admitted": {p: self.admitidas[p] for p in PRIORIDADES},
+            "shed": recusadas,
+        }
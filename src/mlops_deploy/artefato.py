@@ -0,0 +1,184 @@
+"""Artefato compacto do modelo: arrays da árvore em ``.npz`` e manifesto JSON.
+
+Ao lado de ``models/model.pkl`` ficam ``model.npz`` (arrays do
+``CompiledTree`` mais uma amostra de paridade) e ``model.json`` (ordem das
+features, mapeamento de municípios, versão do sklearn e o sha256 do ``.pkl``
+de origem). Carregar o ``.npz`` não importa pandas, joblib nem sklearn.
+
+O ``.npz`` é gravado sem compressão, então cada array pode ser mapeado em
+memória (``mmap``) direto do arquivo: os workers da instância compartilham as
+mesmas páginas do page cache em vez de cada um ter sua cópia. O arquivo é
+sempre substituído com ``os.replace``, nunca reescrito no lugar, então um
+mapeamento antigo continua válido até o worker trocar de modelo.
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+import tempfile
+import time
+import zipfile
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.features import COLUNAS
+from mlops_deploy.municipios import MUNICIPIOS
+from mlops_deploy.tree import CompiledTree
+
+FORMATO = 1
+
+ARRAYS = ("children_left", "children_right", "feature", "threshold", "value")
+
+
+class ArtefatoInvalido(ValueError):
+    """Artefato compacto ausente de campos, de outra origem ou inconsistente."""
+
+
+def caminhos(path: str) -> Tuple[str, str]:
+    """(``.npz``, ``.json``) ao lado de ``path`` (com ou sem extensão)."""
+    base = os.path.splitext(path)[0]
+    return base + ".npz", base + ".json"
+
+
+def _gravar_atomico(destino: str, escrever: Callable[[Any], None], modo: str = "wb") -> None:
+    pasta = os.path.dirname(os.path.abspath(destino))
+    fd, tmp = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    try:
+        with os.fdopen(fd, modo) as f:
+            escrever(f)
+        os.chmod(tmp, 0o644)  # mkstemp cria 0600; o servidor pode rodar com outro usuário
+        os.replace(tmp, destino)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def exportar(
+    estimator: Any,
+    origem: str,
+    origem_sha256: str,
+    predict_sklearn: Callable[[npt.NDArray[np.float64]], npt.ArrayLike],
+    treino: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, str]:
+    """Grava o artefato compacto de ``estimator`` (carregado de ``origem``).
+
+    ``treino`` (relatório do ``mlops_deploy train``) vai para o manifesto.
+    """
+    arvore = CompiledTree.from_sklearn(estimator)
+    amostra = arvore.amostra_paridade()
+    with np.errstate(over="ignore"):
+        amostra = amostra[~np.isinf(amostra.astype(np.float32)).any(axis=1)]
+    arrays: Dict[str, npt.NDArray[Any]] = {nome: getattr(arvore, nome) for nome in ARRAYS}
+    if arvore.missing_go_to_left is not None:
+        arrays["missing_go_to_left"] = arvore.missing_go_to_left
+    arrays["check_X"] = amostra
+    arrays["check_y"] = np.asarray(predict_sklearn(amostra), dtype=np.float64).ravel()
+
+    npz, manifesto_path = caminhos(origem)
+    # Sem compressão: o .npz pode ser lido direto (e mapeado em memória)
+    _gravar_atomico(npz, lambda f: np.savez(f, **arrays))
+    try:
+        import sklearn
+
+        versao_sklearn: Optional[str] = sklearn.__version__
+    except ImportError:  # pragma: no cover - exportar sempre roda com sklearn
+        versao_sklearn = None
+    from mlops_deploy.registry import hash_arquivo
+
+    manifesto = {
+        "format": FORMATO,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "estimator": type(estimator).__name__,
+        "sklearn_version": versao_sklearn,
+        "features": list(getattr(estimator, "feature_names_in_", COLUNAS)),
+        "municipios": list(MUNICIPIOS),
+        "n_features": arvore.n_features,
+        "node_count": arvore.node_count,
+        "max_depth": arvore.max_depth,
+        "source": {"file": os.path.basename(origem), "sha256": origem_sha256},
+        "npz_sha256": hash_arquivo(npz),
+    }
+    if treino is not None:
+        manifesto["training"] = treino
+    _gravar_atomico(
+        manifesto_path,
+        lambda f: f.write(json.dumps(manifesto, indent=2, ensure_ascii=False) + "\n"),
+        modo="w",
+    )
+    return npz, manifesto_path
+
+
+def _mapear_npz(npz: str) -> Dict[str, npt.NDArray[Any]]:
+    """Arrays de um ``.npz`` sem compressão como ``np.memmap`` somente leitura."""
+    arrays: Dict[str, npt.NDArray[Any]] = {}
+    with zipfile.ZipFile(npz) as zf, open(npz, "rb") as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ArtefatoInvalido(f"{npz} está comprimido e não pode ser mapeado")
+            # Cabeçalho local do zip: 30 bytes + nome + extra (tamanhos nos bytes 26-29)
+            f.seek(info.header_offset)
+            cabecalho = f.read(30)
+            n_nome, n_extra = struct.unpack("<HH", cabecalho[26:30])
+            f.seek(info.header_offset + 30 + n_nome + n_extra)
+            versao = np.lib.format.read_magic(f)
+            if versao == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ArtefatoInvalido(f"{npz} contém arrays de objetos")
+            nome = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if not shape or 0 in shape:
+                arrays[nome] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[nome] = np.memmap(npz, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran else "C")
+    return arrays
+
+
+def carregar(origem: str, origem_sha256: str, mmap: bool = True) -> Tuple[CompiledTree, Dict[str, Any]]:
+    """Carrega o artefato compacto de ``origem`` se ele foi gerado desse mesmo arquivo.
+
+    ``FileNotFoundError`` se não existe; ``ArtefatoInvalido`` se é de outro
+    ``.pkl``, de outra ordem de features/municípios ou não bate com a amostra.
+    Com ``mmap`` os arrays da árvore apontam para o arquivo (somente leitura).
+    """
+    from mlops_deploy.registry import hash_arquivo
+
+    npz, manifesto_path = caminhos(origem)
+    with open(manifesto_path, encoding="utf-8") as f:
+        manifesto = json.load(f)
+    if manifesto.get("format") != FORMATO:
+        raise ArtefatoInvalido(f"Formato de artefato desconhecido: {manifesto.get('format')}")
+    if manifesto.get("source", {}).get("sha256") != origem_sha256:
+        raise ArtefatoInvalido(f"{manifesto_path} foi gerado de outro {os.path.basename(origem)}")
+    if tuple(manifesto.get("features", ())) != COLUNAS:
+        raise ArtefatoInvalido("Ordem de features do artefato difere de COLUNAS")
+    if tuple(manifesto.get("municipios", ())) != MUNICIPIOS:
+        raise ArtefatoInvalido("Mapeamento de municípios do artefato difere do encoder")
+    if hash_arquivo(npz) != manifesto.get("npz_sha256"):
+        raise ArtefatoInvalido(f"{npz} não confere com o manifesto")
+
+    if mmap:
+        arrays = _mapear_npz(npz)
+    else:
+        with np.load(npz, allow_pickle=False) as dados:
+            arrays = {k: dados[k] for k in dados.files}
+    faltando = [k for k in ARRAYS + ("check_X", "check_y") if k not in arrays]
+    if faltando:
+        raise ArtefatoInvalido(f"Arrays ausentes em {npz}: {faltando}")
+    arvore = CompiledTree(
+        *(arrays[k] for k in ARRAYS),
+        n_features=manifesto.get("n_features"),
+        missing_go_to_left=arrays.get("missing_go_to_left"),
+        max_depth=manifesto.get("max_depth"),
+    )
+    X, y = arrays["check_X"], arrays["check_y"]
+    unitario = np.array([arvore.predict_one(linha) for linha in X])
+    if not (np.allclose(arvore.predict(X), y, rtol=0, atol=1e-9, equal_nan=True)
+            and np.allclose(unitario, y, rtol=0, atol=1e-9, equal_nan=True)):
+        raise ArtefatoInvalido(f"{npz} diverge da amostra de paridade gravada na exportação")
+    return arvore, manifesto
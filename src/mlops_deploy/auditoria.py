@@ -0,0 +1,247 @@
+"""Log de auditoria das previsões servidas: entradas, saída, modelo e horário.
+
+A requisição só empurra uma referência para um buffer em memória (uma linha
+ou um lote inteiro como um item só); uma thread grava o buffer em lotes num
+SQLite em modo WAL, append-only, quando ele passa de ``lote`` linhas ou a
+cada ``intervalo`` segundos. O disco fica fora do caminho da requisição.
+
+O buffer tem no máximo ``capacidade`` linhas. Cheio, a política
+``descartar`` recusa a linha nova na hora (e conta); ``bloquear`` espera até
+``espera`` segundos por espaço e só então descarta. No ``parar`` o que estiver
+no buffer é gravado antes de fechar o banco.
+
+Vários workers podem gravar no mesmo arquivo: o WAL serializa os escritores
+(com ``busy_timeout``) sem bloquear as leituras de :func:`consultar`.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from mlops_deploy.features import CAMPOS, IDX_MUNICIPIO
+from mlops_deploy.municipios import MunicipioEncoder, MunicipioInvalido, encoder as encoder_padrao
+
+logger = logging.getLogger(__name__)
+
+DESCARTAR = "descartar"
+BLOQUEAR = "bloquear"
+TABELA = "previsoes"
+COLUNAS_AUDITORIA = ("ts", "endpoint", "model_version", *CAMPOS, "total_crimes_previsto")
+
+# (ts, endpoint, versão, linha ou matriz codificada na ordem de COLUNAS, previsão ou vetor)
+Item = Tuple[float, str, str, Any, Any]
+
+
+def conectar(caminho: str) -> sqlite3.Connection:
+    con = sqlite3.connect(caminho, timeout=5.0)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS {TABELA} ("
+        "ts REAL NOT NULL, endpoint TEXT NOT NULL, model_version TEXT, "
+        + ", ".join(f"{c} TEXT NOT NULL" if j == IDX_MUNICIPIO else f"{c} REAL" for j, c in enumerate(CAMPOS))
+        + ", total_crimes_previsto REAL)"
+    )
+    con.execute(f"CREATE INDEX IF NOT EXISTS {TABELA}_ts ON {TABELA}(ts)")
+    con.execute(f"CREATE INDEX IF NOT EXISTS {TABELA}_municipio_ts ON {TABELA}(municipio, ts)")
+    return con
+
+
+class Auditoria:
+    """Buffer limitado de previsões gravado em lote por uma thread."""
+
+    def __init__(
+        self,
+        caminho: str,
+        capacidade: int = 100_000,
+        lote: int = 1000,
+        intervalo: float = 1.0,
+        politica: str = DESCARTAR,
+        espera: float = 1.0,
+        casas: int = 2,
+        encoder: MunicipioEncoder = encoder_padrao,
+    ) -> None:
+        if politica not in (DESCARTAR, BLOQUEAR):
+            raise ValueError(f"Política desconhecida: {politica!r}")
+        self.caminho = caminho
+        self.capacidade = capacidade
+        self.lote = lote
+        self.intervalo = intervalo
+        self.politica = politica
+        self.espera = espera
+        self.casas = casas  # a previsão é gravada como a API serve (arredondada na thread de gravação)
+        self.encoder = encoder
+        self._buffer: Deque[Item] = deque()
+        self._pendentes = 0  # linhas no buffer (um lote conta todas as suas)
+        self._cond = threading.Condition()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.recebidas = 0
+        self.gravadas = 0
+        self.descartadas = 0
+        self.gravacoes = 0
+        self.ultimo_erro: Optional[str] = None
+
+    # -- produtores (threads das requisições) --------------------------------
+    def registrar(self, endpoint: str, versao: str, linha: Sequence[float], y: float) -> bool:
+        """Uma previsão (linha codificada na ordem de COLUNAS); False se descartada."""
+        return self._empurrar((time.time(), endpoint, versao, linha, y), 1)
+
+    def registrar_lote(self, endpoint: str, versao: str, X: Any, y: Any) -> bool:
+        """Um lote (matriz n x len(COLUNAS) e n previsões) como um item só; nada é copiado."""
+        n = len(y)
+        return n == 0 or self._empurrar((time.time(), endpoint, versao, X, y), n)
+
+    def _empurrar(self, item: Item, n: int) -> bool:
+        with self._cond:
+            self.recebidas += n
+            if self._pendentes + n > self.capacidade and self.politica == BLOQUEAR:
+                self._acordar.set()
+                self._cond.wait_for(lambda: self._pendentes + n <= self.capacidade, timeout=self.espera)
+            if self._pendentes + n > self.capacidade:
+                self.descartadas += n
+                return False
+            self._buffer.append(item)
+            self._pendentes += n
+            cheio = self._pendentes >= self.lote
+        if cheio:
+            self._acordar.set()
+        return True
+
+    # -- gravação ---------------------------------------------------------------
+    def iniciar(self) -> None:
+        if self._thread is not None:
+            return
+        self._parar.clear()
+        pronto = threading.Event()
+        self._thread = threading.Thread(target=self._loop, args=(pronto,), name="audit-writer", daemon=True)
+        self._thread.start()
+        pronto.wait(timeout=5)
+
+    def parar(self, timeout: float = 10.0) -> None:
+        """Grava o que está no buffer e fecha o banco."""
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._acordar.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _loop(self, pronto: threading.Event) -> None:
+        try:
+            con = conectar(self.caminho)
+        except sqlite3.Error as e:
+            self.ultimo_erro = str(e)
+            logger.exception("Auditoria: não foi possível abrir %s", self.caminho)
+            pronto.set()
+            return
+        pronto.set()
+        try:
+            while not self._parar.is_set():
+                self._acordar.wait(self.intervalo)
+                self._acordar.clear()
+                self._gravar(con)
+            self._gravar(con)
+        finally:
+            con.close()
+
+    def _retirar(self) -> List[Item]:
+        with self._cond:
+            itens = list(self._buffer)
+            self._buffer.clear()
+            self._pendentes = 0
+            self._cond.notify_all()
+        return itens
+
+    def _gravar(self, con: sqlite3.Connection) -> None:
+        itens = self._retirar()
+        if not itens:
+            return
+        linhas = list(self._linhas(itens))
+        try:
+            with con:
+                con.executemany(
+                    f"INSERT INTO {TABELA} VALUES ({', '.join('?' * len(COLUNAS_AUDITORIA))})", linhas,
+                )
+        except sqlite3.Error as e:
+            self.descartadas += len(linhas)
+            self.ultimo_erro = str(e)
+            logger.exception("Auditoria: falha ao gravar %d linhas", len(linhas))
+            return
+        self.gravadas += len(linhas)
+        self.gravacoes += 1
+
+    def _linhas(self, itens: List[Item]) -> Iterator[tuple]:
+        decode, casas = self.encoder.decode, self.casas
+        for ts, endpoint, versao, X, y in itens:
+            if isinstance(y, (int, float)):
+                pares: Any = ((X, y),)
+            else:
+                pares = zip(np.asarray(X).tolist(), np.asarray(y).tolist())
+            for linha, v in pares:
+                linha = [float(x) for x in linha]
+                linha[IDX_MUNICIPIO] = decode(int(linha[IDX_MUNICIPIO]))
+                yield (ts, endpoint, versao, *linha, round(v, casas))
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "path": self.caminho,
+            "policy": self.politica,
+            "capacity": self.capacidade,
+            "pending": self._pendentes,
+            "received": self.recebidas,
+            "written": self.gravadas,
+            "dropped": self.descartadas,
+            "flushes": self.gravacoes,
+            "running": self._thread is not None,
+            "last_error": self.ultimo_erro,
+        }
+
+
+def consultar(
+    caminho: str,
+    inicio: Optional[float] = None,
+    fim: Optional[float] = None,
+    municipio: Optional[str] = None,
+    limite: Optional[int] = None,
+    encoder: MunicipioEncoder = encoder_padrao,
+) -> List[Dict[str, Any]]:
+    """Previsões registradas em ``[inicio, fim)`` (epoch), opcionalmente de um município.
+
+    Usa os índices por ``ts`` e por ``(municipio, ts)``; a conexão é só
+    leitura e não disputa com os workers gravando.
+    """
+    filtros, params = [], []
+    if municipio is not None:
+        try:
+            municipio = encoder.canonico(municipio)
+        except MunicipioInvalido:
+            return []
+        filtros.append("municipio = ?")
+        params.append(municipio)
+    if inicio is not None:
+        filtros.append("ts >= ?")
+        params.append(inicio)
+    if fim is not None:
+        filtros.append("ts < ?")
+        params.append(fim)
+    sql = f"SELECT * FROM {TABELA}"
+    if filtros:
+        sql += " WHERE " + " AND ".join(filtros)
+    sql += " ORDER BY ts"
+    if limite is not None:
+        sql += " LIMIT ?"
+        params.append(limite)
+    con = sqlite3.connect(f"file:{caminho}?mode=ro", uri=True, timeout=5.0)
+    try:
+        con.row_factory = sqlite3.Row
+        return [dict(r) for r in con.execute(sql, params)]
+    finally:
+        con.close()
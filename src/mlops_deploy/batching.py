@@ -0,0 +1,148 @@
+"""Micro-batching assíncrono de previsões de uma linha.
+
+Requisições concorrentes entram numa fila; um worker no event loop junta até
+``max_rows`` linhas ou espera no máximo ``max_wait_ms`` e pontua tudo com uma
+única chamada vetorizada por modelo. Cada requisição recebe de volta só o seu
+resultado, calculado pelo modelo que ela mesma enfileirou.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+logger = logging.getLogger(__name__)
+
+PredictFn = Callable[[Any, npt.NDArray[np.float64]], npt.ArrayLike]
+Item = Tuple[Any, Sequence[float], "asyncio.Future[float]"]
+
+
+class MicroBatcher:
+    """Coalesce previsões de uma linha em lotes.
+
+    ``predict_fn(modelo, X)`` recebe o modelo enfileirado com as linhas e a
+    matriz (n_linhas x n_features). Um lote que mistura modelos (troca no meio
+    da janela) é dividido por modelo. Por padrão o predict roda no event loop,
+    o que só compensa quando é barato (árvore compilada); ``em_thread(modelo)``
+    verdadeiro manda o lote para uma thread.
+    """
+
+    def __init__(
+        self,
+        predict_fn: PredictFn,
+        max_rows: int = 64,
+        max_wait_ms: float = 2.0,
+        em_thread: Callable[[Any], bool] = lambda modelo: False,
+    ) -> None:
+        if max_rows < 1:
+            raise ValueError("max_rows deve ser >= 1")
+        self.predict_fn = predict_fn
+        self.em_thread = em_thread
+        self.max_rows = max_rows
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self._fila: Optional["asyncio.Queue[Item]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+        self.lotes = 0
+        self.linhas = 0
+        self.maior_lote = 0
+
+    @property
+    def rodando(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        if self.rodando:
+            return
+        self._fila = asyncio.Queue()
+        self._worker = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        # Quem ainda estava na fila recebe erro em vez de ficar pendurado
+        while self._fila is not None and not self._fila.empty():
+            _, _, fut = self._fila.get_nowait()
+            if not fut.done():
+                fut.set_exception(RuntimeError("Micro-batcher encerrado"))
+
+    async def submit(self, modelo: Any, linha: Sequence[float]) -> float:
+        """Enfileira uma linha já codificada e espera a previsão de ``modelo``."""
+        if not self.rodando or self._fila is None:
+            raise RuntimeError("Micro-batcher não iniciado")
+        fut: "asyncio.Future[float]" = asyncio.get_running_loop().create_future()
+        await self._fila.put((modelo, linha, fut))
+        return await fut
+
+    async def _coletar(self) -> List[Item]:
+        assert self._fila is not None
+        lote = [await self._fila.get()]
+        loop = asyncio.get_running_loop()
+        prazo = loop.time() + self.max_wait
+        while len(lote) < self.max_rows:
+            try:
+                lote.append(self._fila.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            restante = prazo - loop.time()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self._fila.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    async def _pontuar(self, modelo: Any, grupo: List[Item]) -> None:
+        try:
+            X = np.array([linha for _, linha, _ in grupo], dtype=np.float64)
+            if self.em_thread(modelo):
+                y = await asyncio.to_thread(self.predict_fn, modelo, X)
+            else:
+                y = self.predict_fn(modelo, X)
+            valores = np.asarray(y, dtype=np.float64).ravel().tolist()
+        except Exception as e:
+            logger.exception("Falha ao prever lote de %d linhas", len(grupo))
+            for _, _, fut in grupo:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, _, fut), v in zip(grupo, valores):
+            if not fut.done():
+                fut.set_result(v)
+
+    async def _loop(self) -> None:
+        while True:
+            lote = await self._coletar()
+            # Requisições canceladas (cliente desconectou) não entram no predict
+            lote = [item for item in lote if not item[2].done()]
+            if not lote:
+                continue
+            grupos: Dict[int, List[Item]] = {}
+            for item in lote:
+                grupos.setdefault(id(item[0]), []).append(item)
+            for grupo in grupos.values():
+                await self._pontuar(grupo[0][0], grupo)
+            self.lotes += 1
+            self.linhas += len(lote)
+            self.maior_lote = max(self.maior_lote, len(lote))
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "max_rows": self.max_rows,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.lotes,
+            "rows": self.linhas,
+            "mean_batch_size": round(self.linhas / self.lotes, 2) if self.lotes else 0.0,
+            "max_batch_size": self.maior_lote,
+            "queue_depth": self._fila.qsize() if self._fila is not None else 0,
+        }
@@ -0,0 +1,193 @@
+"""Benchmarks reprodutíveis: micro-benchmarks, carga ASGI em processo e comparação.
+
+Tudo roda offline numa máquina: a carga usa ``httpx.ASGITransport`` direto no
+app, sem rede nem servidor. Os resultados são dicts serializáveis em JSON para
+que duas execuções possam ser comparadas com ``comparar``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Métricas em que maior é melhor; o resto (latências) é menor-melhor
+MAIOR_MELHOR = ("throughput_rps",)
+
+
+def percentis(latencias: Sequence[float], ps: Sequence[float] = (50, 95, 99)) -> Dict[str, float]:
+    """Percentis em milissegundos (``p50``, ``p95``...) de latências em segundos."""
+    if not latencias:
+        return {f"p{p:g}": float("nan") for p in ps}
+    valores = np.percentile(np.asarray(latencias, dtype=np.float64) * 1000.0, ps)
+    return {f"p{p:g}": round(float(v), 4) for p, v in zip(ps, valores)}
+
+
+def micro(fn: Callable[[], object], repeticoes: int = 5, min_tempo: float = 0.2) -> Dict[str, float]:
+    """Tempo por chamada de ``fn`` em microssegundos (mediana e mínimo das repetições)."""
+    timer = timeit.Timer(fn)
+    loops, tempo = timer.autorange()
+    if tempo < min_tempo:
+        loops = max(1, int(loops * min_tempo / max(tempo, 1e-9)))
+    tempos = [t / loops * 1e6 for t in timer.repeat(repeat=repeticoes, number=loops)]
+    return {"median_us": round(statistics.median(tempos), 3), "min_us": round(min(tempos), 3), "loops": loops}
+
+
+def metadados() -> Dict[str, Any]:
+    """Ambiente da execução, para saber se duas rodadas são comparáveis."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    versoes = {"numpy": np.__version__}
+    for mod in ("sklearn", "pandas", "fastapi"):
+        m = sys.modules.get(mod)
+        if m is not None:
+            versoes[mod] = getattr(m, "__version__", "?")
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "versions": versoes,
+    }
+
+
+def ler_cenario(path: str) -> List[Dict[str, Any]]:
+    """Lê um cenário NDJSON: uma requisição por linha.
+
+    Campos: ``path`` (obrigatório), ``method`` (padrão POST se houver ``json``,
+    senão GET), ``json``, ``params``, ``content`` e ``headers``; ``repeat``
+    repete a linha. Linhas sem ``path`` (ex.: um ``requests.jsonl`` de backlog)
+    são ignoradas.
+    """
+    cenario: List[Dict[str, Any]] = []
+    with open(path, encoding="utf-8") as f:
+        for linha in f:
+            if not linha.strip():
+                continue
+            item = json.loads(linha)
+            if not isinstance(item, dict) or "path" not in item:
+                continue
+            req = {
+                "method": item.get("method", "POST" if "json" in item or "content" in item else "GET").upper(),
+                "path": item["path"],
+            }
+            for k in ("json", "params", "content", "headers"):
+                if k in item:
+                    req[k] = item[k]
+            cenario.extend([req] * int(item.get("repeat", 1)))
+    return cenario
+
+
+async def _carga(
+    app: Any,
+    requisicoes: Iterator[Dict[str, Any]],
+    concorrencia: int,
+    duracao: Optional[float],
+) -> Dict[str, Any]:
+    import httpx
+
+    latencias: List[float] = []
+    status: Dict[str, int] = {}
+    erros = 0
+    prazo = None if duracao is None else time.perf_counter() + duracao
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as cliente:
+
+        async def worker() -> None:
+            nonlocal erros
+            while prazo is None or time.perf_counter() < prazo:
+                try:
+                    req = next(requisicoes)
+                except StopIteration:
+                    return
+                kwargs = {k: v for k, v in req.items() if k not in ("method", "path")}
+                inicio = time.perf_counter()
+                try:
+                    r = await cliente.request(req["method"], req["path"], **kwargs)
+                except Exception:
+                    erros += 1
+                    continue
+                latencias.append(time.perf_counter() - inicio)
+                chave = str(r.status_code)
+                status[chave] = status.get(chave, 0) + 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(1, concorrencia))))
+        total = time.perf_counter() - inicio
+
+    return {
+        "concurrency": concorrencia,
+        "requests": len(latencias),
+        "errors": erros,
+        "status": status,
+        "seconds": round(total, 4),
+        "throughput_rps": round(len(latencias) / total, 2) if total > 0 else 0.0,
+        **percentis(latencias),
+    }
+
+
+def carga(
+    app: Any,
+    requisicoes: Iterable[Dict[str, Any]],
+    concorrencia: int = 8,
+    duracao: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Dispara ``requisicoes`` no app ASGI com ``concorrencia`` clientes simultâneos.
+
+    Para quando as requisições acabam ou, com ``duracao``, após tantos segundos.
+    Os eventos de startup/shutdown do app rodam em volta da carga.
+    """
+
+    async def rodar() -> Dict[str, Any]:
+        await app.router.startup()
+        try:
+            return await _carga(app, iter(requisicoes), concorrencia, duracao)
+        finally:
+            await app.router.shutdown()
+
+    return asyncio.run(rodar())
+
+
+def _metricas(resultado: Dict[str, Any]) -> Dict[str, float]:
+    """Achata o resultado em ``grupo/nome/metrica -> valor`` comparável."""
+    planas: Dict[str, float] = {}
+    for nome, r in resultado.get("micro", {}).items():
+        planas[f"micro/{nome}/median_us"] = r["median_us"]
+    for nome, r in resultado.get("load", {}).items():
+        for m in ("p50", "p95", "p99", "throughput_rps"):
+            if m in r:
+                planas[f"load/{nome}/{m}"] = r[m]
+    return planas
+
+
+def comparar(base: Dict[str, Any], atual: Dict[str, Any], tolerancia: float = 0.10) -> List[Dict[str, Any]]:
+    """Compara duas execuções; ``regression`` marca pioras acima de ``tolerancia``."""
+    b, a = _metricas(base), _metricas(atual)
+    linhas = []
+    for chave in sorted(b.keys() & a.keys()):
+        vb, va = b[chave], a[chave]
+        if not vb or vb != vb or va != va:  # zero ou NaN: sem variação relativa
+            continue
+        variacao = (va - vb) / vb
+        pior = -variacao if chave.rsplit("/", 1)[1] in MAIOR_MELHOR else variacao
+        linhas.append({
+            "metric": chave,
+            "base": vb,
+            "current": va,
+            "change": round(variacao, 4),
+            "regression": pior > tolerancia,
+        })
+    return linhas
@@ -0,0 +1,88 @@
+"""Cache LRU limitado, com TTL opcional, para resultados de previsão."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """Dicionário LRU com tamanho máximo e expiração opcional.
+
+    Seguro para uso concorrente no threadpool do FastAPI: todas as operações
+    passam por um único lock, que só protege operações O(1) no ``OrderedDict``.
+    ``maxsize=0`` desliga o cache (``get`` sempre erra, ``put`` não guarda nada).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize deve ser >= 0")
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._clock = clock
+        self._dados: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+    def get(self, chave: Hashable, contar_miss: bool = True) -> Optional[V]:
+        """Valor guardado para ``chave`` ou ``None`` (conta hit/miss).
+
+        ``contar_miss=False`` é para uma checagem prévia seguida do ``get`` de
+        verdade: o miss não é contado duas vezes.
+        """
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self.misses += contar_miss
+                return None
+            criado, valor = item
+            if self.ttl is not None and self._clock() - criado > self.ttl:
+                del self._dados[chave]
+                self.expirations += 1
+                self.misses += contar_miss
+                return None
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def put(self, chave: Hashable, valor: V) -> None:
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._dados[chave] = (self._clock(), valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.maxsize:
+                self._dados.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._dados),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -1,20 +1,148 @@
 """Console script for mlops_deploy."""
-import mlops_deploy
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
 
 import typer
 from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+
+from mlops_deploy.scoring import pontuar_arquivo
 
 app = typer.Typer()
 console = Console()
 
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join("models", "model.pkl"))
 
-@app.command()
+
+@app.callback()
 def main():
-    """Console script for mlops_deploy."""
-    console.print("Replace this message by putting your code into "
-               "mlops_deploy.cli.main")
-    console.print("See Typer documentation at https://typer.tiangolo.com/")
-    
+    """Ferramentas de linha de comando do mlops_deploy."""
+
+
+@app.command()
+def score(
+    entrada: Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV, NDJSON ou Parquet de entrada"),
+    saida: Path = typer.Argument(..., dir_okay=False, help="Arquivo de saída (.csv, .ndjson ou .parquet)"),
+    model_path: Path = typer.Option(MODEL_PATH, "--model-path", exists=True, dir_okay=False),
+    chunk_size: int = typer.Option(50_000, "--chunk-size", min=1, help="Linhas por bloco"),
+    workers: int = typer.Option(os.cpu_count() or 1, "--workers", min=1, help="Processos em paralelo"),
+):
+    """Pontua um arquivo inteiro offline, em blocos, com o mesmo modelo da API."""
+    inicio = time.perf_counter()
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold]{task.description}"),
+        TextColumn("{task.completed:,} linhas"),
+        TimeElapsedColumn(),
+        console=console,
+    ) as progress:
+        tarefa = progress.add_task(f"Pontuando {entrada.name}", total=None)
+        total = pontuar_arquivo(
+            str(entrada), str(saida), str(model_path),
+            chunk_size=chunk_size, workers=workers,
+            progresso=lambda n: progress.advance(tarefa, n),
+        )
+    duracao = time.perf_counter() - inicio
+    console.print(f"{total:,} linhas pontuadas em {duracao:.1f}s ({total / max(duracao, 1e-9):,.0f} linhas/s) -> {saida}")
+
+
+
+@app.command("export-model")
+def export_model(
+    model_path: Path = typer.Argument(Path(MODEL_PATH), exists=True, dir_okay=False),
+):
+    """Gera o artefato compacto (.npz + .json) ao lado do model.pkl."""
+    import joblib
+
+    from mlops_deploy import artefato
+    from mlops_deploy.registry import _predict_sklearn, hash_arquivo
+
+    estimator = joblib.load(model_path)
+    npz, manifesto = artefato.exportar(estimator, str(model_path), hash_arquivo(str(model_path)), _predict_sklearn(estimator))
+    console.print(f"Artefato compacto gravado em {npz} e {manifesto}")
+
+
+def _lista_grade(texto: str) -> list:
+    """"10,20,none" -> [10, 20, None] (inteiros, floats ou none)."""
+    valores = []
+    for item in texto.split(","):
+        item = item.strip().lower()
+        if item in ("none", "null"):
+            valores.append(None)
+        else:
+            valores.append(float(item) if "." in item else int(item))
+    return valores
+
+
+@app.command()
+def train(
+    data_path: Path = typer.Option(Path("data/processed/data_set.csv"), "--data", exists=True, dir_okay=False),
+    model_path: Path = typer.Option(Path(MODEL_PATH), "--model-path", dir_okay=False),
+    max_depth: str = typer.Option("10,20,30,none", help="Valores da grade, separados por vírgula"),
+    min_samples_split: str = typer.Option("2,5,10"),
+    min_samples_leaf: str = typer.Option("1,2,4"),
+    cv: int = typer.Option(5, min=2, help="Dobras da validação cruzada"),
+    test_size: float = typer.Option(0.2, min=0.0, max=0.9),
+    workers: int = typer.Option(os.cpu_count() or 1, "--workers", min=1, help="Processos em paralelo"),
+    cache_dir: Path = typer.Option(Path(".cache/treino"), "--cache-dir", help="Cache de dobras e ajustes"),
+    no_cache: bool = typer.Option(False, "--no-cache"),
+):
+    """Treina o modelo (busca em grade em paralelo) e grava model.pkl + artefato compacto."""
+    from mlops_deploy import treino
+
+    grade = {
+        "max_depth": _lista_grade(max_depth),
+        "min_samples_split": _lista_grade(min_samples_split),
+        "min_samples_leaf": _lista_grade(min_samples_leaf),
+    }
+    total = len(treino.combinacoes(grade)) * cv
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold]{task.description}"),
+        TextColumn("{task.completed}/{task.total} ajustes"),
+        TimeElapsedColumn(),
+        console=console,
+    ) as progress:
+        tarefa = progress.add_task("Busca em grade", total=total)
+        relatorio = treino.treinar(
+            str(data_path), str(model_path), grade,
+            cv=cv, test_size=test_size, n_jobs=workers,
+            cache_dir=None if no_cache else str(cache_dir),
+            progresso=lambda n: progress.advance(tarefa, n),
+        )
+    teste = relatorio["metrics"]["test"]
+    console.print(
+        f"Melhores parâmetros: {relatorio['best_params']} "
+        f"(ajustes novos: {relatorio['fits']['new']}, do cache: {relatorio['fits']['cached']})"
+    )
+    console.print(f"Teste: MSE {teste['mse']:.4f}  MAE {teste['mae']:.4f}  R² {teste['r2']:.4f}")
+    console.print(f"Modelo gravado em {model_path} em {relatorio['seconds']:.1f}s")
+
+
+@app.command()
+def audit(
+    db: Path = typer.Argument(..., exists=True, dir_okay=False, help="SQLite do log de auditoria (AUDIT_LOG_PATH)"),
+    desde: Optional[datetime] = typer.Option(None, "--desde", help="Início (inclusive), horário local"),
+    ate: Optional[datetime] = typer.Option(None, "--ate", help="Fim (exclusive), horário local"),
+    municipio: Optional[str] = typer.Option(None, "--municipio"),
+    limite: Optional[int] = typer.Option(None, "--limite", min=1),
+):
+    """Lista previsões registradas (NDJSON) por período e município."""
+    from mlops_deploy.auditoria import consultar
+
+    registros = consultar(
+        str(db),
+        inicio=desde.timestamp() if desde else None,
+        fim=ate.timestamp() if ate else None,
+        municipio=municipio,
+        limite=limite,
+    )
+    for r in registros:
+        print(json.dumps(r, ensure_ascii=False))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+"""Monitor de drift das features de entrada contra o data_set de treino.
+
+A referência é calculada uma vez a partir das colunas do data_set: para cada
+feature numérica, os quantis que definem ``bins`` faixas (a primeira e a
+última abertas), a proporção do data_set em cada faixa, média, desvio, mínimo
+e máximo.
+
+Cada linha prevista atualiza, por feature, média e variância (Welford), a
+contagem da faixa em que o valor caiu e quantas vezes ele ficou abaixo do
+mínimo ou acima do máximo do treino: O(1) em tempo e memória por linha. Os
+acumuladores são por thread (sem lock no caminho da requisição); o status
+junta todos na hora da consulta (Chan et al.), com PSI e KS por feature.
+
+Lotes são agregados com numpy (uma média, uma variância e um ``searchsorted``
+por coluna) e somados ao acumulador da thread como um bloco só.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.features import CAMPOS, IDX_MUNICIPIO
+
+# Faixas usuais de PSI: < 0.1 estável, < 0.25 moderado, acima disso alto
+PSI_MODERADO = 0.1
+PSI_ALTO = 0.25
+# Proporção mínima por faixa no PSI (evita log(0) com faixas vazias)
+EPS = 1e-4
+
+
+class Referencia:
+    """Distribuição de referência por feature, a partir de colunas do treino."""
+
+    def __init__(self, colunas: npt.ArrayLike, bins: int = 10) -> None:
+        # colunas: (len(CAMPOS), n_linhas) na ordem de COLUNAS, como FeatureStore.colunas
+        colunas = np.asarray(colunas, dtype=np.float64)
+        self.indices = [j for j in range(len(CAMPOS)) if j != IDX_MUNICIPIO]
+        self.campos = [CAMPOS[j] for j in self.indices]
+        self.linhas = colunas.shape[1]
+        self.bordas: List[List[float]] = []
+        self.proporcoes: List[List[float]] = []
+        for j in self.indices:
+            x = colunas[j]
+            bordas = np.unique(np.quantile(x, np.linspace(0, 1, bins + 1)[1:-1]))
+            contagem = np.bincount(np.searchsorted(bordas, x), minlength=len(bordas) + 1)
+            self.bordas.append(bordas.tolist())
+            self.proporcoes.append((contagem / len(x)).tolist())
+        sel = colunas[self.indices]
+        self.media = sel.mean(axis=1).tolist()
+        self.desvio = sel.std(axis=1).tolist()
+        self.minimo = sel.min(axis=1).tolist()
+        self.maximo = sel.max(axis=1).tolist()
+        # (k, coluna, bordas, mínimo, máximo): o laço por linha não busca atributos
+        self.por_feature = list(zip(range(len(self.indices)), self.indices, self.bordas, self.minimo, self.maximo))
+
+    @classmethod
+    def do_store(cls, store: Any, bins: int = 10) -> "Referencia":
+        return cls(store.colunas, bins)
+
+
+class _Acumulador:
+    """Estatísticas de uma thread; só ela escreve, o status só lê."""
+
+    __slots__ = ("n", "media", "m2", "contagens", "abaixo", "acima")
+
+    def __init__(self, ref: Referencia) -> None:
+        k = len(ref.indices)
+        self.n = 0
+        self.media = [0.0] * k
+        self.m2 = [0.0] * k
+        self.contagens = [[0] * len(p) for p in ref.proporcoes]
+        self.abaixo = [0] * k
+        self.acima = [0] * k
+
+
+class MonitorDrift:
+    """Atualiza as estatísticas por linha ou lote e compara com a referência."""
+
+    def __init__(self, ref: Referencia, min_linhas: int = 100) -> None:
+        self.ref = ref
+        self.min_linhas = min_linhas
+        self._local = threading.local()
+        self._acumuladores: List[_Acumulador] = []
+        self._lock = threading.Lock()  # só na criação do acumulador de uma thread nova
+
+    def _acumulador(self) -> _Acumulador:
+        a = getattr(self._local, "a", None)
+        if a is None:
+            a = self._local.a = _Acumulador(self.ref)
+            with self._lock:
+                self._acumuladores.append(a)
+        return a
+
+    def observar(self, linha: Sequence[float]) -> None:
+        """Uma linha na ordem de COLUNAS (o município é ignorado)."""
+        a = self._acumulador()
+        a.n += 1
+        n = a.n
+        media, m2, contagens = a.media, a.m2, a.contagens
+        for k, j, bordas, lo, hi in self.ref.por_feature:
+            x = float(linha[j])
+            d = x - media[k]
+            media[k] += d / n
+            m2[k] += d * (x - media[k])
+            contagens[k][bisect_left(bordas, x)] += 1
+            if x < lo:
+                a.abaixo[k] += 1
+            elif x > hi:
+                a.acima[k] += 1
+
+    def observar_lote(self, X: npt.ArrayLike) -> None:
+        """Várias linhas (n x len(COLUNAS)) de uma vez, agregadas com numpy."""
+        X = np.asarray(X, dtype=np.float64)
+        nb = len(X)
+        if nb == 0:
+            return
+        ref = self.ref
+        sel = X[:, ref.indices]
+        media_b = sel.mean(axis=0)
+        m2_b = ((sel - media_b) ** 2).sum(axis=0)
+        abaixo = (sel < np.asarray(ref.minimo)).sum(axis=0).tolist()
+        acima = (sel > np.asarray(ref.maximo)).sum(axis=0).tolist()
+        a = self._acumulador()
+        na = a.n
+        n = na + nb
+        for k, (mb, qb) in enumerate(zip(media_b.tolist(), m2_b.tolist())):
+            d = mb - a.media[k]
+            a.media[k] += d * nb / n
+            a.m2[k] += qb + d * d * na * nb / n
+            bordas = ref.bordas[k]
+            contagem = np.bincount(np.searchsorted(bordas, sel[:, k]), minlength=len(bordas) + 1)
+            faixas = a.contagens[k]
+            for i, c in enumerate(contagem.tolist()):
+                faixas[i] += c
+            a.abaixo[k] += abaixo[k]
+            a.acima[k] += acima[k]
+        a.n = n
+
+    @property
+    def linhas(self) -> int:
+        with self._lock:
+            return sum(a.n for a in self._acumuladores)
+
+    def _juntar(self) -> _Acumulador:
+        with self._lock:
+            acumuladores = list(self._acumuladores)
+        total = _Acumulador(self.ref)
+        for a in acumuladores:
+            nb = a.n
+            if nb == 0:
+                continue
+            na = total.n
+            n = na + nb
+            for k in range(len(total.media)):
+                d = a.media[k] - total.media[k]
+                total.media[k] += d * nb / n
+                total.m2[k] += a.m2[k] + d * d * na * nb / n
+                total.contagens[k] = [x + y for x, y in zip(total.contagens[k], a.contagens[k])]
+                total.abaixo[k] += a.abaixo[k]
+                total.acima[k] += a.acima[k]
+            total.n = n
+        return total
+
+    def status(self) -> Dict[str, Any]:
+        """PSI, KS (sobre as faixas) e deslocamento da média por feature."""
+        ref = self.ref
+        total = self._juntar()
+        n = total.n
+        features: Dict[str, Dict[str, Any]] = {}
+        for k, campo in enumerate(ref.campos):
+            psi = ks = None
+            if n:
+                obs = np.array(total.contagens[k]) / n
+                esp = np.array(ref.proporcoes[k])
+                o, e = np.maximum(obs, EPS), np.maximum(esp, EPS)
+                psi = round(float(((o - e) * np.log(o / e)).sum()), 6)
+                ks = round(float(np.abs(np.cumsum(obs) - np.cumsum(esp)).max()), 6)
+            desvio = math.sqrt(total.m2[k] / n) if n else None
+            features[campo] = {
+                "psi": psi,
+                "ks": ks,
+                "level": nivel(psi) if n >= self.min_linhas else None,
+                "mean": round(total.media[k], 6) if n else None,
+                "std": round(desvio, 6) if desvio is not None else None,
+                "ref_mean": round(ref.media[k], 6),
+                "ref_std": round(ref.desvio[k], 6),
+                "mean_shift_std": round((total.media[k] - ref.media[k]) / ref.desvio[k], 4)
+                if n and ref.desvio[k] > 0 else None,
+                "below_min": total.abaixo[k] / n if n else 0.0,
+                "above_max": total.acima[k] / n if n else 0.0,
+            }
+        return {
+            "reference_rows": ref.linhas,
+            "observed_rows": n,
+            "min_rows": self.min_linhas,
+            "features": features,
+        }
+
+
+def nivel(psi: Optional[float]) -> Optional[str]:
+    if psi is None:
+        return None
+    if psi < PSI_MODERADO:
+        return "estavel"
+    return "moderado" if psi < PSI_ALTO else "alto"
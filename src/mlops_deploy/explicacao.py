@@ -0,0 +1,115 @@
+"""Explicação de previsões pelo caminho de decisão da árvore.
+
+A previsão de uma folha é o valor da raiz mais a soma das variações de valor
+em cada split do caminho; cada variação é atribuída à feature do split
+(contribuições no estilo "treeinterpreter"). Todas as linhas que caem na mesma
+folha têm o mesmo caminho e as mesmas contribuições, então elas são
+calculadas uma vez por folha e guardadas; um lote vira um ``apply`` vetorizado
+mais uma indexação pelas folhas distintas.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.features import CAMPOS
+from mlops_deploy.tree import TREE_LEAF, CompiledTree
+
+FloatArray = npt.NDArray[np.float64]
+
+
+class Explicador:
+    """Caminho e contribuições por folha de uma ``CompiledTree`` (cache preenchido sob demanda)."""
+
+    def __init__(self, arvore: CompiledTree, versao: str = "") -> None:
+        self.arvore = arvore
+        self.versao = versao
+        self.base = float(arvore.value[0])
+        pai = np.full(arvore.node_count, -1, dtype=np.intp)
+        internos = np.flatnonzero(arvore.children_left != TREE_LEAF)
+        pai[arvore.children_left[internos]] = internos
+        pai[arvore.children_right[internos]] = internos
+        self._pai: List[int] = pai.tolist()
+        # folha -> _Folha; escrita idempotente, então dispensa lock
+        self._folhas: Dict[int, _Folha] = {}
+
+    def __len__(self) -> int:
+        return len(self._folhas)
+
+    def _da_folha(self, folha: int) -> "_Folha":
+        salvo = self._folhas.get(folha)
+        if salvo is None:
+            salvo = self._folhas[folha] = _Folha(self.arvore, self._pai, folha)
+        return salvo
+
+    def caminho(self, folha: int) -> Tuple[int, ...]:
+        return self._da_folha(int(folha)).caminho
+
+    def contribuicoes(self, folhas: npt.ArrayLike) -> FloatArray:
+        """Matriz (n x n_features) de contribuições para as folhas dadas."""
+        folhas = np.asarray(folhas, dtype=np.intp)
+        unicas, inverso = np.unique(folhas, return_inverse=True)
+        por_folha = np.stack([self._da_folha(f).contrib for f in unicas.tolist()]) if len(unicas) else \
+            np.zeros((0, self.arvore.n_features))
+        return por_folha[inverso]
+
+    def contribuicoes_campos(self, folha: int) -> Dict[str, float]:
+        """Contribuições não nulas da folha por nome de campo (dict compartilhado, não alterar)."""
+        return self._da_folha(int(folha)).contrib_dict
+
+    def explicar(self, X: npt.ArrayLike) -> Tuple[npt.NDArray[np.intp], FloatArray, FloatArray]:
+        """(folhas, previsões, contribuições) de um lote num único ``apply``."""
+        folhas = self.arvore.apply(X)
+        return folhas, self.arvore.value[folhas], self.contribuicoes(folhas)
+
+    def explicar_um(self, linha: Sequence[float]) -> Tuple[int, Dict[str, float], List[Dict[str, Any]]]:
+        """(folha, contribuições por campo, passos do caminho) de uma linha.
+
+        Anda na árvore em Python puro, sem o custo fixo do caminho vetorizado;
+        só o valor de cada campo testado sai da linha, o resto vem do cache.
+        """
+        folha = self.arvore.apply_one(linha)
+        f = self._da_folha(folha)
+        passos = [{**passo, "valor": float(linha[j])} for passo, j in f.passos]
+        return folha, f.contrib_dict, passos
+
+    def passos(self, folha: int, linha: Sequence[float]) -> List[Dict[str, Any]]:
+        """Cada split do caminho até ``folha``: campo, threshold, valor da linha e variação."""
+        return [{**passo, "valor": float(linha[j])} for passo, j in self._da_folha(int(folha)).passos]
+
+
+class _Folha:
+    """O que é comum a todas as linhas de uma folha: caminho, contribuições e passos."""
+
+    __slots__ = ("caminho", "contrib", "contrib_dict", "passos")
+
+    def __init__(self, arvore: CompiledTree, pai: Sequence[int], folha: int) -> None:
+        caminho = [folha]
+        while pai[caminho[-1]] != -1:
+            caminho.append(pai[caminho[-1]])
+        caminho.reverse()
+        self.caminho = tuple(caminho)
+        valor = arvore.value.tolist()
+        contrib = np.zeros(arvore.n_features, dtype=np.float64)
+        self.passos: List[Tuple[Dict[str, Any], int]] = []
+        for no, filho in zip(caminho, caminho[1:]):
+            j = int(arvore.feature[no])
+            contrib[j] += valor[filho] - valor[no]
+            self.passos.append(({
+                "no": no,
+                "campo": CAMPOS[j],
+                "threshold": float(arvore.threshold[no]),
+                "lado": "<=" if filho == arvore.children_left[no] else ">",
+                "antes": valor[no],
+                "depois": valor[filho],
+            }, j))
+        contrib.setflags(write=False)
+        self.contrib = contrib
+        self.contrib_dict = contribuicoes_dict(contrib)
+
+
+def contribuicoes_dict(contrib: Sequence[float], casas: int = 6) -> Dict[str, float]:
+    """Contribuições não nulas por nome de campo da API."""
+    return {campo: round(float(c), casas) for campo, c in zip(CAMPOS, contrib) if c != 0}
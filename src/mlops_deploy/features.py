@@ -0,0 +1,20 @@
+"""Ordem das features que o modelo espera."""
+
+# Nomes das colunas no treino (``feature_names_in_`` do modelo)
+COLUNAS = (
+    'Ano', 'Municipio', 'IDEB',
+    'Ensino fundamental_docentes', 'Ensino fundamental_escolas', 'Ensino fundamental_matrículas',
+    'Ensino infantil_docentes', 'Ensino infantil_escolas', 'Ensino infantil_matrículas',
+    'Ensino médio_docentes', 'Ensino médio_escolas', 'Ensino médio_matrículas',
+)
+
+# Campos equivalentes do payload ``Dados`` da API, na mesma ordem
+CAMPOS = (
+    'ano', 'municipio', 'ideb',
+    'ensino_fundamental_docentes', 'ensino_fundamental_escolas', 'ensino_fundamental_matriculas',
+    'ensino_infantil_docentes', 'ensino_infantil_escolas', 'ensino_infantil_matriculas',
+    'ensino_medio_docentes', 'ensino_medio_escolas', 'ensino_medio_matriculas',
+)
+
+# Posição da coluna de município (codificada pelo ``MunicipioEncoder``)
+IDX_MUNICIPIO = CAMPOS.index('municipio')
@@ -0,0 +1,209 @@
+"""Formatos compactos de requisição e resposta, escolhidos pelo Content-Type.
+
+Além do JSON com um objeto ``Dados`` por registro, os endpoints de previsão
+aceitam:
+
+* ``application/x-positional+json``: uma linha ``[ano, municipio, ideb, ...]``
+  (ordem de ``CAMPOS``) ou uma lista de linhas. O município vai pelo nome ou
+  pelo código do ``MunicipioEncoder``.
+* ``application/x-npy``: um ``.npy`` (n x 12 ou 12) na ordem de ``COLUNAS``,
+  com o município já como código. Em float64 little-endian o array é uma view
+  direta do corpo da requisição, sem cópia.
+* ``application/vnd.apache.arrow.stream``: tabela Arrow IPC com as colunas de
+  ``CAMPOS`` (requer ``pyarrow``).
+
+A resposta compacta é só o vetor de previsões, no formato do ``Accept`` ou,
+sem preferência, no mesmo formato da requisição. Município desconhecido vira
+código -1 na leitura e ``null``/NaN na resposta, sem derrubar as outras linhas.
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.features import CAMPOS, COLUNAS, IDX_MUNICIPIO
+from mlops_deploy.municipios import MunicipioEncoder
+
+try:  # opcional: só usado se o pacote estiver instalado
+    import pyarrow as pa  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depende do ambiente
+    pa = None
+
+JSON = "application/json"
+POSICIONAL = "application/x-positional+json"
+NPY = "application/x-npy"
+ARROW = "application/vnd.apache.arrow.stream"
+
+COMPACTOS = (POSICIONAL, NPY, ARROW)
+
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.int64]
+
+
+class FormatoInvalido(ValueError):
+    """Corpo que não segue o formato declarado no Content-Type."""
+
+
+class FormatoNaoSuportado(ValueError):
+    """Formato conhecido, mas indisponível neste servidor (ex.: Arrow sem pyarrow)."""
+
+
+def tipo_midia(content_type: Optional[str]) -> str:
+    """Tipo de mídia sem parâmetros (``; charset=...``), em minúsculas."""
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def formato_resposta(accept: Optional[str], pedido: str) -> str:
+    """Primeiro formato suportado no ``Accept`` (com q > 0), ou o da requisição."""
+    for item in (accept or "").split(","):
+        tipo, *params = item.split(";")
+        tipo = tipo.strip().lower()
+        q = 1.0
+        for param in params:
+            chave, _, valor = param.strip().partition("=")
+            if chave == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        if q <= 0:
+            continue
+        if tipo == JSON or tipo in COMPACTOS:
+            if tipo == ARROW and pa is None:
+                continue
+            return tipo
+    return pedido
+
+
+def _validar(X: FloatArray) -> None:
+    with np.errstate(over="ignore", invalid="ignore"):
+        finitos = np.isfinite(X.astype(np.float32))
+    if not finitos.all():
+        linha = int(np.flatnonzero(~finitos.all(axis=1))[0])
+        raise FormatoInvalido(f"Linha {linha}: valores nulos, infinitos ou fora do alcance de float32")
+
+
+def _codigos(valores: Sequence[Any], encoder: MunicipioEncoder) -> IntArray:
+    """Nome ou código de cada município; inválidos viram -1."""
+    codigos = encoder.encode_many(valores)
+    for i, v in enumerate(valores):
+        if isinstance(v, int) and not isinstance(v, bool):
+            codigos[i] = v if 0 <= v < len(encoder) else -1
+    return codigos
+
+
+def ler_posicional(corpo: bytes, encoder: MunicipioEncoder) -> Tuple[FloatArray, bool]:
+    """(matriz n x 12 na ordem de COLUNAS, se era uma linha só)."""
+    try:
+        linhas = json.loads(corpo)
+    except ValueError as e:
+        raise FormatoInvalido(f"JSON inválido: {e}") from None
+    if not isinstance(linhas, list) or not linhas:
+        raise FormatoInvalido("Esperada uma linha ou uma lista de linhas")
+    unica = not isinstance(linhas[0], list)
+    if unica:
+        linhas = [linhas]
+    n = len(CAMPOS)
+    for i, linha in enumerate(linhas):
+        if not isinstance(linha, list) or len(linha) != n:
+            raise FormatoInvalido(f"Linha {i}: esperados {n} valores na ordem {list(CAMPOS)}")
+    codigos = _codigos([linha[IDX_MUNICIPIO] for linha in linhas], encoder)
+    for linha in linhas:
+        linha[IDX_MUNICIPIO] = 0
+    try:
+        X = np.array(linhas, dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise FormatoInvalido(f"Valor não numérico: {e}") from None
+    _validar(X)
+    X[:, IDX_MUNICIPIO] = codigos
+    return X, unica
+
+
+def ler_npy(corpo: bytes, encoder: MunicipioEncoder) -> Tuple[FloatArray, bool]:
+    """Matriz do ``.npy``; em ``<f8`` é uma view somente leitura de ``corpo``."""
+    f = io.BytesIO(corpo)
+    try:
+        versao = np.lib.format.read_magic(f)
+        if versao == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+    except ValueError as e:
+        raise FormatoInvalido(f".npy inválido: {e}") from None
+    if dtype.hasobject or dtype.kind not in "fiu":
+        raise FormatoInvalido(f".npy precisa ser numérico, não {dtype}")
+    unica = len(shape) == 1
+    if unica:
+        shape = (1,) + tuple(shape)
+    if len(shape) != 2 or shape[1] != len(COLUNAS):
+        raise FormatoInvalido(f".npy precisa ter forma (n, {len(COLUNAS)}) na ordem {list(COLUNAS)}")
+    n = shape[0] * shape[1]
+    if len(corpo) - f.tell() != n * dtype.itemsize:
+        raise FormatoInvalido(".npy truncado ou com bytes sobrando")
+    X = np.frombuffer(corpo, dtype=dtype, count=n, offset=f.tell()).reshape(shape, order="F" if fortran else "C")
+    if X.dtype != np.float64 or not X.flags.c_contiguous:
+        X = np.ascontiguousarray(X, dtype=np.float64)
+    _validar(X)
+    # Código fracionário ou fora da faixa: linha inválida (-1), como um nome desconhecido
+    m = X[:, IDX_MUNICIPIO]
+    invalidos = (m != np.floor(m)) | (m < 0) | (m >= len(encoder))
+    if invalidos.any():
+        X = X.copy()
+        X[invalidos, IDX_MUNICIPIO] = -1
+    return X, unica
+
+
+def ler_arrow(corpo: bytes, encoder: MunicipioEncoder) -> Tuple[FloatArray, bool]:
+    """Matriz a partir de uma tabela Arrow IPC (stream) com as colunas de ``CAMPOS``."""
+    if pa is None:
+        raise FormatoNaoSuportado("Formato Arrow requer o pacote pyarrow")
+    try:
+        tabela = pa.ipc.open_stream(corpo).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise FormatoInvalido(f"Arrow IPC inválido: {e}") from None
+    faltando = [c for c in CAMPOS if c not in tabela.column_names]
+    if faltando:
+        raise FormatoInvalido(f"Colunas ausentes: {faltando}")
+    X = np.empty((tabela.num_rows, len(CAMPOS)), dtype=np.float64)
+    for j, campo in enumerate(CAMPOS):
+        coluna = tabela.column(campo)
+        if j == IDX_MUNICIPIO:
+            X[:, j] = _codigos(coluna.to_pylist(), encoder)
+            continue
+        try:
+            X[:, j] = coluna.to_numpy(zero_copy_only=False)
+        except (TypeError, ValueError, pa.ArrowInvalid) as e:
+            raise FormatoInvalido(f"Coluna {campo}: {e}") from None
+    _validar(X)
+    return X, False
+
+
+LEITORES = {POSICIONAL: ler_posicional, NPY: ler_npy, ARROW: ler_arrow}
+
+
+def ler(formato: str, corpo: bytes, encoder: MunicipioEncoder) -> Tuple[FloatArray, bool]:
+    """Matriz (código -1 nas linhas de município inválido) e se o corpo era uma linha só."""
+    return LEITORES[formato](corpo, encoder)
+
+
+def serializar(y: FloatArray, formato: str) -> bytes:
+    """Vetor de previsões (NaN = linha inválida) no formato compacto pedido."""
+    y = np.round(np.asarray(y, dtype=np.float64), 2)
+    if formato == NPY:
+        buf = io.BytesIO()
+        np.save(buf, y)
+        return buf.getvalue()
+    if formato == ARROW:
+        if pa is None:
+            raise FormatoNaoSuportado("Formato Arrow requer o pacote pyarrow")
+        tabela = pa.table({"TotalCrimesPrevisto": pa.array(y, from_pandas=True)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        return bytes(sink.getvalue())
+    valores: List[Optional[float]] = [None if v != v else v for v in y.tolist()]
+    return json.dumps(valores).encode("utf-8")
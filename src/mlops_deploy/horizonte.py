@@ -0,0 +1,98 @@
+"""Projeção de vários anos à frente por município, vetorizada.
+
+Na carga, para cada município do feature store, guarda-se o último ano
+observado, as features naquele ano e a inclinação de cada feature contra o
+ano (mínimos quadrados sobre o histórico do município, todos de uma vez com
+somas agrupadas). Uma projeção é só aritmética de arrays: o tensor
+(municípios x anos x features) sai de um broadcast e vai inteiro para um
+único ``predict``.
+
+O data_set está padronizado, inclusive ``Ano``: um ano à frente é o
+espaçamento entre anos consecutivos do data_set (``passo``) e as taxas
+informadas pelo chamador são variações por ano nas mesmas unidades das
+features da API.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.features import CAMPOS, IDX_MUNICIPIO
+from mlops_deploy.municipios import MUNICIPIOS
+from mlops_deploy.store import IDX_ANO, FeatureStore
+
+ULTIMO = "ultimo"
+TENDENCIA = "tendencia"
+TAXAS = "taxas"
+POLITICAS = (ULTIMO, TENDENCIA, TAXAS)
+
+FloatArray = npt.NDArray[np.float64]
+
+
+class Tendencias:
+    """Último valor e inclinação por (município, feature), calculados uma vez."""
+
+    def __init__(self, store: FeatureStore) -> None:
+        codigos = store.codigos.astype(np.intp)
+        F = store.colunas.T.astype(np.float64)  # (linhas, features)
+        t = F[:, IDX_ANO]
+        m = len(MUNICIPIOS)
+        self.n = np.bincount(codigos, minlength=m)
+        sx = np.bincount(codigos, t, minlength=m)
+        sxx = np.bincount(codigos, t * t, minlength=m)
+        sy = np.zeros((m, F.shape[1]))
+        sxy = np.zeros((m, F.shape[1]))
+        np.add.at(sy, codigos, F)
+        np.add.at(sxy, codigos, F * t[:, None])
+        denom = self.n * sxx - sx * sx
+        com_reta = denom > 1e-12  # ao menos dois anos distintos
+        self.inclinacao = np.zeros_like(sy)
+        self.inclinacao[com_reta] = (
+            (self.n[com_reta, None] * sxy[com_reta] - sx[com_reta, None] * sy[com_reta]) / denom[com_reta, None]
+        )
+        self.inclinacao[:, [IDX_ANO, IDX_MUNICIPIO]] = 0.0
+
+        self.ultimo_ano = np.full(m, -np.inf)
+        np.maximum.at(self.ultimo_ano, codigos, t)
+        ultimas = t == self.ultimo_ano[codigos]
+        self.ultimo = np.zeros_like(sy)
+        self.ultimo[codigos[ultimas]] = F[ultimas]
+        anos = np.unique(np.round(t, 4))
+        self.passo = float(np.median(np.diff(anos))) if len(anos) > 1 else 1.0
+
+    def tem_historico(self, codigos: npt.ArrayLike) -> npt.NDArray[np.bool_]:
+        return self.n[np.asarray(codigos, dtype=np.intp)] > 0
+
+    def tensor(
+        self,
+        codigos: npt.ArrayLike,
+        anos: int,
+        politica: str = TENDENCIA,
+        taxas: Optional[Dict[str, float]] = None,
+    ) -> Tuple[FloatArray, FloatArray]:
+        """(anos projetados (m x h), matriz (m*h x features)) na ordem município, ano.
+
+        ``ultimo`` repete as features do último ano; ``tendencia`` segue a reta
+        do município a partir do último valor; ``taxas`` soma a variação anual
+        dada a cada campo listado e mantém os demais no último valor.
+        """
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconhecida: {politica!r}")
+        codigos = np.asarray(codigos, dtype=np.intp)
+        k = np.arange(1, anos + 1, dtype=np.float64) * self.passo  # (h,)
+        base = self.ultimo[codigos][:, None, :]  # (m, 1, F)
+        if politica == ULTIMO:
+            X = np.repeat(base, anos, axis=1)
+        elif politica == TENDENCIA:
+            X = base + self.inclinacao[codigos][:, None, :] * k[None, :, None]
+        else:
+            variacao = np.zeros(len(CAMPOS))
+            for campo, taxa in (taxas or {}).items():
+                variacao[CAMPOS.index(campo)] = taxa / self.passo  # por ano -> por unidade de Ano
+            X = base + variacao[None, None, :] * k[None, :, None]
+        t = self.ultimo_ano[codigos][:, None] + k[None, :]
+        X[:, :, IDX_ANO] = t
+        X[:, :, IDX_MUNICIPIO] = codigos[:, None]
+        return t, X.reshape(-1, len(CAMPOS))
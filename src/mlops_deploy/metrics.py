@@ -0,0 +1,161 @@
+"""Métricas leves de latência e contadores no formato texto do Prometheus.
+
+Spans medidos com ``time.perf_counter`` (monotônico) alimentam histogramas de
+buckets fixos; nada é guardado por amostra, então o custo por observação é uma
+busca binária e dois incrementos. A exportação copia os números sob o lock e
+formata fora dele.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Buckets em segundos: estágios do predict ficam na casa dos microssegundos
+BUCKETS_PADRAO = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    """Contagens por bucket (não cumulativas), soma e total de observações."""
+
+    __slots__ = ("limites", "contagens", "soma", "total")
+
+    def __init__(self, limites: Sequence[float]) -> None:
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)  # último = +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class _Span:
+    __slots__ = ("metricas", "nome", "labels", "inicio")
+
+    def __init__(self, metricas: "Metricas", nome: str, labels: Labels) -> None:
+        self.metricas = metricas
+        self.nome = nome
+        self.labels = labels
+
+    def __enter__(self) -> "_Span":
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.metricas._observar(self.nome, self.labels, time.perf_counter() - self.inicio)
+
+
+def _labels(kwargs: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in kwargs.items()))
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(labels) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Metricas:
+    """Registro de histogramas, contadores e gauges de uma instância (worker)."""
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS_PADRAO) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._ajuda: Dict[str, Tuple[str, str]] = {}  # nome -> (tipo, ajuda)
+        self._histogramas: Dict[str, Dict[Labels, Histograma]] = {}
+        self._contadores: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Callable[[], Dict[Labels, float]]] = {}
+
+    def descrever(self, nome: str, tipo: str, ajuda: str) -> None:
+        self._ajuda[nome] = (tipo, ajuda)
+
+    def span(self, nome: str, **labels: object) -> _Span:
+        """``with metricas.span("estagio", stage="predict"):`` mede o bloco."""
+        return _Span(self, nome, _labels(labels))
+
+    def observar(self, nome: str, valor: float, **labels: object) -> None:
+        self._observar(nome, _labels(labels), valor)
+
+    def _observar(self, nome: str, labels: Labels, valor: float) -> None:
+        with self._lock:
+            series = self._histogramas.setdefault(nome, {})
+            h = series.get(labels)
+            if h is None:
+                h = series[labels] = Histograma(self.buckets)
+            h.observar(valor)
+
+    def incrementar(self, nome: str, valor: float = 1.0, **labels: object) -> None:
+        chave = _labels(labels)
+        with self._lock:
+            series = self._contadores.setdefault(nome, {})
+            series[chave] = series.get(chave, 0.0) + valor
+
+    def gauge(self, nome: str, ajuda: str, fn: Callable[[], Dict[Labels, float]]) -> None:
+        """Gauge calculado na hora da exportação; ``fn`` devolve {labels: valor}."""
+        self.descrever(nome, "gauge", ajuda)
+        self._gauges[nome] = fn
+
+    def valor(self, nome: str, **labels: object) -> float:
+        """Valor de um contador (0 se não existir); útil em testes."""
+        with self._lock:
+            return self._contadores.get(nome, {}).get(_labels(labels), 0.0)
+
+    def histograma(self, nome: str, **labels: object) -> Optional[Histograma]:
+        with self._lock:
+            return self._histogramas.get(nome, {}).get(_labels(labels))
+
+    def exportar(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        with self._lock:
+            contadores = {n: dict(s) for n, s in self._contadores.items()}
+            histogramas = {
+                n: {l: (list(h.contagens), h.soma, h.total) for l, h in s.items()}
+                for n, s in self._histogramas.items()
+            }
+        linhas: List[str] = []
+
+        def cabecalho(nome: str, tipo: str) -> None:
+            ajuda = self._ajuda.get(nome, (tipo, ""))[1]
+            if ajuda:
+                linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+
+        for nome, series in sorted(contadores.items()):
+            cabecalho(nome, "counter")
+            for labels, v in sorted(series.items()):
+                linhas.append(f"{nome}{_fmt_labels(labels)} {_fmt_num(v)}")
+        for nome, series_h in sorted(histogramas.items()):
+            cabecalho(nome, "histogram")
+            limites = self.buckets + (float("inf"),)
+            for labels, (contagens, soma, total) in sorted(series_h.items()):
+                acumulado = 0
+                for limite, c in zip(limites, contagens):
+                    acumulado += c
+                    linhas.append(f"{nome}_bucket{_fmt_labels(labels, ('le', _fmt_num(limite)))} {acumulado}")
+                linhas.append(f"{nome}_sum{_fmt_labels(labels)} {_fmt_num(soma)}")
+                linhas.append(f"{nome}_count{_fmt_labels(labels)} {total}")
+        for nome, fn in sorted(self._gauges.items()):
+            cabecalho(nome, "gauge")
+            for labels, v in sorted(fn().items()):
+                linhas.append(f"{nome}{_fmt_labels(labels)} {_fmt_num(v)}")
+        return "\n".join(linhas) + "\n"
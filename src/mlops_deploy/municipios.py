@@ -0,0 +1,97 @@
+"""Label encoding dos municípios usado no treino do modelo.
+
+A posição de cada nome em ``MUNICIPIOS`` é o código que o modelo recebe na coluna
+``Municipio``. Este módulo é o único lugar onde esse mapeamento vive; a API e a
+CLI usam o ``encoder`` daqui.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+MUNICIPIOS = (
+    'abreu e lima', 'afogados da ingazeira', 'agrestina', 'altinho',
+    'amaraji', 'angelim', 'araripina', 'arcoverde', 'barra de guabiraba',
+    'barreiros', 'belo jardim', 'bezerros', 'bom conselho', 'bom jardim',
+    'bonito', 'brejo da madre de deus', 'buenos aires',
+    'cabo de santo agostinho', 'cachoeirinha', 'camaragibe', 'camutanga',
+    'canhotinho', 'capoeiras', 'carpina', 'caruaru', 'casinhas', 'catende',
+    'cedro', 'condado', 'correntes', 'cumaru', 'cupira', 'dormentes', 'escada',
+    'exu', 'feira nova', 'ferreiros', 'flores', 'floresta', 'frei miguelinho',
+    'gameleira', 'garanhuns', 'goiana', 'granito', 'iati', 'ibimirim',
+    'ibirajuba', 'igarassu', 'ipojuca', 'ipubi', 'itacuruba', 'itapissuma',
+    'itaquitinga', 'jaqueira', 'joaquim nabuco', 'jucati', 'jupi', 'jurema',
+    'lagoa do carro', 'lagoa do ouro', 'lagoa dos gatos', 'lagoa grande',
+    'lajedo', 'limoeiro', 'macaparana', 'machados', 'maraial', 'mirandiba',
+    'moreno', 'olinda', 'ouricuri', 'palmares', 'palmeirina', 'panelas',
+    'paranatama', 'parnamirim', 'passira', 'paudalho', 'paulista', 'pedra',
+    'pesqueira', 'petrolina', 'pombos', 'primavera', 'recife',
+    'riacho das almas', 'rio formoso', 'salgueiro', 'santa cruz',
+    'santa cruz da baixa verde', 'santa cruz do capibaribe',
+    'santa filomena', 'santa maria da boa vista', 'serra talhada', 'serrita',
+    'surubim', 'tabira', 'tacaratu', 'taquaritinga do norte', 'terezinha',
+    'terra nova', 'toritama', 'trindade', 'triunfo', 'tupanatinga',
+    'venturosa', 'verdejante', 'brejinho', 'carnaubeira da penha',
+    'itapetim', 'manari', 'quixaba', 'santa terezinha', 'tuparetama',
+    'ingazeira', 'salgadinho'
+)
+
+_ESPACOS = re.compile(r"\s+")
+
+
+class MunicipioInvalido(ValueError):
+    """Nome que não corresponde a nenhum município conhecido pelo modelo."""
+
+
+def normalizar(nome: str) -> str:
+    """Remove acentos, colapsa espaços e ignora maiúsculas/minúsculas."""
+    sem_acento = "".join(
+        c for c in unicodedata.normalize("NFKD", nome) if not unicodedata.combining(c)
+    )
+    return _ESPACOS.sub(" ", sem_acento).strip().casefold()
+
+
+class MunicipioEncoder:
+    """Mapeia nome de município para código em O(1) via dicionário pré-calculado."""
+
+    def __init__(self, nomes: Iterable[str]) -> None:
+        self.nomes = tuple(nomes)
+        self._codigos = {normalizar(n): i for i, n in enumerate(self.nomes)}
+        if len(self._codigos) != len(self.nomes):
+            raise ValueError("Nomes de município duplicados após normalização")
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def __contains__(self, nome: object) -> bool:
+        return isinstance(nome, str) and normalizar(nome) in self._codigos
+
+    def encode(self, nome: str) -> int:
+        """Código do município; levanta ``MunicipioInvalido`` se não existir."""
+        try:
+            return self._codigos[normalizar(nome)]
+        except KeyError:
+            raise MunicipioInvalido(f"Município '{nome}' inválido") from None
+
+    def encode_many(self, nomes: Iterable[str]) -> npt.NDArray[np.int64]:
+        """Códigos de vários nomes de uma vez; nomes desconhecidos viram -1."""
+        codigos = self._codigos
+        return np.fromiter(
+            (codigos.get(normalizar(n), -1) if isinstance(n, str) else -1 for n in nomes),
+            dtype=np.int64,
+        )
+
+    def decode(self, codigo: int) -> str:
+        """Nome canônico (minúsculo, sem acento) a partir do código."""
+        return self.nomes[codigo]
+
+    def canonico(self, nome: str) -> str:
+        """Nome canônico equivalente a ``nome``."""
+        return self.nomes[self.encode(nome)]
+
+
+encoder = MunicipioEncoder(MUNICIPIOS)
@@ -0,0 +1,74 @@
+"""Matriz de previsões pré-calculada (município x ano) e ranking top-k.
+
+Quando o modelo carrega, todas as linhas do feature store são pontuadas num
+único predict vetorizado. Cada ano vira uma coluna contígua só com os
+municípios que têm dados; o ranking é um ``argpartition`` sobre ela.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.municipios import MUNICIPIOS
+from mlops_deploy.store import IDX_ANO, FeatureStore, chave_ano
+
+
+class MatrizPrevisoes:
+    """Previsões de um modelo para todas as combinações (município, ano) do store."""
+
+    def __init__(self, store: FeatureStore, modelo: Any) -> None:
+        self.versao: str = modelo.versao
+        self.anos: List[float] = store.anos
+        self._colunas = {ano: j for j, ano in enumerate(self.anos)}
+        # NaN onde o dataset não tem o município naquele ano
+        self.valores = np.full((len(MUNICIPIOS), len(self.anos)), np.nan)
+        anos_linha = [self._colunas[chave_ano(a)] for a in store.colunas[IDX_ANO].tolist()]
+        self.valores[store.codigos.astype(np.intp), anos_linha] = modelo.predict(store.matriz())
+        self._por_ano: List[Tuple[npt.NDArray[np.intp], npt.NDArray[np.float64]]] = []
+        for j in range(len(self.anos)):
+            codigos = np.flatnonzero(~np.isnan(self.valores[:, j]))
+            self._por_ano.append((codigos, np.ascontiguousarray(self.valores[codigos, j])))
+
+    def coluna(self, ano: float) -> Optional[int]:
+        return self._colunas.get(chave_ano(ano))
+
+    def ranking(
+        self,
+        ano: float,
+        k: int,
+        ordem: str = "desc",
+        municipios: Optional[Sequence[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Os ``k`` (código, previsão) de maior (``desc``) ou menor (``asc``) previsão.
+
+        ``municipios`` restringe o ranking a esses códigos. Empates ficam na
+        ordem do código. ``KeyError`` se o ano não está na matriz.
+        """
+        j = self.coluna(ano)
+        if j is None:
+            raise KeyError(ano)
+        codigos, valores = self._por_ano[j]
+        if municipios is not None:
+            manter = np.isin(codigos, np.asarray(municipios, dtype=np.intp))
+            codigos, valores = codigos[manter], valores[manter]
+        n = len(valores)
+        k = max(0, min(k, n))
+        if k == 0:
+            return []
+        chave = -valores if ordem == "desc" else valores
+        if k < n:
+            topo = np.argpartition(chave, k - 1)[:k]
+        else:
+            topo = np.arange(n)
+        # Só os k escolhidos são ordenados; lexsort desempata pelo código
+        topo = topo[np.lexsort((codigos[topo], chave[topo]))]
+        return list(zip(codigos[topo].tolist(), valores[topo].tolist()))
+
+    def info(self) -> Dict[str, object]:
+        return {
+            "model_version": self.versao,
+            "shape": list(self.valores.shape),
+            "cells": int((~np.isnan(self.valores)).sum()),
+        }
@@ -0,0 +1,369 @@
+"""Carga versionada do modelo com troca atômica (hot reload).
+
+``ModelRegistry`` guarda o modelo em uso como um ``ModeloCarregado`` imutável.
+Um novo artefato é carregado, compilado, validado e aquecido fora do caminho
+das requisições; só então a referência é trocada. Quem já pegou o modelo antigo
+termina a requisição com ele.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy import artefato
+from mlops_deploy.features import COLUNAS
+from mlops_deploy.tree import CompiledTree, checar_paridade
+
+logger = logging.getLogger(__name__)
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def hash_arquivo(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _predict_sklearn(estimator: Any) -> Callable[[FloatArray], FloatArray]:
+    import pandas as pd
+
+    colunas = list(getattr(estimator, "feature_names_in_", COLUNAS))
+
+    def predict(X: FloatArray) -> FloatArray:
+        df = pd.DataFrame(np.asarray(X, dtype=np.float64).reshape(-1, len(colunas)), columns=colunas)
+        return np.asarray(estimator.predict(df), dtype=np.float64).ravel()
+
+    return predict
+
+
+def _predict_sklearn_tardio(path: str) -> Callable[[FloatArray], FloatArray]:
+    """Como ``_predict_sklearn``, mas só carrega o ``.pkl`` (e o sklearn) na primeira chamada."""
+    predict: Optional[Callable[[FloatArray], FloatArray]] = None
+    lock = threading.Lock()
+
+    def tardio(X: FloatArray) -> FloatArray:
+        nonlocal predict
+        with lock:
+            if predict is None:
+                import joblib
+
+                predict = _predict_sklearn(joblib.load(path))
+        return predict(X)
+
+    return tardio
+
+
+@dataclass(frozen=True)
+class ModeloCarregado:
+    """Um artefato de modelo já carregado, compilado e validado."""
+
+    estimator: Any
+    arvore: Optional[CompiledTree]
+    path: str
+    sha256: str
+    mtime: float
+    carregado_em: float
+    duracao_carga: float
+    predict_sklearn: Callable[[FloatArray], FloatArray] = field(repr=False, compare=False)
+    # "npz" (artefato compacto, sem sklearn) ou "pkl" (joblib)
+    formato: str = "pkl"
+    manifesto: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def versao(self) -> str:
+        return self.sha256[:12]
+
+    def predict(self, X: npt.ArrayLike) -> FloatArray:
+        """Previsão vetorizada (colunas na ordem de ``COLUNAS``)."""
+        if self.arvore is not None:
+            return self.arvore.predict(X)
+        return self.predict_sklearn(np.asarray(X, dtype=np.float64))
+
+    def predict_one(self, linha: Sequence[float]) -> float:
+        if self.arvore is not None:
+            return self.arvore.predict_one(linha)
+        return float(self.predict_sklearn(np.asarray([linha], dtype=np.float64))[0])
+
+    def info(self) -> Dict[str, object]:
+        return {
+            "version": self.versao,
+            "sha256": self.sha256,
+            "path": self.path,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.carregado_em)),
+            "load_seconds": round(self.duracao_carga, 4),
+            "compiled": self.arvore is not None,
+            "artifact": self.formato,
+            "memory_mapped": self.arvore is not None and self.arvore.mapeada,
+            "sklearn_version": (self.manifesto or {}).get("sklearn_version"),
+        }
+
+
+def compilar_arvore(estimator: Any, predict_sklearn: Callable[[FloatArray], FloatArray]) -> Optional[CompiledTree]:
+    """Compila a árvore para NumPy e confere paridade com o sklearn antes de usar."""
+    try:
+        compilada = CompiledTree.from_sklearn(estimator)
+    except TypeError as e:
+        logger.warning("Árvore não compilada, usando sklearn: %s", e)
+        return None
+    if not checar_paridade(compilada, predict_sklearn, compilada.amostra_paridade()):
+        logger.warning("Árvore compilada divergiu do sklearn na checagem de paridade; usando sklearn.")
+        return None
+    logger.info("Árvore compilada: %d nós, profundidade %d", compilada.node_count, compilada.max_depth)
+    return compilada
+
+
+def _carregar_compacto(path: str, sha: str, mmap: bool) -> Optional[Tuple[CompiledTree, Dict[str, Any]]]:
+    try:
+        return artefato.carregar(path, sha, mmap=mmap)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Artefato compacto de %s ignorado, usando joblib: %s", path, e)
+        return None
+
+
+def carregar_modelo(path: str, compacto: bool = True, mmap: bool = True) -> ModeloCarregado:
+    """Carrega, compila, valida e aquece o modelo em ``path``.
+
+    Se existir o artefato compacto gerado deste mesmo ``.pkl`` (ver
+    ``mlops_deploy.artefato``), a árvore vem dele, sem importar sklearn; senão,
+    ``joblib.load`` do ``.pkl``. ``compacto=False`` força o joblib; com
+    ``mmap`` os arrays do artefato compacto ficam mapeados do arquivo,
+    compartilhados entre os processos que o abrem.
+    """
+    inicio = time.perf_counter()
+    mtime = os.path.getmtime(path)
+    sha = hash_arquivo(path)
+    carregado = _carregar_compacto(path, sha, mmap) if compacto else None
+    if carregado is not None:
+        arvore, manifesto = carregado
+        estimator = None
+        predict_sklearn = _predict_sklearn_tardio(path)
+        formato = "npz"
+    else:
+        import joblib
+
+        estimator = joblib.load(path)
+        predict_sklearn = _predict_sklearn(estimator)
+        arvore = compilar_arvore(estimator, predict_sklearn)
+        manifesto, formato = None, "pkl"
+    modelo = ModeloCarregado(
+        estimator=estimator,
+        arvore=arvore,
+        path=path,
+        sha256=sha,
+        mtime=mtime,
+        carregado_em=time.time(),
+        duracao_carga=0.0,
+        predict_sklearn=predict_sklearn,
+        formato=formato,
+        manifesto=manifesto,
+    )
+    # Smoke test: também serve de warm-up antes de entrar em produção
+    n_features = arvore.n_features if arvore is not None else getattr(estimator, "n_features_in_", len(COLUNAS))
+    y = modelo.predict(np.zeros((4, n_features)))
+    if y.shape != (4,) or not np.all(np.isfinite(y)):
+        raise ValueError(f"Modelo em {path} falhou no smoke test")
+    return replace(modelo, duracao_carga=time.perf_counter() - inicio)
+
+
+def baixar_modelo(uri: str, destino: str) -> str:
+    """Resolve ``MODEL_GCS_URI`` para um arquivo local.
+
+    ``gs://bucket/obj`` é baixado com ``google-cloud-storage`` (opcional). Um
+    caminho local ou ``file://`` (arquivo ou diretório com ``model.pkl``) serve
+    como substituto do bucket em testes e é copiado para ``destino``.
+    """
+    if uri.startswith("gs://"):
+        try:
+            from google.cloud import storage  # type: ignore[import-not-found]
+        except ImportError as e:
+            raise RuntimeError("google-cloud-storage não instalado; não é possível baixar " + uri) from e
+        bucket, _, blob = uri[len("gs://"):].partition("/")
+        origem = None
+    else:
+        origem = uri[len("file://"):] if uri.startswith("file://") else uri
+        if os.path.isdir(origem):
+            origem = os.path.join(origem, "model.pkl")
+    os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+    # Escreve em arquivo temporário e renomeia: o watcher nunca vê arquivo pela metade
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(destino)), suffix=".tmp")
+    os.close(fd)
+    try:
+        if origem is None:
+            storage.Client().bucket(bucket).blob(blob).download_to_filename(tmp)
+        else:
+            shutil.copyfile(origem, tmp)
+        os.replace(tmp, destino)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return destino
+
+
+class ModelRegistry:
+    """Mantém o modelo atual e faz a troca atômica quando o artefato muda.
+
+    Com ``source_uri`` o artefato é baixado para ``download_path`` (um diretório
+    gravável, compartilhado pelos workers da instância); se o download falhar,
+    segue-se servindo ``path``. Cada worker tem seu próprio registry: o watcher
+    de arquivo é o que propaga uma recarga feita por um worker para os demais.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        source_uri: Optional[str] = None,
+        download_path: Optional[str] = None,
+        mmap: bool = True,
+    ) -> None:
+        self.path = path
+        self.mmap = mmap
+        self.source_uri = source_uri
+        self.download_path = download_path or os.path.join(tempfile.gettempdir(), "mlops-deploy", "model.pkl")
+        self._atual: Optional[ModeloCarregado] = None
+        self._lock = threading.Lock()  # serializa recargas, não as leituras
+        self._ouvintes: List[Callable[[ModeloCarregado], None]] = []
+        self._parar = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        # (mtime, sha256) do último artefato que falhou: não é recarregado até mudar
+        self._falhou: Optional[Tuple[float, str]] = None
+        self.recargas = 0
+        self.falhas = 0
+        self.ultimo_erro: Optional[str] = None
+        self.erro_download: Optional[str] = None
+
+    @property
+    def atual(self) -> Optional[ModeloCarregado]:
+        return self._atual
+
+    @property
+    def arquivo(self) -> str:
+        """Artefato servido e vigiado: a cópia baixada, se existir, senão ``path``."""
+        if self.source_uri and os.path.exists(self.download_path):
+            return self.download_path
+        return self.path
+
+    def ao_trocar(self, fn: Callable[[ModeloCarregado], None]) -> None:
+        """Registra um callback chamado com o novo modelo após cada troca."""
+        self._ouvintes.append(fn)
+
+    def _mudou(self, arquivo: str) -> bool:
+        atual = self._atual
+        try:
+            mtime = os.path.getmtime(arquivo)
+            if atual is not None and arquivo == atual.path and mtime == atual.mtime:
+                return False
+            if self._falhou is not None and self._falhou[0] == mtime:
+                return False
+            sha = hash_arquivo(arquivo)
+        except OSError:
+            return atual is None
+        if self._falhou is not None and self._falhou[1] == sha:
+            return False
+        return atual is None or sha != atual.sha256
+
+    def baixar(self) -> bool:
+        """Copia ``source_uri`` para ``download_path``; falha só gera aviso.
+
+        O artefato compacto (``.npz`` + ``.json`` ao lado do ``.pkl``) vem
+        antes, se existir na origem: o ``.pkl`` por último dispara o watcher.
+        """
+        if not self.source_uri:
+            return False
+        origem = self.source_uri
+        local = origem[len("file://"):] if origem.startswith("file://") else origem
+        if not origem.startswith("gs://") and os.path.isdir(local):
+            origem = os.path.join(local, "model.pkl")
+        for extra, destino in zip(artefato.caminhos(origem), artefato.caminhos(self.download_path)):
+            try:
+                baixar_modelo(extra, destino)
+            except Exception as e:
+                logger.info("Artefato compacto %s não baixado (opcional): %s", extra, e)
+        try:
+            baixar_modelo(self.source_uri, self.download_path)
+        except Exception as e:
+            self.erro_download = f"{type(e).__name__}: {e}"
+            logger.warning("Falha ao baixar modelo de %s, usando %s: %s", self.source_uri, self.arquivo, e)
+            return False
+        self.erro_download = None
+        return True
+
+    def recarregar(self, forcar: bool = False, baixar: bool = False) -> bool:
+        """Carrega o artefato se mudou (ou se ``forcar``); devolve True se trocou.
+
+        Falhas incrementam ``falhas``, ficam em ``ultimo_erro`` e o modelo
+        anterior continua em uso.
+        """
+        with self._lock:
+            if baixar:
+                self.baixar()
+            arquivo = self.arquivo
+            if not forcar and not self._mudou(arquivo):
+                return False
+            try:
+                novo = carregar_modelo(arquivo, mmap=self.mmap)
+            except Exception as e:
+                self.falhas += 1
+                self.ultimo_erro = f"{type(e).__name__}: {e}"
+                try:
+                    self._falhou = (os.path.getmtime(arquivo), hash_arquivo(arquivo))
+                except OSError:
+                    self._falhou = None
+                logger.exception("Falha ao carregar modelo de %s", arquivo)
+                return False
+            self._falhou = None
+            self.ultimo_erro = None
+            if not forcar and self._atual is not None and novo.sha256 == self._atual.sha256:
+                return False
+            self._atual = novo
+            self.recargas += 1
+        logger.info("Modelo %s carregado de %s em %.3fs", novo.versao, novo.path, novo.duracao_carga)
+        for fn in self._ouvintes:
+            try:
+                fn(novo)
+            except Exception:
+                logger.exception("Callback de troca de modelo falhou")
+        return True
+
+    def iniciar_watcher(self, intervalo: float) -> None:
+        """Verifica o artefato (mtime e hash) a cada ``intervalo`` segundos numa thread."""
+        if intervalo <= 0 or self._watcher is not None:
+            return
+        self._parar.clear()
+
+        def loop() -> None:
+            while not self._parar.wait(intervalo):
+                self.recarregar()
+
+        self._watcher = threading.Thread(target=loop, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def parar_watcher(self) -> None:
+        self._parar.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def info(self) -> Dict[str, object]:
+        atual = self._atual
+        return {
+            **(atual.info() if atual is not None else {"path": self.arquivo}),
+            "reloads": self.recargas,
+            "reload_failures": self.falhas,
+            "last_error": self.ultimo_erro,
+            "download_error": self.erro_download,
+        }
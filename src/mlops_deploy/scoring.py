@@ -0,0 +1,180 @@
+"""Pontuação offline em lote, em blocos e em paralelo.
+
+Usa o mesmo ``encoder`` de municípios e o mesmo carregamento de modelo da API.
+A entrada pode vir no formato de ``data/processed/data_set.csv`` (colunas de
+treino, ``Municipio`` por nome) ou no formato do payload ``Dados``.
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Deque, Iterator, Optional
+
+import numpy as np
+
+from mlops_deploy.features import CAMPOS, COLUNAS, IDX_MUNICIPIO
+from mlops_deploy.municipios import encoder
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+COLUNA_PREVISAO = "TotalCrimesPrevisto"
+COLUNA_ERRO = "erro"
+
+# Modelo do processo (carregado uma vez por worker do pool)
+_modelo: Any = None
+
+
+def formato(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv",):
+        return "csv"
+    if ext in (".ndjson", ".jsonl", ".json"):
+        return "ndjson"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Formato não suportado: {path} (use .csv, .ndjson/.jsonl ou .parquet)")
+
+
+def ler_em_blocos(path: str, chunk_size: int) -> Iterator["pd.DataFrame"]:
+    """Lê o arquivo de entrada em DataFrames de até ``chunk_size`` linhas."""
+    import pandas as pd
+
+    fmt = formato(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == "ndjson":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("Leitura de Parquet requer o pacote pyarrow") from e
+        for lote in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield lote.to_pandas()
+
+
+def colunas_entrada(df: "pd.DataFrame") -> tuple:
+    """Nomes das colunas de features em ``df``: as do treino ou as do ``Dados``."""
+    for nomes in (COLUNAS, CAMPOS):
+        if all(c in df.columns for c in nomes):
+            return nomes
+    faltando = [c for c in CAMPOS if c not in df.columns]
+    raise ValueError(f"Colunas ausentes na entrada: {faltando}")
+
+
+def matriz(df: "pd.DataFrame") -> tuple:
+    """Matriz de features na ordem do modelo e códigos de município (-1 = inválido)."""
+    nomes = colunas_entrada(df)
+    municipios = df[nomes[IDX_MUNICIPIO]]
+    codigos = encoder.encode_many(municipios.astype(str).tolist())
+    X = np.empty((len(df), len(nomes)), dtype=np.float64)
+    for j, c in enumerate(nomes):
+        if j != IDX_MUNICIPIO:
+            X[:, j] = df[c].to_numpy(dtype=np.float64, na_value=np.nan)
+    X[:, IDX_MUNICIPIO] = codigos
+    return X, codigos
+
+
+def pontuar_df(modelo: Any, df: "pd.DataFrame") -> "pd.DataFrame":
+    """Devolve ``df`` com as colunas de previsão e de erro por linha."""
+    X, codigos = matriz(df)
+    validos = codigos >= 0
+    y = np.full(len(df), np.nan)
+    if validos.any():
+        y[validos] = np.round(modelo.predict(X[validos]), 2)
+    saida = df.copy()
+    saida[COLUNA_PREVISAO] = y
+    saida[COLUNA_ERRO] = np.where(validos, "", "municipio invalido")
+    return saida
+
+
+def _inicializar(model_path: str) -> None:
+    global _modelo
+    import warnings
+
+    from mlops_deploy.registry import carregar_modelo
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # aviso de versão do sklearn, um por worker
+        _modelo = carregar_modelo(model_path)
+
+
+def _pontuar_bloco(df: "pd.DataFrame") -> "pd.DataFrame":
+    return pontuar_df(_modelo, df)
+
+
+class Escritor:
+    """Grava blocos de resultado incrementalmente em CSV, NDJSON ou Parquet."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fmt = formato(path)
+        self._primeiro = True
+        self._parquet: Any = None
+
+    def escrever(self, df: "pd.DataFrame") -> None:
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="w" if self._primeiro else "a", header=self._primeiro, index=False)
+        elif self.fmt == "ndjson":
+            with open(self.path, "w" if self._primeiro else "a", encoding="utf-8") as f:
+                df.to_json(f, orient="records", lines=True, force_ascii=False)
+                f.write("\n")
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, tabela.schema)
+            self._parquet.write_table(tabela)
+        self._primeiro = False
+
+    def fechar(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def pontuar_arquivo(
+    entrada: str,
+    saida: str,
+    model_path: str,
+    chunk_size: int = 50_000,
+    workers: Optional[int] = None,
+    progresso: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Pontua ``entrada`` em blocos e grava em ``saida`` na mesma ordem.
+
+    Com ``workers > 1`` os blocos vão para um pool de processos; no máximo
+    ``2 * workers`` blocos ficam em voo, então a memória não depende do tamanho
+    do arquivo. Devolve o número de linhas pontuadas.
+    """
+    workers = workers or os.cpu_count() or 1
+    escritor = Escritor(saida)
+    total = 0
+
+    def concluir(resultado: "pd.DataFrame") -> None:
+        nonlocal total
+        escritor.escrever(resultado)
+        total += len(resultado)
+        if progresso is not None:
+            progresso(len(resultado))
+
+    try:
+        if workers == 1:
+            _inicializar(model_path)
+            for df in ler_em_blocos(entrada, chunk_size):
+                concluir(_pontuar_bloco(df))
+            return total
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar, initargs=(model_path,)) as pool:
+            em_voo: Deque[Future["pd.DataFrame"]] = deque()
+            for df in ler_em_blocos(entrada, chunk_size):
+                em_voo.append(pool.submit(_pontuar_bloco, df))
+                if len(em_voo) >= 2 * workers:
+                    concluir(em_voo.popleft().result())
+            while em_voo:
+                concluir(em_voo.popleft().result())
+        return total
+    finally:
+        escritor.fechar()
@@ -0,0 +1,62 @@
+"""Single-flight: requisições idênticas simultâneas compartilham um só cálculo.
+
+A primeira requisição de uma chave (a "líder") dispara o cálculo numa task
+própria; as que chegam enquanto ele está em voo ("seguidoras") só aguardam a
+mesma task e recebem o mesmo resultado (ou a mesma exceção). Quando a task
+termina a chave sai do mapa, então não há cache: protege justamente a
+instância fria, logo após o startup ou uma troca de modelo.
+
+A task não pertence a nenhuma requisição: se a líder desconecta, as
+seguidoras continuam esperando o cálculo, que não é cancelado.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce chamadas assíncronas com a mesma chave enquanto uma está em voo."""
+
+    def __init__(self) -> None:
+        self._voando: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.lideres = 0
+        self.seguidores = 0
+
+    async def executar(self, chave: Hashable, calcular: Callable[[], Awaitable[T]]) -> T:
+        tarefa = self._voando.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(calcular())
+            self._voando[chave] = tarefa
+            tarefa.add_done_callback(lambda t: self._encerrar(chave, t))
+            self.lideres += 1
+        else:
+            self.seguidores += 1
+        return await asyncio.shield(tarefa)  # type: ignore[no-any-return]
+
+    def _encerrar(self, chave: Hashable, tarefa: "asyncio.Task[Any]") -> None:
+        if self._voando.get(chave) is tarefa:
+            del self._voando[chave]
+        # Marca a exceção como lida mesmo se todos os que esperavam foram cancelados
+        if not tarefa.cancelled():
+            tarefa.exception()
+
+    @property
+    def em_voo(self) -> int:
+        return len(self._voando)
+
+    @property
+    def taxa(self) -> float:
+        """Fração das requisições atendidas por um cálculo de outra (seguidoras / total)."""
+        total = self.lideres + self.seguidores
+        return self.seguidores / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "leaders": self.lideres,
+            "followers": self.seguidores,
+            "in_flight": self.em_voo,
+            "coalescing_ratio": round(self.taxa, 4),
+        }
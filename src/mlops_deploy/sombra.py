@@ -0,0 +1,176 @@
+"""Avaliação de um modelo candidato com o tráfego real, fora da requisição.
+
+Para cada previsão servida a requisição só enfileira (sem bloquear) a matriz
+já codificada, a previsão servida e qual dos dois modelos a serviu; uma
+thread pontua o *outro* modelo sobre a mesma matriz e acumula a comparação.
+Nada é recodificado e a resposta não espera por isso: fila cheia descarta.
+
+As linhas unitárias que estiverem na fila ao mesmo tempo viram uma matriz
+só e um único ``predict`` por modelo. As diferenças são sempre
+``candidato - principal``, qualquer que seja o modelo que serviu (no modo
+canário o candidato serve uma fração das requisições).
+"""
+from __future__ import annotations
+
+import logging
+import math
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL = "principal"
+CANDIDATO = "candidato"
+
+# (endpoint, papel do modelo que serviu, modelo da sombra, X (linha ou matriz), y servido)
+Item = Tuple[str, str, Any, Any, Any]
+
+
+class Comparador:
+    """Diferenças entre candidato e principal sobre as mesmas linhas."""
+
+    def __init__(self, tolerancia: float = 0.005) -> None:
+        self.tolerancia = tolerancia
+        self._lock = threading.Lock()
+        self.linhas = 0
+        self.soma = 0.0
+        self.soma_abs = 0.0
+        self.soma_quad = 0.0
+        self.max_abs = 0.0
+        self.divergentes = 0
+        self.chamadas = 0
+        self.segundos = 0.0
+        self.max_segundos = 0.0
+        self.por_endpoint: Dict[str, int] = {}
+
+    def registrar(self, endpoint: str, candidato: Any, principal: Any, segundos: float) -> None:
+        d = np.asarray(candidato, dtype=np.float64) - np.asarray(principal, dtype=np.float64)
+        a = np.abs(d)
+        with self._lock:
+            self.linhas += d.size
+            self.soma += float(d.sum())
+            self.soma_abs += float(a.sum())
+            self.soma_quad += float((d * d).sum())
+            self.max_abs = max(self.max_abs, float(a.max()) if d.size else 0.0)
+            self.divergentes += int((a > self.tolerancia).sum())
+            self.chamadas += 1
+            self.segundos += segundos
+            self.max_segundos = max(self.max_segundos, segundos)
+            self.por_endpoint[endpoint] = self.por_endpoint.get(endpoint, 0) + d.size
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            n = self.linhas
+            return {
+                "rows": n,
+                "mean_delta": round(self.soma / n, 6) if n else None,
+                "mean_abs_delta": round(self.soma_abs / n, 6) if n else None,
+                "rmse_delta": round(math.sqrt(self.soma_quad / n), 6) if n else None,
+                "max_abs_delta": round(self.max_abs, 6),
+                "disagreement_rate": round(self.divergentes / n, 6) if n else None,
+                "tolerance": self.tolerancia,
+                "shadow_predict_seconds": {
+                    "calls": self.chamadas,
+                    "mean": round(self.segundos / self.chamadas, 6) if self.chamadas else None,
+                    "max": round(self.max_segundos, 6),
+                },
+                "rows_by_endpoint": dict(self.por_endpoint),
+            }
+
+
+class Sombra:
+    """Fila limitada e thread que pontua o outro modelo e alimenta o :class:`Comparador`."""
+
+    def __init__(self, capacidade: int = 1000, max_linhas_juntas: int = 256, tolerancia: float = 0.005) -> None:
+        self._fila: "queue.Queue[Optional[Item]]" = queue.Queue(maxsize=capacidade)
+        self.max_linhas_juntas = max_linhas_juntas
+        self.comparador = Comparador(tolerancia)
+        self._thread: Optional[threading.Thread] = None
+        self.enfileiradas = 0
+        self.descartadas = 0
+        self.falhas = 0
+        self.ultimo_erro: Optional[str] = None
+
+    def enviar(self, endpoint: str, papel: str, outro: Any, X: Any, y: Any) -> bool:
+        """Agenda ``outro`` sobre ``X``; ``papel`` é quem serviu ``y``. False se a fila estiver cheia."""
+        try:
+            self._fila.put_nowait((endpoint, papel, outro, X, y))
+        except queue.Full:
+            self.descartadas += 1
+            return False
+        self.enfileiradas += 1
+        return True
+
+    def iniciar(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="shadow-scorer", daemon=True)
+            self._thread.start()
+
+    def parar(self, timeout: float = 5.0) -> None:
+        """Processa o que já está na fila e encerra a thread."""
+        if self._thread is None:
+            return
+        try:
+            self._fila.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Sombra: fila cheia no encerramento; itens pendentes descartados")
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            item = self._fila.get()
+            itens = [item]
+            # O que já estiver esperando vai junto (linhas unitárias viram uma matriz)
+            while item is not None and len(itens) < self.max_linhas_juntas:
+                try:
+                    item = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                itens.append(item)
+            fim = itens[-1] is None
+            try:
+                self.processar([i for i in itens if i is not None])
+            except Exception as e:
+                self.falhas += 1
+                self.ultimo_erro = f"{type(e).__name__}: {e}"
+                logger.exception("Sombra: falha ao pontuar o modelo secundário")
+            if fim:
+                return
+
+    def processar(self, itens: List[Item]) -> None:
+        """Pontua e compara um conjunto de itens (também usado direto nos testes)."""
+        unitarios: Dict[Tuple[int, str], List[Item]] = {}
+        for item in itens:
+            endpoint, papel, outro, X, y = item
+            if isinstance(y, (int, float)):
+                unitarios.setdefault((id(outro), endpoint), []).append(item)
+            else:
+                self._comparar(endpoint, [papel] * len(y), outro, X, y)
+        for (_, endpoint), grupo in unitarios.items():
+            self._comparar(endpoint, [i[1] for i in grupo], grupo[0][2], [i[3] for i in grupo], [i[4] for i in grupo])
+
+    def _comparar(self, endpoint: str, papeis: List[str], outro: Any, X: Any, y: Any) -> None:
+        X = np.asarray(X, dtype=np.float64)
+        inicio = time.perf_counter()
+        y_outro = np.round(np.asarray(outro.predict(X), dtype=np.float64), 2)
+        segundos = time.perf_counter() - inicio
+        y = np.round(np.asarray(y, dtype=np.float64), 2)
+        serviu_principal = np.array([p == PRINCIPAL for p in papeis])
+        cand = np.where(serviu_principal, y_outro, y)
+        princ = np.where(serviu_principal, y, y_outro)
+        self.comparador.registrar(endpoint, cand, princ, segundos)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "queued": self.enfileiradas,
+            "dropped": self.descartadas,
+            "pending": self._fila.qsize(),
+            "failures": self.falhas,
+            "last_error": self.ultimo_erro,
+            **self.comparador.stats(),
+        }
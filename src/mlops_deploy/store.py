@@ -0,0 +1,112 @@
+"""Feature store em memória sobre ``data/processed/data_set.csv``.
+
+As features ficam em colunas float32 contíguas (uma linha do array por
+feature) e o município como código inteiro do ``MunicipioEncoder``. Um dict
+``(código, ano) -> linha`` dá acesso O(1) ao vetor de features completo.
+
+``Ano`` no dataset processado está padronizado (z-score), então a chave usa o
+valor do próprio dataset, arredondado em ``ANO_CASAS`` casas decimais.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.features import COLUNAS, IDX_MUNICIPIO
+from mlops_deploy.municipios import MunicipioEncoder, encoder as encoder_padrao
+
+logger = logging.getLogger(__name__)
+
+ANO_CASAS = 4
+IDX_ANO = COLUNAS.index("Ano")
+
+
+def chave_ano(ano: float) -> float:
+    return round(float(ano), ANO_CASAS)
+
+
+class FeatureStore:
+    """Linhas de features indexadas por (código do município, ano)."""
+
+    def __init__(self, codigos: npt.ArrayLike, features: npt.ArrayLike) -> None:
+        # features: (n_linhas, len(COLUNAS)) na ordem de COLUNAS; a coluna de município é ignorada
+        features = np.asarray(features, dtype=np.float32)
+        self.codigos = np.ascontiguousarray(codigos, dtype=np.int16)
+        self.colunas = np.ascontiguousarray(features.T)  # uma feature por linha: layout colunar
+        self.colunas[IDX_MUNICIPIO] = self.codigos
+        self._indice: Dict[Tuple[int, float], int] = {}
+        for i, (codigo, ano) in enumerate(zip(self.codigos.tolist(), self.colunas[IDX_ANO].tolist())):
+            chave = (codigo, chave_ano(ano))
+            if chave in self._indice:
+                logger.warning("Linha duplicada no feature store para %s; mantendo a última", chave)
+            self._indice[chave] = i
+
+    @classmethod
+    def from_csv(cls, path: str, encoder: MunicipioEncoder = encoder_padrao) -> "FeatureStore":
+        """Lê só as colunas do modelo, sem pandas (o CSV é pequeno)."""
+        nomes: List[str] = []
+        linhas: List[List[float]] = []
+        with open(path, newline="", encoding="utf-8") as f:
+            leitor = csv.reader(f)
+            cabecalho = next(leitor)
+            try:
+                posicoes = [cabecalho.index(c) for c in COLUNAS]
+            except ValueError as e:
+                raise ValueError(f"{path} não tem as colunas do modelo: {e}") from None
+            for campos in leitor:
+                nomes.append(campos[posicoes[IDX_MUNICIPIO]])
+                linhas.append([0.0 if j == IDX_MUNICIPIO else float(campos[p]) for j, p in enumerate(posicoes)])
+        codigos = encoder.encode_many(nomes)
+        validos = codigos >= 0
+        if not validos.all():
+            logger.warning("%d linhas de %s com município desconhecido ignoradas", int((~validos).sum()), path)
+        features = np.array(linhas, dtype=np.float32).reshape(-1, len(COLUNAS))
+        return cls(codigos[validos], features[validos])
+
+    def __len__(self) -> int:
+        return len(self.codigos)
+
+    @property
+    def anos(self) -> List[float]:
+        return sorted({ano for _, ano in self._indice})
+
+    @property
+    def memoria_bytes(self) -> int:
+        return int(self.colunas.nbytes + self.codigos.nbytes)
+
+    def indice(self, codigo: int, ano: float) -> Optional[int]:
+        return self._indice.get((int(codigo), chave_ano(ano)))
+
+    def linha(self, codigo: int, ano: float) -> Optional[List[float]]:
+        """Vetor de features (ordem de ``COLUNAS``) ou None se não há a combinação."""
+        i = self.indice(codigo, ano)
+        return None if i is None else self.colunas[:, i].tolist()
+
+    def matriz(self, linhas: Optional[Sequence[int]] = None) -> npt.NDArray[np.float64]:
+        """Matriz (n x len(COLUNAS)) em float64 para o predict, de todas ou de algumas linhas."""
+        colunas = self.colunas if linhas is None else self.colunas[:, np.asarray(linhas, dtype=np.intp)]
+        return np.ascontiguousarray(colunas.T, dtype=np.float64)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "rows": len(self),
+            "municipios": int(len(np.unique(self.codigos))),
+            "anos": self.anos,
+            "memory_bytes": self.memoria_bytes,
+        }
+
+
+def carregar_store(path: str, encoder: MunicipioEncoder = encoder_padrao) -> Optional[FeatureStore]:
+    """Carrega o store ou devolve None (com aviso) se o arquivo não existe ou é inválido."""
+    try:
+        store = FeatureStore.from_csv(path, encoder)
+    except (OSError, ValueError) as e:
+        logger.warning("Feature store indisponível (%s): %s", path, e)
+        return None
+    logger.info("Feature store: %d linhas, %d bytes", len(store), store.memoria_bytes)
+    return store
+
@@ -0,0 +1,103 @@
+"""Varredura de cenários ("e se"): grade de valores e pontos de corte da árvore.
+
+A grade inteira vira uma matriz e é pontuada num único predict. Para uma
+árvore, a previsão ao longo de uma feature (com as outras fixas) é uma função
+em degraus que só muda nos ``threshold`` dos nós que testam essa feature e
+são alcançáveis a partir do registro base; esses pontos saem da própria
+árvore, sem amostragem.
+"""
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.tree import TREE_LEAF, CompiledTree
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def grade(base: Sequence[float], eixos: Sequence[Tuple[int, FloatArray]]) -> FloatArray:
+    """Matriz com ``base`` repetida e as colunas dos eixos variando (produto cartesiano).
+
+    A ordem das linhas é a de ``np.meshgrid(..., indexing="ij")``: o último eixo
+    varia mais rápido, então ``y.reshape(len(v0), len(v1))`` dá a superfície.
+    """
+    valores = [np.asarray(v, dtype=np.float64) for _, v in eixos]
+    n = int(np.prod([len(v) for v in valores]))
+    X = np.tile(np.asarray(base, dtype=np.float64), (n, 1))
+    for (coluna, _), malha in zip(eixos, np.meshgrid(*valores, indexing="ij")):
+        X[:, coluna] = malha.ravel()
+    return X
+
+
+def cortes(
+    arvore: CompiledTree,
+    base: Sequence[float],
+    livres: Sequence[int],
+    alvo: int,
+    inicio: float,
+    fim: float,
+) -> List[float]:
+    """Thresholds de ``alvo`` em [``inicio``, ``fim``] alcançáveis com ``livres`` variando.
+
+    As features fora de ``livres`` seguem o valor de ``base`` (como float32,
+    igual ao predict); nas livres os dois ramos são visitados, restringindo o
+    intervalo de cada uma.
+    """
+    with np.errstate(over="ignore"):
+        x = np.asarray(base, dtype=np.float32).tolist()
+    livres = list(livres)
+    encontrados = set()
+    pilha = [(0, {f: (-np.inf, np.inf) for f in livres})]
+    while pilha:
+        node, intervalos = pilha.pop()
+        if arvore.children_left[node] == TREE_LEAF:
+            continue
+        f = int(arvore.feature[node])
+        t = float(arvore.threshold[node])
+        esq, dir_ = int(arvore.children_left[node]), int(arvore.children_right[node])
+        if f not in intervalos:
+            v = x[f]
+            if v != v and arvore.missing_go_to_left is not None:
+                pilha.append((esq if arvore.missing_go_to_left[node] else dir_, intervalos))
+            else:
+                pilha.append((esq if v <= t else dir_, intervalos))
+            continue
+        lo, hi = intervalos[f]
+        if f == alvo and lo < t < hi and inicio <= t <= fim:
+            encontrados.add(t)
+        if lo < t:
+            pilha.append((esq, {**intervalos, f: (lo, min(hi, t))}))
+        if t < hi:
+            pilha.append((dir_, {**intervalos, f: (max(lo, t), hi)}))
+    return sorted(encontrados)
+
+
+def _lados(t: float) -> Tuple[float, float]:
+    """Maior float32 <= ``t`` e menor float32 > ``t``: um de cada lado do corte."""
+    v = np.float32(t)
+    if float(v) > t:
+        v = np.nextafter(v, np.float32(-np.inf))
+    return float(v), float(np.nextafter(v, np.float32(np.inf)))
+
+
+def degraus(
+    arvore: CompiledTree,
+    base: Sequence[float],
+    alvo: int,
+    inicio: float,
+    fim: float,
+) -> List[Tuple[float, float, float]]:
+    """(threshold, previsão antes, previsão depois) onde a previsão de fato muda."""
+    candidatos = cortes(arvore, base, [alvo], alvo, inicio, fim)
+    if not candidatos:
+        return []
+    pontos = [p for t in candidatos for p in _lados(t)]
+    y = arvore.predict(grade(base, [(alvo, np.asarray(pontos))])).tolist()
+    return [
+        (t, y[2 * i], y[2 * i + 1])
+        for i, t in enumerate(candidatos)
+        if y[2 * i] != y[2 * i + 1]
+    ]
@@ -0,0 +1,214 @@
+"""Inferência de árvore de decisão em NumPy puro, sem pandas nem sklearn.
+
+O ``DecisionTreeRegressor`` treinado é pequeno (poucas dezenas de nós), então o
+custo de ``model.predict`` é quase todo overhead: montar DataFrame, checar nomes
+de colunas e ``check_array``. ``CompiledTree`` copia os arrays da árvore
+(``children_left/right``, ``feature``, ``threshold``, ``value``) e percorre os
+nós diretamente.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+FloatArray = npt.NDArray[np.float64]
+
+# Folhas no sklearn têm children_left == -1 (``sklearn.tree._tree.TREE_LEAF``)
+TREE_LEAF = -1
+
+# Acima disso ``predict_one`` não mantém cópias em listas Python (memória por worker)
+MAX_NOS_LISTAS = 4096
+
+
+class CompiledTree:
+    """Árvore de regressão em arrays planos.
+
+    As entradas seguem a ordem canônica de colunas usada no treino. Assim como o
+    sklearn, os valores são convertidos para float32 antes da comparação com os
+    thresholds, o que garante as mesmas folhas do ``predict`` original. NaN segue
+    ``missing_go_to_left`` (sklearn >= 1.3); sem esse array, NaN é rejeitado.
+    Valores infinitos em float32 são sempre rejeitados, como no ``check_array``.
+    """
+
+    def __init__(
+        self,
+        children_left: npt.ArrayLike,
+        children_right: npt.ArrayLike,
+        feature: npt.ArrayLike,
+        threshold: npt.ArrayLike,
+        value: npt.ArrayLike,
+        n_features: int | None = None,
+        missing_go_to_left: Optional[npt.ArrayLike] = None,
+        listas: Optional[bool] = None,
+        max_depth: Optional[int] = None,
+    ) -> None:
+        self.children_left = np.ascontiguousarray(children_left, dtype=np.intp)
+        self.children_right = np.ascontiguousarray(children_right, dtype=np.intp)
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.value = np.ascontiguousarray(np.asarray(value, dtype=np.float64).reshape(len(self.feature), -1)[:, 0])
+        self.missing_go_to_left = (
+            None if missing_go_to_left is None
+            else np.ascontiguousarray(missing_go_to_left, dtype=bool)
+        )
+        if n_features is None:
+            n_features = int(self.feature.max()) + 1 if (self.feature >= 0).any() else 0
+        self.n_features = n_features
+        # Profundidade já conhecida (manifesto) evita percorrer todos os nós no load
+        self.max_depth = self._profundidade() if max_depth is None else int(max_depth)
+        # Listas Python para o caminho de uma linha só: indexar list é bem mais
+        # barato que indexar ndarray escalar a escalar. São cópias privadas do
+        # worker, então árvores grandes (ou arrays mapeados) ficam só nos arrays.
+        if listas is None:
+            listas = self.node_count <= MAX_NOS_LISTAS
+        self._listas = listas
+        if listas:
+            self._left = self.children_left.tolist()
+            self._right = self.children_right.tolist()
+            self._feature = self.feature.tolist()
+            self._threshold = self.threshold.tolist()
+            self._value = self.value.tolist()
+            self._nan_esq = self.missing_go_to_left.tolist() if self.missing_go_to_left is not None else None
+
+    @classmethod
+    def from_sklearn(cls, estimator: Any) -> "CompiledTree":
+        """Extrai os arrays de um ``DecisionTreeRegressor`` já treinado."""
+        tree = getattr(estimator, "tree_", None)
+        if tree is None or getattr(estimator, "n_outputs_", 1) != 1:
+            raise TypeError(f"Modelo não suportado para compilação: {type(estimator).__name__}")
+        return cls(
+            tree.children_left, tree.children_right, tree.feature, tree.threshold, tree.value,
+            n_features=getattr(estimator, "n_features_in_", None),
+            missing_go_to_left=getattr(tree, "missing_go_to_left", None),
+        )
+
+    @property
+    def mapeada(self) -> bool:
+        """Os arrays apontam para um arquivo mapeado em memória (``np.memmap``)."""
+        base = self.threshold
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base  # type: ignore[assignment]
+        return base is not None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    def _profundidade(self) -> int:
+        depth = np.zeros(self.node_count, dtype=np.intp)
+        for node in range(self.node_count):
+            if self.children_left[node] != TREE_LEAF:
+                depth[self.children_left[node]] = depth[node] + 1
+                depth[self.children_right[node]] = depth[node] + 1
+        return int(depth.max()) if self.node_count else 0
+
+    def _validar(self, X32: npt.NDArray[np.float32]) -> None:
+        if np.isinf(X32).any():
+            raise ValueError("Entrada contém infinito ou valor grande demais para float32.")
+        if self.missing_go_to_left is None and np.isnan(X32).any():
+            raise ValueError("Entrada contém NaN.")
+
+    def apply(self, X: npt.ArrayLike) -> npt.NDArray[np.intp]:
+        """Índice da folha de cada linha de ``X`` (n_linhas x n_features)."""
+        with np.errstate(over="ignore"):
+            X32 = np.asarray(X, dtype=np.float32)
+        if X32.ndim == 1:
+            X32 = X32.reshape(1, -1)
+        self._validar(X32)
+        rows = np.arange(X32.shape[0])
+        node = np.zeros(X32.shape[0], dtype=np.intp)
+        # Todas as linhas descem um nível por iteração; quem já chegou na folha fica parado.
+        for _ in range(self.max_depth):
+            left = self.children_left[node]
+            ativo = left != TREE_LEAF
+            if not ativo.any():
+                break
+            x = X32[rows, self.feature[node]]
+            vai_esq = x <= self.threshold[node]
+            if self.missing_go_to_left is not None:
+                vai_esq = np.where(np.isnan(x), self.missing_go_to_left[node], vai_esq)
+            node = np.where(ativo, np.where(vai_esq, left, self.children_right[node]), node)
+        return node
+
+    def predict(self, X: npt.ArrayLike) -> FloatArray:
+        """Previsão vetorizada para um vetor ou matriz de features."""
+        return self.value[self.apply(X)]
+
+    def apply_one(self, row: Sequence[float]) -> int:
+        """Folha de uma linha só, percorrendo a árvore em Python puro."""
+        if not self._listas:
+            return int(self.apply(np.asarray(row, dtype=np.float64).reshape(1, -1))[0])
+        with np.errstate(over="ignore"):
+            x = np.asarray(row, dtype=np.float32).tolist()
+        if not all(map(math.isfinite, x)):
+            self._validar(np.asarray(x, dtype=np.float32))
+        left, right, feature, threshold, nan_esq = self._left, self._right, self._feature, self._threshold, self._nan_esq
+        node = 0
+        while left[node] != TREE_LEAF:
+            v = x[feature[node]]
+            if v != v:  # NaN
+                node = left[node] if nan_esq[node] else right[node]  # type: ignore[index]
+            else:
+                node = left[node] if v <= threshold[node] else right[node]
+        return node
+
+    def predict_one(self, row: Sequence[float]) -> float:
+        """Previsão de uma linha só, percorrendo a árvore em Python puro."""
+        if not self._listas:
+            return float(self.predict(np.asarray(row, dtype=np.float64).reshape(1, -1))[0])
+        return self._value[self.apply_one(row)]  # type: ignore[no-any-return]
+
+    def amostra_paridade(self, n: int = 256, seed: int = 0) -> FloatArray:
+        """Matriz de teste com valores dos dois lados dos thresholds de cada feature.
+
+        Inclui NaN espalhados e, nas últimas linhas, ±inf e um valor que estoura
+        float32, que os dois caminhos devem rejeitar.
+        """
+        rng = np.random.default_rng(seed)
+        X = rng.normal(size=(n, max(self.n_features, 1)))
+        for f in range(self.n_features):
+            cortes = self.threshold[self.feature == f]
+            if len(cortes):
+                perto = rng.choice(cortes, size=n) + rng.choice([-1e-3, 1e-3], size=n)
+                X[:, f] = np.where(rng.random(n) < 0.5, perto, X[:, f])
+        X[rng.random(X.shape) < 0.05] = np.nan
+        extremos = np.repeat(X[:1], 3, axis=0)
+        extremos[:, 0] = [np.inf, -np.inf, 1e300]
+        return np.vstack([X, extremos])
+
+
+def checar_paridade(
+    tree: CompiledTree,
+    predict_fn: Callable[[FloatArray], npt.ArrayLike],
+    X: npt.ArrayLike,
+    atol: float = 1e-9,
+) -> bool:
+    """Compara a árvore compilada com ``predict_fn`` (o caminho sklearn) na mesma matriz.
+
+    Linhas com valores infinitos em float32 precisam ser rejeitadas pelos dois.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    with np.errstate(over="ignore"):
+        invalidas = np.isinf(X.astype(np.float32)).any(axis=1)
+    for linha in X[invalidas]:
+        for chamada in (
+            lambda: predict_fn(linha.reshape(1, -1)),
+            lambda: tree.predict(linha.reshape(1, -1)),
+            lambda: tree.predict_one(linha),
+        ):
+            try:
+                chamada()
+            except ValueError:
+                continue
+            return False
+    X = X[~invalidas]
+    esperado = np.asarray(predict_fn(X), dtype=np.float64).ravel()
+    obtido = tree.predict(X)
+    unitario = np.array([tree.predict_one(linha) for linha in X])
+    return bool(
+        np.allclose(obtido, esperado, rtol=0, atol=atol, equal_nan=True)
+        and np.allclose(unitario, esperado, rtol=0, atol=atol, equal_nan=True)
+    )
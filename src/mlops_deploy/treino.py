@@ -0,0 +1,269 @@
+"""Treino reprodutível do ``DecisionTreeRegressor`` servido pela API.
+
+Refaz, sem o notebook, a busca em grade de ``notebooks/Código_Projeto.ipynb``:
+split 80/20 com ``random_state=42``, validação cruzada em 5 dobras
+(``KFold`` sem embaralhar, como o ``GridSearchCV``) e MSE como critério, sobre
+as mesmas colunas que a API envia ao modelo (``COLUNAS``).
+
+Cada célula (parâmetros x dobra) é ajustada em paralelo com ``joblib`` e o
+MSE dela fica gravado em ``cache_dir`` sob um hash de dados + dobra +
+parâmetros + versão do sklearn. Rodar de novo com uma grade maior só ajusta as
+células novas.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from mlops_deploy.features import COLUNAS, IDX_MUNICIPIO
+from mlops_deploy.municipios import encoder
+
+ALVO = "Total Crimes"
+SEMENTE = 42
+
+# Grade do notebook (célula do GridSearchCV da árvore de decisão)
+GRADE_PADRAO: Dict[str, List[Any]] = {
+    "max_depth": [10, 20, 30, None],
+    "min_samples_split": [2, 5, 10],
+    "min_samples_leaf": [1, 2, 4],
+}
+
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.intp]
+
+
+def hash_conteudo(*partes: Any) -> str:
+    """sha256 de arrays (bytes + dtype + forma) e objetos JSON, em ordem."""
+    h = hashlib.sha256()
+    for parte in partes:
+        if isinstance(parte, np.ndarray):
+            h.update(str((parte.dtype.str, parte.shape)).encode())
+            h.update(np.ascontiguousarray(parte).tobytes())
+        else:
+            h.update(json.dumps(parte, sort_keys=True, default=str).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def carregar_dados(path: str) -> Tuple[FloatArray, FloatArray]:
+    """(X na ordem de ``COLUNAS`` com o município codificado, y = ``Total Crimes``)."""
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=list(COLUNAS) + [ALVO])
+    codigos = encoder.encode_many(df[COLUNAS[IDX_MUNICIPIO]].tolist())
+    if (codigos < 0).any():
+        desconhecidos = sorted(set(df.loc[codigos < 0, COLUNAS[IDX_MUNICIPIO]]))
+        raise ValueError(f"Municípios fora do encoder em {path}: {desconhecidos[:5]}")
+    X = np.empty((len(df), len(COLUNAS)), dtype=np.float64)
+    for j, coluna in enumerate(COLUNAS):
+        X[:, j] = codigos if j == IDX_MUNICIPIO else df[coluna].to_numpy(dtype=np.float64)
+    return X, df[ALVO].to_numpy(dtype=np.float64)
+
+
+def combinacoes(grade: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Combinações da grade na mesma ordem do ``ParameterGrid`` (chaves em ordem alfabética)."""
+    chaves = sorted(grade)
+    return [dict(zip(chaves, valores)) for valores in product(*(grade[c] for c in chaves))]
+
+
+class CacheTreino:
+    """Dobras e resultados de ajuste gravados em disco, um arquivo por chave."""
+
+    def __init__(self, pasta: Optional[str]) -> None:
+        self.pasta = pasta
+        if pasta is not None:
+            os.makedirs(os.path.join(pasta, "dobras"), exist_ok=True)
+            os.makedirs(os.path.join(pasta, "ajustes"), exist_ok=True)
+
+    def dobras(self, n: int, cv: int, chave_dados: str) -> List[Tuple[IntArray, IntArray]]:
+        """Índices (treino, validação) das ``cv`` dobras, calculados uma vez por conjunto de dados."""
+        path = None if self.pasta is None else os.path.join(self.pasta, "dobras", f"{chave_dados}-{cv}.npz")
+        if path is not None and os.path.exists(path):
+            with np.load(path) as f:
+                return [(f[f"treino_{k}"], f[f"validacao_{k}"]) for k in range(cv)]
+        from sklearn.model_selection import KFold
+
+        dobras = [(t.astype(np.intp), v.astype(np.intp)) for t, v in KFold(cv).split(np.zeros(n))]
+        if path is not None:
+            from mlops_deploy.artefato import _gravar_atomico
+
+            arrays = {}
+            for k, (t, v) in enumerate(dobras):
+                arrays[f"treino_{k}"], arrays[f"validacao_{k}"] = t, v
+            _gravar_atomico(path, lambda f: np.savez(f, **arrays))
+        return dobras
+
+    def ler(self, chave: str) -> Optional[Dict[str, float]]:
+        if self.pasta is None:
+            return None
+        try:
+            with open(os.path.join(self.pasta, "ajustes", chave + ".json"), encoding="utf-8") as f:
+                return dict(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def gravar(self, chave: str, resultado: Mapping[str, float]) -> None:
+        if self.pasta is None:
+            return
+        from mlops_deploy.artefato import _gravar_atomico
+
+        texto = json.dumps(dict(resultado))
+        _gravar_atomico(os.path.join(self.pasta, "ajustes", chave + ".json"), lambda f: f.write(texto), modo="w")
+
+
+def _ajustar_dobra(
+    X: FloatArray, y: FloatArray, treino: IntArray, validacao: IntArray, params: Dict[str, Any], semente: int,
+) -> Dict[str, float]:
+    from sklearn.tree import DecisionTreeRegressor
+
+    inicio = time.perf_counter()
+    modelo = DecisionTreeRegressor(random_state=semente, **params).fit(X[treino], y[treino])
+    erro = modelo.predict(X[validacao]) - y[validacao]
+    return {"mse": float(np.mean(erro * erro)), "seconds": time.perf_counter() - inicio}
+
+
+@dataclass
+class ResultadoBusca:
+    melhores: Dict[str, Any]
+    resultados: List[Dict[str, Any]]  # por combinação: params, mse_medio, mse_dobras
+    ajustes_novos: int
+    ajustes_cache: int
+
+
+def busca_em_grade(
+    X: FloatArray,
+    y: FloatArray,
+    grade: Mapping[str, Sequence[Any]],
+    cv: int = 5,
+    n_jobs: int = 1,
+    cache_dir: Optional[str] = None,
+    semente: int = SEMENTE,
+    progresso: Optional[Callable[[int], None]] = None,
+) -> ResultadoBusca:
+    """Busca em grade com validação cruzada; só as células fora do cache são ajustadas.
+
+    O critério e o desempate são os do ``GridSearchCV``: menor MSE médio e,
+    em empate, a primeira combinação da grade.
+    """
+    import sklearn
+    from joblib import Parallel, delayed
+
+    cache = CacheTreino(cache_dir)
+    chave_dados = hash_conteudo(X, y)
+    dobras = cache.dobras(len(X), cv, chave_dados)
+    candidatos = combinacoes(grade)
+
+    chaves: Dict[Tuple[int, int], str] = {}
+    mse: Dict[Tuple[int, int], float] = {}
+    pendentes: List[Tuple[int, int]] = []
+    for i, params in enumerate(candidatos):
+        for k, (treino, _) in enumerate(dobras):
+            chave = hash_conteudo(chave_dados, treino, params, semente, sklearn.__version__)
+            chaves[i, k] = chave
+            salvo = cache.ler(chave)
+            if salvo is None:
+                pendentes.append((i, k))
+            else:
+                mse[i, k] = salvo["mse"]
+    if progresso is not None and len(mse):
+        progresso(len(mse))
+
+    if pendentes:
+        tarefas = (
+            delayed(_ajustar_dobra)(X, y, dobras[k][0], dobras[k][1], candidatos[i], semente)
+            for i, k in pendentes
+        )
+        saida = Parallel(n_jobs=n_jobs, return_as="generator")(tarefas)
+        for (i, k), resultado in zip(pendentes, saida):
+            cache.gravar(chaves[i, k], resultado)
+            mse[i, k] = resultado["mse"]
+            if progresso is not None:
+                progresso(1)
+
+    resultados = []
+    for i, params in enumerate(candidatos):
+        por_dobra = [mse[i, k] for k in range(len(dobras))]
+        resultados.append({"params": params, "mse_medio": float(np.mean(por_dobra)), "mse_dobras": por_dobra})
+    melhor = min(range(len(resultados)), key=lambda i: (resultados[i]["mse_medio"], i))
+    return ResultadoBusca(
+        melhores=candidatos[melhor],
+        resultados=resultados,
+        ajustes_novos=len(pendentes),
+        ajustes_cache=len(candidatos) * len(dobras) - len(pendentes),
+    )
+
+
+def metricas_regressao(y: FloatArray, previsto: FloatArray) -> Dict[str, float]:
+    erro = np.asarray(previsto, dtype=np.float64) - y
+    mse = float(np.mean(erro * erro))
+    variancia = float(np.sum((y - y.mean()) ** 2))
+    return {
+        "mse": mse,
+        "mae": float(np.mean(np.abs(erro))),
+        "r2": 1.0 - float(np.sum(erro * erro)) / variancia if variancia else float("nan"),
+    }
+
+
+def treinar(
+    data_path: str,
+    model_path: str,
+    grade: Mapping[str, Sequence[Any]] = GRADE_PADRAO,
+    cv: int = 5,
+    test_size: float = 0.2,
+    n_jobs: int = 1,
+    cache_dir: Optional[str] = None,
+    semente: int = SEMENTE,
+    progresso: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """Busca os hiperparâmetros, grava ``model_path`` e o artefato compacto com o relatório de treino.
+
+    Devolve o relatório, que também vai para a chave ``training`` do manifesto.
+    """
+    import joblib
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.tree import DecisionTreeRegressor
+
+    from mlops_deploy import artefato
+    from mlops_deploy.registry import _predict_sklearn, hash_arquivo
+
+    inicio = time.perf_counter()
+    X, y = carregar_dados(data_path)
+    X_treino, X_teste, y_treino, y_teste = train_test_split(X, y, test_size=test_size, random_state=semente)
+    busca = busca_em_grade(X_treino, y_treino, grade, cv=cv, n_jobs=n_jobs, cache_dir=cache_dir,
+                           semente=semente, progresso=progresso)
+
+    # Ajuste final com nomes de colunas: o modelo guarda feature_names_in_ = COLUNAS
+    modelo = DecisionTreeRegressor(random_state=semente, **busca.melhores)
+    modelo.fit(pd.DataFrame(X_treino, columns=list(COLUNAS)), y_treino)
+    predict = _predict_sklearn(modelo)
+
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    artefato._gravar_atomico(model_path, lambda f: joblib.dump(modelo, f))
+    relatorio = {
+        "data": {"file": os.path.basename(data_path), "sha256": hash_arquivo(data_path), "rows": len(X)},
+        "target": ALVO,
+        "seed": semente,
+        "test_size": test_size,
+        "cv": cv,
+        "grid": {k: list(v) for k, v in grade.items()},
+        "best_params": busca.melhores,
+        "cv_mse": min(r["mse_medio"] for r in busca.resultados),
+        "metrics": {
+            "train": metricas_regressao(y_treino, predict(X_treino)),
+            "test": metricas_regressao(y_teste, predict(X_teste)),
+        },
+        "fits": {"new": busca.ajustes_novos, "cached": busca.ajustes_cache},
+        "n_jobs": n_jobs,
+        "seconds": round(time.perf_counter() - inicio, 3),
+    }
+    artefato.exportar(modelo, model_path, hash_arquivo(model_path), predict, treino=relatorio)
+    return relatorio
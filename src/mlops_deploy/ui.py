@@ -0,0 +1,244 @@
+"""Página HTML da UI de previsão, pré-compilada.
+
+O cabeçalho com o CSS, o ``<datalist>`` de municípios e os pedaços fixos de
+cada campo são montados uma vez; por requisição só entram os valores dos campos
+e o bloco de resultado. Páginas inteiramente estáticas viram ``Variante``:
+bytes prontos, comprimidos e com ETag forte.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import html
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+try:  # opcional: só usado se o pacote estiver instalado
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+URL = "/previsao-total-crimes/ui"
+
+# (campo, rótulo, step) na ordem do formulário
+CAMPOS_UI: Tuple[Tuple[str, str, str], ...] = (
+    ("ano", "Ano", "1"),
+    ("municipio", "Município", ""),
+    ("ideb", "IDEB", "0.01"),
+    ("ensino_fundamental_docentes", "EF - Docentes", "0.01"),
+    ("ensino_fundamental_escolas", "EF - Escolas", "0.01"),
+    ("ensino_fundamental_matriculas", "EF - Matrículas", "0.01"),
+    ("ensino_infantil_docentes", "EI - Docentes", "0.01"),
+    ("ensino_infantil_escolas", "EI - Escolas", "0.01"),
+    ("ensino_infantil_matriculas", "EI - Matrículas", "0.01"),
+    ("ensino_medio_docentes", "EM - Docentes", "0.01"),
+    ("ensino_medio_escolas", "EM - Escolas", "0.01"),
+    ("ensino_medio_matriculas", "EM - Matrículas", "0.01"),
+)
+
+# Valores do link "usar valores de exemplo"
+EXEMPLO = {
+    "ano": 2024, "municipio": "Recife", "ideb": 5.2,
+    "ensino_fundamental_docentes": 1000, "ensino_fundamental_escolas": 200, "ensino_fundamental_matriculas": 30000,
+    "ensino_infantil_docentes": 500, "ensino_infantil_escolas": 100, "ensino_infantil_matriculas": 15000,
+    "ensino_medio_docentes": 800, "ensino_medio_escolas": 150, "ensino_medio_matriculas": 25000
+}
+URL_EXEMPLO = URL + "?" + urlencode(EXEMPLO)
+
+TOPO = """
+    <!doctype html>
+    <html lang="pt-br">
+    <head>
+      <meta charset="utf-8" />
+      <meta name="viewport" content="width=device-width, initial-scale=1" />
+      <title>Previsão de Crimes</title>
+      <style>
+        :root { --bg:#0b1020; --card:#121a36; --text:#e7ecff; --muted:#9db0ff; --accent:#6ea8fe; }
+        * { box-sizing: border-box; }
+        body{ margin:0; font-family:Inter,system-ui,Segoe UI,Roboto,Arial,sans-serif; background:linear-gradient(180deg,#0b1020,#0e1330); color:var(--text); }
+        .container{ max-width:980px; margin:40px auto; padding:0 20px; }
+        .title{ font-weight:700; font-size:28px; margin:6px 0 16px; letter-spacing:.2px; }
+        .subtitle{ color:var(--muted); margin-bottom:24px; }
+        .card{ background:var(--card); border:1px solid rgba(255,255,255,.08); border-radius:16px; padding:20px; box-shadow:0 10px 30px rgba(0,0,0,.35);}
+        .grid{ display:grid; grid-template-columns:repeat(2,minmax(0,1fr)); gap:14px;}
+        .field label{ font-size:13px; color:var(--muted); display:block; margin-bottom:6px;}
+        .field input, .field select{
+          width:100%; background:#0e1530; color:var(--text);
+          border:1px solid rgba(255,255,255,.08); border-radius:10px; padding:10px 12px;
+          outline:none;
+        }
+        .actions{ margin-top:16px; display:flex; gap:10px; }
+        .btn{
+          background:var(--accent); color:#0b1020; border:none; border-radius:10px;
+          padding:10px 14px; font-weight:600; cursor:pointer;
+        }
+        .result{ margin-top:18px; display:flex; gap:16px; align-items:center;}
+        .badge{ background:#0e1530; border:1px solid rgba(255,255,255,.08); padding:6px 10px; border-radius:999px; color:var(--muted); font-size:12px;}
+        .total{ font-size:34px; font-weight:800; letter-spacing:.4px;}
+        .err{ margin-top:16px; padding:12px; border-radius:10px; background:#2a0f15; border:1px solid #7a2a35; color:#ffcbd1; }
+        .muted{ color:var(--muted); font-size:13px; }
+        .explicacao{ list-style:none; padding:0; margin:8px 0 0; display:flex; flex-wrap:wrap; gap:8px; font-size:13px; }
+        @media (max-width:760px){ .grid{ grid-template-columns:1fr; } }
+      </style>
+    </head>
+    <body>
+      <div class="container">
+        <div class="title">Previsão de Crimes</div>
+        <div class="subtitle">Informe os parâmetros e visualize a previsão em tempo real.</div>
+        <div class="card">
+          <form method="get" action="/previsao-total-crimes/ui">
+            <div class="grid">
+    """
+
+MEIO = """
+            </div>
+            <div class="actions">
+              <button class="btn" type="submit">Calcular previsão</button>
+              <a class="btn" style="background:#0e1530;color:#e7ecff;border:1px solid rgba(255,255,255,.12)" href="/previsao-total-crimes/ui">Limpar</a>
+            </div>
+          </form>
+    """
+
+FIM = """
+        </div>
+      </div>
+    </body>
+    </html>
+    """
+
+DICA = f"""
+          <div class="muted">Preencha os campos e clique em <b>Calcular previsão</b>.
+            Exemplo rápido: <a href="{html.escape(URL_EXEMPLO)}" style="color:var(--accent)">usar valores de exemplo</a>.
+          </div>
+        """
+
+
+def resultado_html(municipio: str, ano: float, total: float) -> str:
+    return f"""
+            <div class="result">
+              <span class="badge">{html.escape(municipio)} · {int(ano)}</span>
+              <div>
+                <div class="muted">Total de Crimes Previsto</div>
+                <div class="total">{total}</div>
+              </div>
+            </div>
+            """
+
+
+def explicacao_html(base: float, contribuicoes: Mapping[str, float]) -> str:
+    """Painel "por que este valor?": contribuição de cada campo, da maior para a menor."""
+    rotulos = {campo: rotulo for campo, rotulo, _ in CAMPOS_UI}
+    itens = sorted(contribuicoes.items(), key=lambda kv: -abs(kv[1]))
+    lista = "".join(
+        f'<li><span class="badge">{html.escape(rotulos.get(campo, campo))} {valor:+.4f}</span></li>'
+        for campo, valor in itens
+    )
+    return f"""
+            <div class="muted" style="margin-top:14px">Por que este valor? Partindo de {base:.4f} (média do treino),
+              cada campo testado no caminho da árvore somou:</div>
+            <ul class="explicacao">{lista}</ul>
+            """
+
+
+def erro_html(mensagem: str) -> str:
+    return f"""<div class="err">Erro ao calcular: {html.escape(mensagem)}</div>"""
+
+
+class Pagina:
+    """Template da página com as partes fixas já concatenadas.
+
+    ``render`` intercala os pedaços fixos com os valores (escapados) dos campos;
+    o custo por requisição é um ``join`` de ~30 strings.
+    """
+
+    def __init__(self, municipios: Iterable[str]) -> None:
+        datalist = "".join(f"<option value='{html.escape(m.title(), quote=True)}'>" for m in municipios)
+        pedacos = []
+        anterior = TOPO
+        for campo, rotulo, step in CAMPOS_UI:
+            # Tudo até o value=" do campo é fixo; o valor entra no render
+            if campo == "municipio":
+                entrada = '<input list="municipios" name="municipio" placeholder="Ex.: Recife" value="'
+                depois = f'">\n        <datalist id="municipios">{datalist}</datalist>\n      </div>'
+            else:
+                entrada = f'<input type="number" step="{step}" name="{campo}" value="'
+                depois = '">\n      </div>'
+            pedacos.append(f'{anterior}\n      <div class="field">\n        <label>{rotulo}</label>\n        {entrada}')
+            anterior = depois
+        self._pedacos = tuple(pedacos)
+        self._depois_campos = anterior + "\n    " + MEIO
+
+    def render(self, valores: Mapping[str, object], resultado: str) -> str:
+        partes = []
+        for pedaco, (campo, _, _) in zip(self._pedacos, CAMPOS_UI):
+            partes.append(pedaco)
+            v = valores.get(campo)
+            if v is not None:
+                partes.append(html.escape(str(v), quote=True))
+        partes.append(self._depois_campos)
+        partes.append(resultado)
+        partes.append(FIM)
+        return "".join(partes)
+
+
+@dataclass(frozen=True)
+class Variante:
+    """Página estática pronta: corpo, versões comprimidas e ETag forte."""
+
+    corpo: bytes
+    gzip: bytes
+    br: Optional[bytes]
+    etag: str
+
+    @classmethod
+    def de_html(cls, texto: str) -> "Variante":
+        corpo = texto.encode("utf-8")
+        return cls(
+            corpo=corpo,
+            # mtime=0: mesma página, mesmos bytes comprimidos entre workers
+            gzip=gzip.compress(corpo, compresslevel=9, mtime=0),
+            br=brotli.compress(corpo) if brotli is not None else None,
+            etag='"' + hashlib.sha256(corpo).hexdigest()[:32] + '"',
+        )
+
+    def codificada(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Melhor representação para o ``Accept-Encoding`` do cliente."""
+        aceitas = aceita_codificacoes(accept_encoding)
+        if self.br is not None and "br" in aceitas:
+            return self.br, "br"
+        if "gzip" in aceitas:
+            return self.gzip, "gzip"
+        return self.corpo, None
+
+
+def aceita_codificacoes(accept_encoding: Optional[str]) -> frozenset:
+    """Codificações com q > 0 em ``Accept-Encoding``."""
+    aceitas = set()
+    for item in (accept_encoding or "").split(","):
+        nome, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            chave, _, valor = param.strip().partition("=")
+            if chave == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        if nome and q > 0:
+            aceitas.add(nome.strip().lower())
+    return frozenset(aceitas)
+
+
+def etag_confere(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` casa com ``etag`` (comparação fraca, como manda a RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    alvo = etag[2:] if etag.startswith("W/") else etag
+    for item in if_none_match.split(","):
+        item = item.strip()
+        if (item[2:] if item.startswith("W/") else item) == alvo:
+            return True
+    return False
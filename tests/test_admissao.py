@@ -0,0 +1,84 @@
+"""Tests for `mlops_deploy.admissao`."""
+
+
+import asyncio
+import unittest
+
+from mlops_deploy.admissao import BAIXA, NORMAL, Admissao, Sobrecarga
+
+
+class TestAdmissao(unittest.TestCase):
+    """Tests for the in-flight cap, the bounded queue and the priorities."""
+
+    def test_cap_and_queue_hand_over_slots(self):
+        async def cenario():
+            adm = Admissao(2, max_fila=4, prazo=1.0)
+            em_voo = []
+
+            async def trabalho():
+                async with adm.vaga():
+                    em_voo.append(adm.em_voo)
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(*(trabalho() for _ in range(6)))
+            return adm, em_voo
+
+        adm, em_voo = asyncio.run(cenario())
+        self.assertEqual(len(em_voo), 6)
+        self.assertLessEqual(max(em_voo), 2)
+        self.assertEqual(adm.em_voo, 0)
+        self.assertEqual(adm.stats()["admitted"], {NORMAL: 6, BAIXA: 0})
+
+    def test_full_queue_and_deadline_shed(self):
+        async def cenario():
+            adm = Admissao(1, max_fila=1, prazo=0.02, retry_after=2)
+            await adm.entrar()
+            espera = asyncio.ensure_future(adm.entrar())
+            await asyncio.sleep(0)
+            with self.assertRaises(Sobrecarga) as cheia:
+                await adm.entrar()
+            with self.assertRaises(Sobrecarga) as prazo:
+                await espera
+            return adm, cheia.exception, prazo.exception
+
+        adm, cheia, prazo = asyncio.run(cenario())
+        self.assertEqual((cheia.motivo, cheia.retry_after), ("fila_cheia", 2))
+        self.assertEqual(prazo.motivo, "prazo")
+        self.assertEqual(adm.stats()["shed"], {NORMAL: {"fila_cheia": 1, "prazo": 1}})
+        self.assertEqual(adm.profundidade, 0)
+
+    def test_low_priority_is_shed_first(self):
+        async def cenario():
+            adm = Admissao(2, max_fila=1, prazo=1.0, reserva=1)
+            await adm.entrar(BAIXA)
+            # A última vaga é reservada: BAIXA espera, NORMAL entra
+            baixa = asyncio.ensure_future(adm.entrar(BAIXA))
+            await asyncio.sleep(0)
+            self.assertEqual(adm.stats()["queue_depth"], {NORMAL: 0, BAIXA: 1})
+            await adm.entrar(NORMAL)
+            # Fila cheia: a NORMAL que chega desaloja a BAIXA que esperava
+            normal = asyncio.ensure_future(adm.entrar(NORMAL))
+            await asyncio.sleep(0)
+            with self.assertRaises(Sobrecarga) as desalojada:
+                await baixa
+            adm.sair()
+            await normal
+            return adm, desalojada.exception
+
+        adm, desalojada = asyncio.run(cenario())
+        self.assertEqual((desalojada.prioridade, desalojada.motivo), (BAIXA, "desalojada"))
+        self.assertEqual(adm.em_voo, 2)
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        async def cenario():
+            adm = Admissao(1, max_fila=2, prazo=1.0)
+            await adm.entrar()
+            espera = asyncio.ensure_future(adm.entrar())
+            await asyncio.sleep(0)
+            espera.cancel()
+            await asyncio.sleep(0)
+            adm.sair()
+            return adm
+
+        adm = asyncio.run(cenario())
+        self.assertEqual((adm.em_voo, adm.profundidade), (0, 0))
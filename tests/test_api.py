@@ -0,0 +1,454 @@
+"""Tests for the FastAPI app in `main.py`."""
+
+
+import io
+import json
+import unittest
+import unittest.mock
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import main
+from mlops_deploy import formatos
+
+EXEMPLO = {
+    "ano": 2024, "municipio": "Recife", "ideb": 5.2,
+    "ensino_fundamental_docentes": 1000, "ensino_fundamental_escolas": 200,
+    "ensino_fundamental_matriculas": 30000,
+    "ensino_infantil_docentes": 500, "ensino_infantil_escolas": 100,
+    "ensino_infantil_matriculas": 15000,
+    "ensino_medio_docentes": 800, "ensino_medio_escolas": 150,
+    "ensino_medio_matriculas": 25000,
+}
+
+
+class TestApi(unittest.TestCase):
+    """Tests for the prediction endpoints."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_openapi_schema(self):
+        r = self.client.get("/openapi.json")
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("/previsao-total-crimes/stream", r.json()["paths"])
+
+    def test_post_single(self):
+        r = self.client.post("/previsao-total-crimes/", json=EXEMPLO)
+        self.assertEqual(r.status_code, 200)
+        self.assertIn("TotalCrimesPrevisto", r.json())
+
+    def test_repeat_query_hits_cache(self):
+        antes = self.client.get("/").json()["cache"]["hits"]
+        dados = dict(EXEMPLO, ideb=4.4)
+        r1 = self.client.post("/previsao-total-crimes/", json=dados).json()
+        r2 = self.client.post("/previsao-total-crimes/", json=dados).json()
+        self.assertEqual(r1, r2)
+        self.assertEqual(self.client.get("/").json()["cache"]["hits"], antes + 1)
+
+    def test_health_reports_model_version(self):
+        info = self.client.get("/").json()["model"]
+        self.assertEqual(len(info["sha256"]), 64)
+        self.assertTrue(info["compiled"])
+
+    def test_health_reports_startup_timings(self):
+        startup = self.client.get("/").json()["startup"]
+        self.assertEqual(startup["artifact"], "npz")
+        self.assertGreater(startup["import_seconds"], 0)
+        self.assertIn("first_predict_seconds", startup)
+
+    def test_admin_reload_requires_token(self):
+        r = self.client.post("/admin/reload-model")
+        self.assertEqual(r.status_code, 403)
+
+    def test_admin_reload_unchanged_artifact(self):
+        with unittest.mock.patch.object(main, "ADMIN_TOKEN", "segredo"):
+            r = self.client.post("/admin/reload-model", headers={"X-Admin-Token": "segredo"})
+        self.assertEqual(r.status_code, 200)
+        self.assertFalse(r.json()["reloaded"])
+
+    def test_post_invalid_body_is_422(self):
+        r = self.client.post("/previsao-total-crimes/", json={**EXEMPLO, "ideb": "x"})
+        self.assertEqual(r.status_code, 422)
+        self.assertEqual(r.json()["detail"][0]["loc"], ["ideb"])
+
+    def test_metrics_exposes_stages_and_requests(self):
+        self.client.post("/previsao-total-crimes/", json=EXEMPLO)
+        self.client.get("/previsao-total-crimes/ui", params={"ano": 2024})
+        texto = self.client.get("/metrics").text
+        for estagio in ("validacao", "municipio", "matriz", "cache", "html"):
+            self.assertIn(f'prediction_stage_duration_seconds_count{{stage="{estagio}"}}', texto)
+        versao = main.registry.atual.versao
+        self.assertIn(
+            f'http_requests_total{{endpoint="/previsao-total-crimes/",method="POST",model_version="{versao}",status="200"}}',
+            texto,
+        )
+        self.assertIn('http_request_duration_seconds_bucket{endpoint="/previsao-total-crimes/ui",le="+Inf"}', texto)
+        self.assertIn(f'model_info{{version="{versao}"}} 1', texto)
+
+    def test_ui_empty_form_cached_with_etag(self):
+        r = self.client.get("/previsao-total-crimes/ui", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.headers["content-encoding"], "gzip")
+        self.assertIn("<datalist id=\"municipios\">", r.text)
+        etag = r.headers["etag"]
+        r2 = self.client.get("/previsao-total-crimes/ui", headers={"If-None-Match": etag})
+        self.assertEqual(r2.status_code, 304)
+        self.assertEqual(r2.content, b"")
+        self.assertEqual(r2.headers["etag"], etag)
+
+    def test_ui_example_matches_prediction(self):
+        r = self.client.get("/previsao-total-crimes/ui", params=EXEMPLO)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.headers["cache-control"], "no-cache")
+        y = self.client.post("/previsao-total-crimes/", json=EXEMPLO).json()["TotalCrimesPrevisto"]
+        self.assertIn(f'<div class="total">{y}</div>', r.text)
+        r2 = self.client.get("/previsao-total-crimes/ui", params=EXEMPLO, headers={"If-None-Match": r.headers["etag"]})
+        self.assertEqual(r2.status_code, 304)
+
+    def test_ui_dynamic_escapes_and_reports_error(self):
+        r = self.client.get("/previsao-total-crimes/ui", params={**EXEMPLO, "municipio": "<b>x</b>"})
+        self.assertEqual(r.status_code, 200)
+        self.assertNotIn("<b>x</b>", r.text)
+        self.assertIn('class="err"', r.text)
+        self.assertNotIn("etag", r.headers)
+
+    def test_lookup_by_municipio_ano_matches_post(self):
+        store = main.feature_store
+        codigo, ano = int(store.codigos[0]), store.anos[0]
+        linha = store.linha(codigo, ano)
+        municipio = main.encoder.decode(codigo)
+        r = self.client.get(f"/previsao-total-crimes/{municipio.title()}/{ano}")
+        self.assertEqual(r.status_code, 200)
+        payload = dict(zip(main.CAMPOS, linha), municipio=municipio)
+        esperado = self.client.post("/previsao-total-crimes/", json=payload).json()["TotalCrimesPrevisto"]
+        self.assertEqual(r.json()["TotalCrimesPrevisto"], esperado)
+        self.assertEqual(r.json()["ajustes"], {})
+
+        ajustado = self.client.get(f"/previsao-total-crimes/{municipio}/{ano}", params={"ideb": 3.0})
+        self.assertEqual(ajustado.json()["ajustes"], {"ideb": 3.0})
+        payload["ideb"] = 3.0
+        esperado = self.client.post("/previsao-total-crimes/", json=payload).json()["TotalCrimesPrevisto"]
+        self.assertEqual(ajustado.json()["TotalCrimesPrevisto"], esperado)
+
+    def test_lookup_unknown_year_or_municipio(self):
+        self.assertEqual(self.client.get("/previsao-total-crimes/recife/99").status_code, 404)
+        self.assertEqual(self.client.get("/previsao-total-crimes/atlantida/0").status_code, 400)
+
+    def test_ranking_matches_lookup(self):
+        ano = main.feature_store.anos[-1]
+        r = self.client.get("/ranking", params={"ano": ano, "k": 3})
+        self.assertEqual(r.status_code, 200)
+        ranking = r.json()["ranking"]
+        self.assertEqual([item["rank"] for item in ranking], [1, 2, 3])
+        valores = [item["TotalCrimesPrevisto"] for item in ranking]
+        self.assertEqual(valores, sorted(valores, reverse=True))
+        primeiro = self.client.get(f"/previsao-total-crimes/{ranking[0]['municipio']}/{ano}").json()
+        self.assertEqual(primeiro["TotalCrimesPrevisto"], valores[0])
+
+    def test_ranking_subset_and_errors(self):
+        ano = main.feature_store.anos[0]
+        r = self.client.get("/ranking", params={"ano": ano, "municipios": "Recife, olinda", "order": "asc"})
+        self.assertEqual({item["municipio"] for item in r.json()["ranking"]}, {"recife", "olinda"})
+        self.assertEqual(self.client.get("/ranking", params={"ano": ano, "municipios": "x"}).status_code, 400)
+        self.assertEqual(self.client.get("/ranking", params={"ano": 42}).status_code, 404)
+        self.assertEqual(self.client.get("/ranking", params={"ano": ano, "order": "up"}).status_code, 422)
+
+    def test_sweep_curve_matches_single_predictions(self):
+        store = main.feature_store
+        linha = store.linha(int(store.codigos[0]), store.anos[0])
+        base = dict(zip(main.CAMPOS, linha), municipio=main.encoder.decode(int(store.codigos[0])))
+        corpo = {"base": base, "eixos": [{"campo": "ideb", "inicio": -2, "fim": 2, "passos": 5}]}
+        r = self.client.post("/previsao-total-crimes/sweep", json=corpo)
+        self.assertEqual(r.status_code, 200)
+        curva = r.json()["TotalCrimesPrevisto"]
+        self.assertEqual(r.json()["eixos"][0]["valores"], [-2.0, -1.0, 0.0, 1.0, 2.0])
+        for ideb, y in zip([-2, -1, 0, 1, 2], curva):
+            unico = self.client.post("/previsao-total-crimes/", json={**base, "ideb": ideb}).json()
+            self.assertEqual(unico["TotalCrimesPrevisto"], y)
+        for ponto in r.json()["breakpoints"]["ideb"]:
+            self.assertNotEqual(ponto["antes"], ponto["depois"])
+
+    def test_sweep_surface_and_limits(self):
+        corpo = {"base": EXEMPLO, "eixos": [
+            {"campo": "ideb", "inicio": 0, "fim": 1, "passos": 3},
+            {"campo": "ano", "inicio": -1, "fim": 1, "passos": 4},
+        ]}
+        r = self.client.post("/previsao-total-crimes/sweep", json=corpo)
+        self.assertEqual(r.status_code, 200)
+        superficie = r.json()["TotalCrimesPrevisto"]
+        self.assertEqual([len(l) for l in superficie], [4, 4, 4])
+        self.assertEqual(set(r.json()["breakpoints"]), {"ideb", "ano"})
+
+        corpo["eixos"][1]["campo"] = "ideb"
+        self.assertEqual(self.client.post("/previsao-total-crimes/sweep", json=corpo).status_code, 400)
+        corpo["eixos"][1] = {"campo": "municipio", "inicio": 0, "fim": 1, "passos": 2}
+        self.assertEqual(self.client.post("/previsao-total-crimes/sweep", json=corpo).status_code, 422)
+        grande = {"base": EXEMPLO, "eixos": [{"campo": "ideb", "inicio": 0, "fim": 1, "passos": main.SWEEP_MAX_POINTS + 1}]}
+        self.assertEqual(self.client.post("/previsao-total-crimes/sweep", json=grande).status_code, 413)
+
+    def test_horizon_matches_single_predictions_on_the_tensor(self):
+        codigos = np.unique(main.feature_store.codigos)[:2]
+        nomes = [main.encoder.decode(int(c)) for c in codigos]
+        r = self.client.post("/previsao-total-crimes/horizonte", json={"municipios": nomes, "anos": 3})
+        self.assertEqual(r.status_code, 200)
+        trajetorias = r.json()["trajetorias"]
+        self.assertEqual([t["municipio"] for t in trajetorias], nomes)
+        _, X = main.tendencias.tensor(codigos, 3)
+        esperado = [round(float(main.modelo_atual().predict(x[None, :])[0]), 2) for x in X]
+        self.assertEqual([y for t in trajetorias for y in t["TotalCrimesPrevisto"]], esperado)
+
+        corpo = {"municipios": nomes[:1], "politica": "taxas", "taxas": {"ideb": 0.1}}
+        self.assertEqual(self.client.post("/previsao-total-crimes/horizonte", json=corpo).status_code, 200)
+
+    def test_horizon_errors(self):
+        url = "/previsao-total-crimes/horizonte"
+        nome = main.encoder.decode(int(main.feature_store.codigos[0]))
+        self.assertEqual(self.client.post(url, json={"municipios": ["Atlantida"]}).status_code, 400)
+        self.assertEqual(self.client.post(url, json={"municipios": [nome], "politica": "taxas"}).status_code, 400)
+        self.assertEqual(self.client.post(url, json={"municipios": [nome], "taxas": {"ideb": 1}}).status_code, 400)
+        corpo = {"municipios": [nome], "politica": "taxas", "taxas": {"ano": 1}}
+        self.assertEqual(self.client.post(url, json=corpo).status_code, 422)
+        corpo = {"municipios": [nome], "anos": main.HORIZON_MAX_YEARS + 1}
+        self.assertEqual(self.client.post(url, json=corpo).status_code, 422)
+        with unittest.mock.patch.object(main.tendencias, "n", np.zeros_like(main.tendencias.n)):
+            self.assertEqual(self.client.post(url, json={"municipios": [nome]}).status_code, 404)
+
+    def test_explanation_endpoint_and_flag(self):
+        r = self.client.post("/previsao-total-crimes/explicacao", json=EXEMPLO)
+        self.assertEqual(r.status_code, 200)
+        exp = r.json()
+        esperado = self.client.post("/previsao-total-crimes/", json=EXEMPLO).json()["TotalCrimesPrevisto"]
+        self.assertEqual(exp["TotalCrimesPrevisto"], esperado)
+        self.assertAlmostEqual(exp["base"] + sum(exp["contribuicoes"].values()), esperado, delta=0.01)
+        self.assertEqual(exp["caminho"][0]["no"], 0)
+
+        com_flag = self.client.post("/previsao-total-crimes/", params={"explicar": "true"}, json=EXEMPLO).json()
+        self.assertEqual(com_flag["TotalCrimesPrevisto"], esperado)
+        self.assertEqual(com_flag["explicacao"]["folha"], exp["folha"])
+        self.assertNotIn("explicacao", self.client.post("/previsao-total-crimes/", json=EXEMPLO).json())
+
+        lote = self.client.post("/previsao-total-crimes/batch", params={"explicar": "true"},
+                                json=[EXEMPLO, {**EXEMPLO, "municipio": "x"}]).json()["resultados"]
+        self.assertEqual(lote[0]["explicacao"]["contribuicoes"], exp["contribuicoes"])
+        self.assertIn("erro", lote[1])
+
+    def test_ui_shows_explanation_panel(self):
+        r = self.client.get("/previsao-total-crimes/ui", params={**EXEMPLO, "ideb": 4.1})
+        self.assertIn('class="explicacao"', r.text)
+
+    def test_concurrent_identical_ui_requests_are_coalesced(self):
+        import asyncio
+        import time
+
+        import httpx
+
+        original = main.pagina_resultado
+        renders = []
+
+        def lenta(valores):
+            renders.append(1)
+            time.sleep(0.05)
+            return original(valores)
+
+        async def cenario():
+            transporte = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://teste") as cliente:
+                params = {**EXEMPLO, "ideb": 3.3}
+                return await asyncio.gather(*(cliente.get("/previsao-total-crimes/ui", params=params) for _ in range(6)))
+
+        antes = main.singleflight["ui"].seguidores
+        with unittest.mock.patch.object(main, "pagina_resultado", lenta):
+            respostas = asyncio.run(cenario())
+        self.assertEqual({r.status_code for r in respostas}, {200})
+        self.assertEqual(len({r.text for r in respostas}), 1)
+        self.assertEqual(len(renders), 1)
+        self.assertEqual(main.singleflight["ui"].seguidores - antes, 5)
+        self.assertIn('singleflight_coalescing_ratio{endpoint="ui"}', self.client.get("/metrics").text)
+
+    def test_overload_sheds_with_retry_after_but_serves_health_and_cache(self):
+        from mlops_deploy.admissao import Admissao
+
+        em_cache = dict(EXEMPLO, ideb=2.2)
+        self.client.post("/previsao-total-crimes/", json=em_cache)
+        lotada = Admissao(1, max_fila=0)
+        lotada.em_voo = 1  # única vaga ocupada
+        with unittest.mock.patch.object(main, "admissao", lotada):
+            lote = self.client.post("/previsao-total-crimes/batch", json=[EXEMPLO])
+            novo = self.client.post("/previsao-total-crimes/", json=dict(EXEMPLO, ideb=2.3))
+            cache = self.client.post("/previsao-total-crimes/", json=em_cache)
+            health = self.client.get("/")
+        self.assertEqual((lote.status_code, lote.headers["retry-after"]), (503, "1"))
+        self.assertEqual(novo.status_code, 503)
+        self.assertEqual(cache.status_code, 200)
+        self.assertEqual(health.json()["admission"]["shed"], {"baixa": {"fila_cheia": 1}, "normal": {"fila_cheia": 1}})
+        self.assertIn('admission_shed_total{priority="baixa",reason="fila_cheia"}', self.client.get("/metrics").text)
+
+    def test_drift_status_counts_predicted_rows(self):
+        antes = self.client.get("/drift").json()["observed_rows"]
+        self.client.post("/previsao-total-crimes/", json=EXEMPLO)
+        self.client.post("/previsao-total-crimes/batch", json=[EXEMPLO, EXEMPLO, {**EXEMPLO, "municipio": "x"}])
+        status = self.client.get("/drift").json()
+        self.assertEqual(status["observed_rows"], antes + 3)
+        # EXEMPLO usa valores brutos; o data_set está padronizado
+        self.assertGreater(status["features"]["ensino_fundamental_matriculas"]["above_max"], 0)
+        self.assertIn('drift_psi{feature="ideb"}', self.client.get("/metrics").text)
+
+    def test_served_predictions_reach_the_audit_log(self):
+        import tempfile
+
+        from mlops_deploy.auditoria import Auditoria, consultar
+
+        with tempfile.TemporaryDirectory() as d:
+            caminho = f"{d}/auditoria.db"
+            aud = Auditoria(caminho, intervalo=60)
+            aud.iniciar()
+            with unittest.mock.patch.object(main, "auditoria", aud):
+                y = self.client.post("/previsao-total-crimes/", json=EXEMPLO).json()["TotalCrimesPrevisto"]
+                self.client.post("/previsao-total-crimes/batch", json=[EXEMPLO, {**EXEMPLO, "municipio": "Olinda"}])
+            aud.parar()
+            registros = consultar(caminho, municipio="recife")
+            self.assertEqual([(r["endpoint"], r["total_crimes_previsto"]) for r in registros],
+                             [("post", y), ("batch", y)])
+            self.assertEqual(registros[0]["model_version"], main.registry.atual.versao)
+            self.assertEqual(len(consultar(caminho)), 3)
+
+    def test_candidate_is_shadowed_and_canary_routed(self):
+        import types
+
+        from mlops_deploy.sombra import Sombra
+
+        principal = main.registry.atual
+
+        class Candidato:
+            sha256 = "c" * 64
+            versao = "candidato"
+            arvore = None
+
+            def predict(self, X):
+                return np.asarray(principal.predict(X)) + 1.0
+
+            def predict_one(self, linha):
+                return principal.predict_one(linha) + 1.0
+
+        candidato = types.SimpleNamespace(atual=Candidato(), info=lambda: {})
+        dados = dict(EXEMPLO, ideb=1.7)
+        y = self.client.post("/previsao-total-crimes/", json=dados).json()["TotalCrimesPrevisto"]
+        for canario, esperado in ((0, y), (100, round(y + 1.0, 2))):
+            sombra = Sombra()
+            sombra.iniciar()
+            with unittest.mock.patch.multiple(main, candidato=candidato, sombra=sombra, CANARY_PERCENT=canario):
+                r = self.client.post("/previsao-total-crimes/", json=dados).json()
+                self.client.post("/previsao-total-crimes/batch", json=[dados, dados])
+                shadow = self.client.get("/").json()["candidate"]
+            sombra.parar()
+            st = sombra.stats()
+            self.assertEqual(r["TotalCrimesPrevisto"], esperado)
+            self.assertEqual(shadow["canary_percent"], canario)
+            self.assertEqual((st["rows"], st["mean_delta"], st["disagreement_rate"]), (3, 1.0, 1.0))
+            self.assertEqual(st["rows_by_endpoint"], {"post": 1, "batch": 2})
+
+    def test_compact_formats_match_json(self):
+        esperado = self.client.post("/previsao-total-crimes/", json=EXEMPLO).json()["TotalCrimesPrevisto"]
+        linha = [EXEMPLO[c] for c in main.CAMPOS]
+        r = self.client.post("/previsao-total-crimes/", content=json.dumps(linha),
+                             headers={"Content-Type": "application/x-positional+json"})
+        self.assertEqual(r.headers["content-type"], "application/x-positional+json")
+        self.assertEqual(r.json(), [esperado])
+        r = self.client.post("/previsao-total-crimes/", content=json.dumps(linha),
+                             headers={"Content-Type": "application/x-positional+json", "Accept": "application/json"})
+        self.assertEqual(r.json(), {"TotalCrimesPrevisto": esperado})
+
+        X = np.array([linha[:1] + [main.encoder.encode("recife")] + linha[2:]] * 3, dtype=np.float64)
+        X[2, main.IDX_MUNICIPIO] = 999
+        buf = io.BytesIO()
+        np.save(buf, X)
+        r = self.client.post("/previsao-total-crimes/batch", content=buf.getvalue(),
+                             headers={"Content-Type": "application/x-npy"})
+        self.assertEqual(r.headers["content-type"], "application/x-npy")
+        y = np.load(io.BytesIO(r.content))
+        self.assertEqual(y[:2].tolist(), [esperado, esperado])
+        self.assertTrue(np.isnan(y[2]))
+        r = self.client.post("/previsao-total-crimes/batch", content=buf.getvalue(),
+                             headers={"Content-Type": "application/x-npy", "Accept": "application/json"})
+        self.assertEqual(r.json()["resultados"][0]["TotalCrimesPrevisto"], esperado)
+        self.assertIn("erro", r.json()["resultados"][2])
+
+        r = self.client.post("/previsao-total-crimes/batch", json=[EXEMPLO],
+                             headers={"Accept": "application/x-positional+json"})
+        self.assertEqual(r.json(), [esperado])
+
+    def test_compact_format_errors(self):
+        cabecalho = {"Content-Type": "application/x-positional+json"}
+        self.assertEqual(self.client.post("/previsao-total-crimes/", content=b"[1]", headers=cabecalho).status_code, 400)
+        linha = [EXEMPLO[c] for c in main.CAMPOS]
+        duas = json.dumps([linha, linha])
+        self.assertEqual(self.client.post("/previsao-total-crimes/", content=duas, headers=cabecalho).status_code, 400)
+        if formatos.pa is None:
+            r = self.client.post("/previsao-total-crimes/batch", content=b"x",
+                                 headers={"Content-Type": "application/vnd.apache.arrow.stream"})
+            self.assertEqual(r.status_code, 415)
+
+    def test_batch_matches_single_and_keeps_order(self):
+        outro = dict(EXEMPLO, municipio="Olinda", ideb=3.1)
+        invalido = dict(EXEMPLO, municipio="Atlantida")
+        r = self.client.post("/previsao-total-crimes/batch", json=[EXEMPLO, invalido, outro])
+        self.assertEqual(r.status_code, 200)
+        res = r.json()["resultados"]
+        self.assertEqual([x["indice"] for x in res], [0, 1, 2])
+        self.assertIn("erro", res[1])
+        for i, d in ((0, EXEMPLO), (2, outro)):
+            single = self.client.post("/previsao-total-crimes/", json=d).json()
+            self.assertEqual(res[i]["TotalCrimesPrevisto"], single["TotalCrimesPrevisto"])
+
+    def test_stream_ndjson(self):
+        linhas = [json.dumps(EXEMPLO), "", json.dumps(dict(EXEMPLO, municipio="Atlantida")), "{nao json"]
+        corpo = ("\n".join(linhas * 3)).encode()
+        with unittest.mock.patch.object(main, "STREAM_CHUNK_ROWS", 2):
+            r = self.client.post("/previsao-total-crimes/stream", content=corpo)
+        self.assertEqual(r.status_code, 200)
+        saida = [json.loads(x) for x in r.text.splitlines()]
+        self.assertEqual([x["linha"] for x in saida], [1, 3, 4, 5, 7, 8, 9, 11, 12])
+        self.assertIn("TotalCrimesPrevisto", saida[0])
+        self.assertIn("inválido", saida[1]["erro"])
+        self.assertIn("erro", saida[2])
+
+    def test_stream_rejects_oversized_line(self):
+        corpo = (json.dumps(EXEMPLO) + "\n" + "x" * 5000 + "\n" + json.dumps(EXEMPLO)).encode()
+        with unittest.mock.patch.object(main, "STREAM_MAX_LINE_BYTES", 1000):
+            partes = iter([corpo[i:i + 700] for i in range(0, len(corpo), 700)])
+            r = self.client.post("/previsao-total-crimes/stream", content=partes)
+        saida = [json.loads(x) for x in r.text.splitlines()]
+        self.assertEqual([x["linha"] for x in saida], [1, 2, 3])
+        self.assertIn("excede", saida[1]["erro"])
+        self.assertIn("TotalCrimesPrevisto", saida[2])
+
+
+class TestApiMicrobatch(unittest.TestCase):
+    """The POST endpoint with MICROBATCH_ENABLED=1."""
+
+    def test_post_matches_default_path(self):
+        esperado = prever_direto(EXEMPLO)
+        with unittest.mock.patch.object(main, "MICROBATCH_ENABLED", True):
+            with TestClient(main.app) as client:
+                main.cache_previsoes.clear()
+                r = client.post("/previsao-total-crimes/", json=EXEMPLO)
+                invalido = client.post("/previsao-total-crimes/", json=dict(EXEMPLO, municipio="Atlantida"))
+                stats = client.get("/").json()["microbatch"]
+        self.assertEqual(r.json(), esperado)
+        self.assertEqual(invalido.status_code, 400)
+        self.assertEqual(stats["rows"], 1)
+        self.assertIsNone(main.microbatcher)
+
+
+def prever_direto(dados):
+    with TestClient(main.app) as client:
+        main.cache_previsoes.clear()
+        return client.post("/previsao-total-crimes/", json=dados).json()
@@ -0,0 +1,103 @@
+"""Tests for `mlops_deploy.artefato`."""
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+import joblib
+import numpy as np
+
+from mlops_deploy import artefato
+from mlops_deploy.registry import ModelRegistry, _predict_sklearn, carregar_modelo, hash_arquivo
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "model.pkl")
+
+
+def treinar_outro(path):
+    from sklearn.tree import DecisionTreeRegressor
+
+    import pandas as pd
+
+    from mlops_deploy.features import COLUNAS
+
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(200, len(COLUNAS))), columns=list(COLUNAS))
+    modelo = DecisionTreeRegressor(max_depth=3, random_state=0).fit(X, X["IDEB"] * 2)
+    joblib.dump(modelo, path)
+    return modelo
+
+
+class TestArtefato(unittest.TestCase):
+    """Tests for the sklearn-free model artifact."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        filtro = warnings.catch_warnings()
+        filtro.__enter__()
+        self.addCleanup(filtro.__exit__, None, None, None)
+        warnings.simplefilter("ignore")
+        self.pkl = os.path.join(self.dir, "model.pkl")
+        shutil.copyfile(MODEL_PATH, self.pkl)
+        self.estimator = joblib.load(self.pkl)
+        artefato.exportar(self.estimator, self.pkl, hash_arquivo(self.pkl), _predict_sklearn(self.estimator))
+
+    def test_carrega_arvore_identica(self):
+        arvore, manifesto = artefato.carregar(self.pkl, hash_arquivo(self.pkl))
+        self.assertEqual(manifesto["node_count"], self.estimator.tree_.node_count)
+        X = arvore.amostra_paridade()[:-3]
+        np.testing.assert_array_equal(arvore.predict(X), _predict_sklearn(self.estimator)(X))
+
+    def test_modelo_usa_npz_e_cai_para_pkl_se_desatualizado(self):
+        self.assertEqual(carregar_modelo(self.pkl).formato, "npz")
+        _, manifesto_path = artefato.caminhos(self.pkl)
+        with open(manifesto_path) as f:
+            manifesto = json.load(f)
+        manifesto["source"]["sha256"] = "0" * 64
+        with open(manifesto_path, "w") as f:
+            json.dump(manifesto, f)
+        with self.assertRaises(artefato.ArtefatoInvalido):
+            artefato.carregar(self.pkl, hash_arquivo(self.pkl))
+        self.assertEqual(carregar_modelo(self.pkl).formato, "pkl")
+
+    def test_npz_corrompido_e_rejeitado(self):
+        npz, _ = artefato.caminhos(self.pkl)
+        with open(npz, "ab") as f:
+            f.write(b"x")
+        with self.assertRaises(artefato.ArtefatoInvalido):
+            artefato.carregar(self.pkl, hash_arquivo(self.pkl))
+
+    def test_sem_artefato(self):
+        os.remove(artefato.caminhos(self.pkl)[1])
+        with self.assertRaises(FileNotFoundError):
+            artefato.carregar(self.pkl, hash_arquivo(self.pkl))
+
+    def test_arrays_mapeados_somente_leitura(self):
+        arvore, _ = artefato.carregar(self.pkl, hash_arquivo(self.pkl))
+        self.assertTrue(arvore.mapeada)
+        self.assertFalse(arvore.threshold.flags.writeable)
+        copia, _ = artefato.carregar(self.pkl, hash_arquivo(self.pkl), mmap=False)
+        self.assertFalse(copia.mapeada)
+        np.testing.assert_array_equal(arvore.value, copia.value)
+        self.assertTrue(carregar_modelo(self.pkl).info()["memory_mapped"])
+
+    def test_recarga_remapeia_sem_invalidar_o_antigo(self):
+        registry = ModelRegistry(self.pkl)
+        registry.recarregar(forcar=True)
+        antigo = registry.atual
+        X = antigo.arvore.amostra_paridade()[:-3]
+        y_antigo = antigo.predict(X)
+
+        novo_estimator = treinar_outro(self.pkl)
+        artefato.exportar(novo_estimator, self.pkl, hash_arquivo(self.pkl), _predict_sklearn(novo_estimator))
+        self.assertTrue(registry.recarregar())
+        novo = registry.atual
+        self.assertEqual(novo.formato, "npz")
+        self.assertTrue(novo.arvore.mapeada)
+        np.testing.assert_array_equal(novo.predict(X), _predict_sklearn(novo_estimator)(X))
+        # O mapeamento antigo aponta para o inode substituído, que continua válido
+        np.testing.assert_array_equal(antigo.predict(X), y_antigo)
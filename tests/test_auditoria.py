@@ -0,0 +1,88 @@
+"""Tests for `mlops_deploy.auditoria`."""
+
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from mlops_deploy.auditoria import BLOQUEAR, COLUNAS_AUDITORIA, Auditoria, consultar
+from mlops_deploy.features import COLUNAS, IDX_MUNICIPIO
+from mlops_deploy.municipios import encoder
+
+
+def linha(municipio, ideb=0.5):
+    x = [0.1] * len(COLUNAS)
+    x[IDX_MUNICIPIO] = encoder.encode(municipio)
+    x[2] = ideb
+    return x
+
+
+class TestAuditoria(unittest.TestCase):
+    """Buffered writes to SQLite and reading them back."""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.dir.name, "auditoria.db")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_rows_and_batches_are_flushed_on_stop_and_queried(self):
+        aud = Auditoria(self.caminho, lote=10_000, intervalo=60)
+        aud.iniciar()
+        aud.registrar("post", "v1", linha("Recife"), 12.5)
+        X = np.array([linha("Olinda", 0.1), linha("Recife", 0.2), linha("Olinda", 0.3)])
+        aud.registrar_lote("batch", "v1", X, np.array([1.0, 2.0, 3.0]))
+        self.assertEqual(aud.stats()["written"], 0)  # nada em disco antes do flush
+        aud.parar()
+        self.assertEqual(aud.stats()["written"], 4)
+
+        todas = consultar(self.caminho)
+        self.assertEqual(len(todas), 4)
+        self.assertEqual(tuple(todas[0]), COLUNAS_AUDITORIA)
+        self.assertEqual((todas[0]["municipio"], todas[0]["total_crimes_previsto"]), ("recife", 12.5))
+
+        olinda = consultar(self.caminho, municipio="OLINDA")
+        self.assertEqual([r["ideb"] for r in olinda], [0.1, 0.3])
+        self.assertEqual(consultar(self.caminho, municipio="Atlantida"), [])
+        self.assertEqual(len(consultar(self.caminho, fim=todas[0]["ts"])), 0)
+        self.assertEqual(len(consultar(self.caminho, inicio=todas[0]["ts"], limite=2)), 2)
+
+    def test_flush_by_size_without_waiting_for_interval(self):
+        aud = Auditoria(self.caminho, lote=5, intervalo=60)
+        aud.iniciar()
+        try:
+            aud.registrar_lote("batch", "v1", np.array([linha("Recife")] * 5), np.zeros(5))
+            limite = time.monotonic() + 5
+            while aud.stats()["written"] < 5 and time.monotonic() < limite:
+                time.sleep(0.01)
+            self.assertEqual(aud.stats()["written"], 5)
+        finally:
+            aud.parar()
+
+    def test_full_buffer_drops_new_rows(self):
+        aud = Auditoria(self.caminho, capacidade=3, lote=100)  # sem thread: ninguém esvazia
+        self.assertTrue(aud.registrar("post", "v1", linha("Recife"), 1.0))
+        self.assertTrue(aud.registrar_lote("batch", "v1", np.array([linha("Recife")] * 2), np.zeros(2)))
+        self.assertFalse(aud.registrar("post", "v1", linha("Recife"), 1.0))
+        self.assertEqual((aud.stats()["pending"], aud.stats()["dropped"]), (3, 1))
+
+    def test_block_policy_waits_for_the_writer(self):
+        aud = Auditoria(self.caminho, capacidade=2, lote=100, intervalo=60, politica=BLOQUEAR, espera=5)
+        aud.registrar("post", "v1", linha("Recife"), 1.0)
+        aud.registrar("post", "v1", linha("Recife"), 2.0)
+        resultado = []
+        t = threading.Thread(target=lambda: resultado.append(aud.registrar("post", "v1", linha("Recife"), 3.0)))
+        t.start()
+        time.sleep(0.05)
+        self.assertEqual(resultado, [])  # esperando espaço
+        aud.iniciar()  # o escritor esvazia o buffer e libera o produtor
+        t.join(timeout=5)
+        aud.parar()
+        self.assertEqual(resultado, [True])
+        self.assertEqual(aud.stats()["dropped"], 0)
+        self.assertEqual([r["total_crimes_previsto"] for r in consultar(self.caminho)], [1.0, 2.0, 3.0])
@@ -0,0 +1,74 @@
+"""Tests for `mlops_deploy.batching`."""
+
+
+import asyncio
+import threading
+import unittest
+
+import numpy as np
+
+from mlops_deploy.batching import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Tests for the async micro-batching scheduler."""
+
+    def test_coalesces_and_routes_results(self):
+        chamadas = []
+
+        def soma(modelo, X):
+            chamadas.append(len(X))
+            return X.sum(axis=1)
+
+        async def cenario():
+            mb = MicroBatcher(soma, max_rows=8, max_wait_ms=20)
+            await mb.start()
+            try:
+                return await asyncio.gather(*(mb.submit(None, [i, 1.0]) for i in range(20))), mb.stats()
+            finally:
+                await mb.stop()
+
+        resultados, stats = asyncio.run(cenario())
+        self.assertEqual(resultados, [i + 1.0 for i in range(20)])
+        self.assertEqual(sum(chamadas), 20)
+        self.assertLessEqual(max(chamadas), 8)
+        self.assertLess(len(chamadas), 20)
+        self.assertEqual(stats["rows"], 20)
+
+    def test_predict_error_propagates(self):
+        def falha(modelo, X):
+            raise ValueError("boom")
+
+        async def cenario():
+            mb = MicroBatcher(falha, max_rows=4, max_wait_ms=1)
+            await mb.start()
+            try:
+                await mb.submit(None, [1.0])
+            finally:
+                await mb.stop()
+
+        with self.assertRaises(ValueError):
+            asyncio.run(cenario())
+
+    def test_submit_requires_start(self):
+        mb = MicroBatcher(lambda modelo, X: np.zeros(len(X)))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(mb.submit(None, [1.0]))
+
+    def test_each_row_scored_by_its_own_model(self):
+        threads = []
+
+        def predict(modelo, X):
+            threads.append((modelo, threading.current_thread() is threading.main_thread()))
+            return X[:, 0] * modelo
+
+        async def cenario():
+            mb = MicroBatcher(predict, max_rows=16, max_wait_ms=20, em_thread=lambda modelo: modelo == 3)
+            await mb.start()
+            try:
+                return await asyncio.gather(*(mb.submit(2 if i % 2 else 3, [float(i)]) for i in range(6)))
+            finally:
+                await mb.stop()
+
+        self.assertEqual(asyncio.run(cenario()), [0.0, 2.0, 6.0, 6.0, 12.0, 10.0])
+        self.assertEqual(dict(threads), {2: True, 3: False})
@@ -0,0 +1,50 @@
+"""Tests for `mlops_deploy.bench`."""
+
+
+import json
+import os
+import tempfile
+import unittest
+
+from fastapi import FastAPI
+
+from mlops_deploy import bench
+
+
+class TestBench(unittest.TestCase):
+    """Tests for the benchmark helpers."""
+
+    def test_percentis_em_ms(self):
+        p = bench.percentis([0.001] * 99 + [0.1])
+        self.assertEqual(p["p50"], 1.0)
+        self.assertGreater(p["p99"], 1.0)
+
+    def test_comparar_marca_regressao(self):
+        base = {"micro": {"a": {"median_us": 10.0}}, "load": {"x": {"p99": 5.0, "throughput_rps": 100.0}}}
+        atual = {"micro": {"a": {"median_us": 10.5}}, "load": {"x": {"p99": 4.0, "throughput_rps": 80.0}}}
+        linhas = {linha["metric"]: linha for linha in bench.comparar(base, atual, tolerancia=0.10)}
+        self.assertFalse(linhas["micro/a/median_us"]["regression"])
+        self.assertFalse(linhas["load/x/p99"]["regression"])
+        self.assertTrue(linhas["load/x/throughput_rps"]["regression"])
+
+    def test_ler_cenario_ignora_linhas_sem_path(self):
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps({"request_id": "x", "title": "sem path"}) + "\n")
+            f.write(json.dumps({"path": "/a", "json": {"v": 1}, "repeat": 2}) + "\n")
+            f.write(json.dumps({"path": "/b"}) + "\n")
+        cenario = bench.ler_cenario(path)
+        self.assertEqual([(r["method"], r["path"]) for r in cenario], [("POST", "/a"), ("POST", "/a"), ("GET", "/b")])
+
+    def test_carga_asgi_em_processo(self):
+        app = FastAPI()
+
+        @app.get("/ping")
+        def ping():
+            return {"ok": True}
+
+        r = bench.carga(app, [{"method": "GET", "path": "/ping"}] * 20, concorrencia=4)
+        self.assertEqual(r["requests"], 20)
+        self.assertEqual(r["status"], {"200": 20})
+        self.assertGreater(r["throughput_rps"], 0)
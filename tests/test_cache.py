@@ -0,0 +1,61 @@
+"""Tests for `mlops_deploy.cache`."""
+
+
+import threading
+import unittest
+
+from mlops_deploy.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests for the bounded prediction cache."""
+
+    def test_lru_eviction(self):
+        c = LRUCache(maxsize=2)
+        c.put("a", 1)
+        c.put("b", 2)
+        self.assertEqual(c.get("a"), 1)  # "b" passa a ser o menos recente
+        c.put("c", 3)
+        self.assertIsNone(c.get("b"))
+        self.assertEqual(c.get("a"), 1)
+        self.assertEqual(c.stats()["evictions"], 1)
+
+    def test_ttl(self):
+        clock = FakeClock()
+        c = LRUCache(maxsize=10, ttl=5, clock=clock)
+        c.put("a", 1)
+        clock.t = 4
+        self.assertEqual(c.get("a"), 1)
+        clock.t = 6
+        self.assertIsNone(c.get("a"))
+        self.assertEqual(c.stats()["expirations"], 1)
+
+    def test_disabled(self):
+        c = LRUCache(maxsize=0)
+        c.put("a", 1)
+        self.assertIsNone(c.get("a"))
+
+    def test_concurrent_access(self):
+        c = LRUCache(maxsize=50)
+
+        def trabalho(base):
+            for i in range(2000):
+                c.put((base, i % 100), i)
+                c.get((base, (i * 7) % 100))
+
+        threads = [threading.Thread(target=trabalho, args=(b,)) for b in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        st = c.stats()
+        self.assertLessEqual(st["size"], 50)
+        self.assertEqual(st["hits"] + st["misses"], 8 * 2000)
@@ -0,0 +1,86 @@
+"""Tests for `mlops_deploy.drift`."""
+
+
+import os
+import threading
+import unittest
+
+import numpy as np
+
+from mlops_deploy.drift import MonitorDrift, Referencia
+from mlops_deploy.features import CAMPOS
+from mlops_deploy.store import FeatureStore
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "data_set.csv")
+
+
+class TestMonitorDrift(unittest.TestCase):
+    """Streaming statistics and PSI/KS against the training data."""
+
+    @classmethod
+    def setUpClass(cls):
+        store = FeatureStore.from_csv(DATA_PATH)
+        cls.ref = Referencia.do_store(store)
+        cls.X = store.colunas.T.astype(np.float64)
+
+    def test_training_rows_show_no_drift(self):
+        monitor = MonitorDrift(self.ref)
+        for linha in self.X.tolist():
+            monitor.observar(linha)
+        status = monitor.status()
+        self.assertEqual(status["observed_rows"], len(self.X))
+        for f in status["features"].values():
+            self.assertEqual((f["psi"], f["ks"], f["level"]), (0.0, 0.0, "estavel"))
+            self.assertAlmostEqual(f["mean"], f["ref_mean"], places=5)
+            self.assertAlmostEqual(f["std"], f["ref_std"], places=5)
+
+    def test_batches_match_row_by_row(self):
+        linha_a_linha, em_lotes = MonitorDrift(self.ref), MonitorDrift(self.ref)
+        Y = self.X[::3] * 1.5 + 0.2
+        for linha in Y.tolist():
+            linha_a_linha.observar(linha)
+        em_lotes.observar_lote(Y[:50])
+        em_lotes.observar_lote(Y[50:])
+        a, b = linha_a_linha.status(), em_lotes.status()
+        for campo in a["features"]:
+            for chave, v in a["features"][campo].items():
+                if isinstance(v, float):
+                    self.assertAlmostEqual(v, b["features"][campo][chave], places=6, msg=(campo, chave))
+                else:
+                    self.assertEqual(v, b["features"][campo][chave])
+
+    def test_out_of_range_feature_is_flagged(self):
+        monitor = MonitorDrift(self.ref)
+        Y = self.X.copy()
+        j = CAMPOS.index("ensino_fundamental_matriculas")
+        Y[:, j] = 1000.0
+        monitor.observar_lote(Y)
+        f = monitor.status()["features"]
+        self.assertEqual(f["ensino_fundamental_matriculas"]["level"], "alto")
+        self.assertEqual(f["ensino_fundamental_matriculas"]["above_max"], 1.0)
+        self.assertGreater(f["ensino_fundamental_matriculas"]["ks"], 0.8)
+        self.assertEqual(f["ideb"]["level"], "estavel")
+
+    def test_per_thread_accumulators_are_merged(self):
+        monitor = MonitorDrift(self.ref)
+        partes = np.array_split(self.X, 4)
+
+        def observar(parte):
+            for linha in parte.tolist():
+                monitor.observar(linha)
+
+        threads = [threading.Thread(target=observar, args=(p,)) for p in partes]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        status = monitor.status()
+        self.assertEqual(status["observed_rows"], len(self.X))
+        self.assertEqual(monitor.linhas, len(self.X))
+        self.assertTrue(all(f["psi"] == 0.0 for f in status["features"].values()))
+
+    def test_level_waits_for_min_rows(self):
+        monitor = MonitorDrift(self.ref, min_linhas=10)
+        monitor.observar_lote(self.X[:5])
+        self.assertIsNone(monitor.status()["features"]["ideb"]["level"])
@@ -0,0 +1,55 @@
+"""Tests for `mlops_deploy.explicacao`."""
+
+
+import os
+import unittest
+
+import numpy as np
+
+from mlops_deploy.artefato import carregar
+from mlops_deploy.explicacao import Explicador
+from mlops_deploy.features import CAMPOS
+from mlops_deploy.registry import hash_arquivo
+from mlops_deploy.store import FeatureStore
+from mlops_deploy.tree import TREE_LEAF
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "data_set.csv")
+
+
+class TestExplicador(unittest.TestCase):
+    """Decision paths and per-feature contributions."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tree, _ = carregar(MODEL_PATH, hash_arquivo(MODEL_PATH))
+        cls.X = FeatureStore.from_csv(DATA_PATH).matriz()
+
+    def test_contributions_add_up_to_prediction(self):
+        exp = Explicador(self.tree)
+        folhas, y, contrib = exp.explicar(self.X)
+        np.testing.assert_array_equal(folhas, self.tree.apply(self.X))
+        np.testing.assert_allclose(exp.base + contrib.sum(axis=1), y, atol=1e-12)
+        np.testing.assert_array_equal(y, self.tree.predict(self.X))
+
+    def test_cache_holds_one_entry_per_leaf(self):
+        exp = Explicador(self.tree)
+        folhas, _, _ = exp.explicar(self.X)
+        self.assertEqual(len(exp), len(np.unique(folhas)))
+        exp.explicar(self.X)
+        self.assertEqual(len(exp), len(np.unique(folhas)))
+        self.assertLessEqual(len(exp), int((self.tree.children_left == TREE_LEAF).sum()))
+
+    def test_single_row_matches_batch_and_path_is_consistent(self):
+        exp = Explicador(self.tree)
+        _, _, contrib = exp.explicar(self.X[:20])
+        for linha, c in zip(self.X[:20].tolist(), contrib):
+            folha, campos, passos = exp.explicar_um(linha)
+            self.assertEqual(folha, self.tree.apply_one(linha))
+            self.assertEqual(campos, {k: round(v, 6) for k, v in zip(CAMPOS, c.tolist()) if v != 0})
+            self.assertEqual(passos[0]["no"], 0)
+            self.assertEqual(passos[-1]["depois"], self.tree.value[folha])
+            for passo in passos:
+                vai_esq = np.float32(passo["valor"]) <= passo["threshold"]
+                self.assertEqual(passo["lado"], "<=" if vai_esq else ">")
@@ -0,0 +1,92 @@
+"""Tests for `mlops_deploy.formatos`."""
+
+
+import io
+import json
+import unittest
+
+import numpy as np
+
+from mlops_deploy import formatos
+from mlops_deploy.features import COLUNAS, IDX_MUNICIPIO
+from mlops_deploy.municipios import encoder
+
+LINHA = [0.45, "Recife", 1.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+def npy(X):
+    buf = io.BytesIO()
+    np.save(buf, X)
+    return buf.getvalue()
+
+
+class TestFormatos(unittest.TestCase):
+    """Decoding and encoding of the compact request/response formats."""
+
+    def test_tipo_midia_and_accept(self):
+        self.assertEqual(formatos.tipo_midia("Application/X-NPY; charset=binary"), formatos.NPY)
+        self.assertEqual(formatos.formato_resposta(None, formatos.NPY), formatos.NPY)
+        self.assertEqual(formatos.formato_resposta("*/*", formatos.JSON), formatos.JSON)
+        self.assertEqual(formatos.formato_resposta("application/x-npy;q=0, application/json", formatos.NPY), formatos.JSON)
+        self.assertEqual(formatos.formato_resposta("text/html, application/x-positional+json", formatos.JSON),
+                         formatos.POSICIONAL)
+
+    def test_posicional_single_and_many(self):
+        X, unica = formatos.ler_posicional(json.dumps(LINHA).encode(), encoder)
+        self.assertTrue(unica)
+        self.assertEqual(X.shape, (1, len(COLUNAS)))
+        self.assertEqual(X[0, IDX_MUNICIPIO], encoder.encode("recife"))
+        self.assertEqual(X[0, 2], 1.0)
+
+        codigo = encoder.encode("olinda")
+        outra = LINHA[:IDX_MUNICIPIO] + [codigo] + LINHA[IDX_MUNICIPIO + 1:]
+        invalida = LINHA[:IDX_MUNICIPIO] + ["Atlântida"] + LINHA[IDX_MUNICIPIO + 1:]
+        X, unica = formatos.ler_posicional(json.dumps([LINHA, outra, invalida]).encode(), encoder)
+        self.assertFalse(unica)
+        self.assertEqual(X[:, IDX_MUNICIPIO].tolist(), [encoder.encode("recife"), codigo, -1])
+
+    def test_posicional_rejects_bad_rows(self):
+        for corpo in (b"{}", b"[]", b"[1, 2]", json.dumps([LINHA[:5]]).encode(),
+                      json.dumps(LINHA[:2] + ["x"] + LINHA[3:]).encode(),
+                      json.dumps(LINHA[:2] + [None] + LINHA[3:]).encode(), b"[1e999]"):
+            with self.assertRaises(formatos.FormatoInvalido):
+                formatos.ler_posicional(corpo, encoder)
+
+    def test_npy_is_zero_copy_view(self):
+        X = np.random.default_rng(0).random((5, len(COLUNAS)))
+        X[:, IDX_MUNICIPIO] = [0, 1, 2, 3, len(encoder)]
+        lido, unica = formatos.ler_npy(npy(X), encoder)
+        self.assertFalse(unica)
+        self.assertEqual(lido[:, IDX_MUNICIPIO].tolist(), [0, 1, 2, 3, -1])
+        sem_erro = X[:4]
+        lido, _ = formatos.ler_npy(npy(sem_erro), encoder)
+        self.assertFalse(lido.flags.owndata)
+        np.testing.assert_array_equal(lido, sem_erro)
+
+    def test_npy_other_dtypes_and_errors(self):
+        X = np.zeros(len(COLUNAS), dtype=np.float32)
+        lido, unica = formatos.ler_npy(npy(X), encoder)
+        self.assertTrue(unica)
+        self.assertEqual(lido.dtype, np.float64)
+        for corpo in (b"nao e npy", npy(np.zeros((2, 3))), npy(np.zeros((2, len(COLUNAS))))[:-8],
+                      npy(np.full((1, len(COLUNAS)), np.inf))):
+            with self.assertRaises(formatos.FormatoInvalido):
+                formatos.ler_npy(corpo, encoder)
+
+    def test_serializar(self):
+        y = np.array([1.234, np.nan])
+        self.assertEqual(json.loads(formatos.serializar(y, formatos.POSICIONAL)), [1.23, None])
+        lido = np.load(io.BytesIO(formatos.serializar(y, formatos.NPY)))
+        np.testing.assert_array_equal(lido, [1.23, np.nan])
+
+    @unittest.skipUnless(formatos.pa is not None, "pyarrow não instalado")
+    def test_arrow_roundtrip(self):
+        pa = formatos.pa
+        tabela = pa.table({c: [v] for c, v in zip(formatos.CAMPOS, LINHA)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        X, _ = formatos.ler_arrow(bytes(sink.getvalue()), encoder)
+        self.assertEqual(X[0, IDX_MUNICIPIO], encoder.encode("recife"))
+        saida = pa.ipc.open_stream(formatos.serializar(np.array([2.0]), formatos.ARROW)).read_all()
+        self.assertEqual(saida.column("TotalCrimesPrevisto").to_pylist(), [2.0])
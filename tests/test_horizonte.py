@@ -0,0 +1,58 @@
+"""Tests for `mlops_deploy.horizonte`."""
+
+
+import os
+import unittest
+
+import numpy as np
+
+from mlops_deploy.features import CAMPOS, IDX_MUNICIPIO
+from mlops_deploy.horizonte import TAXAS, ULTIMO, Tendencias
+from mlops_deploy.store import IDX_ANO, FeatureStore
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "processed", "data_set.csv")
+
+
+class TestTendencias(unittest.TestCase):
+    """Per-municipio trends and the projected feature tensor."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.store = FeatureStore.from_csv(DATA_PATH)
+        cls.tend = Tendencias(cls.store)
+        cls.codigo = int(cls.store.codigos[0])
+        F = cls.store.colunas.T.astype(np.float64)
+        cls.historico = F[cls.store.codigos == cls.codigo]
+
+    def test_slope_matches_polyfit(self):
+        j = CAMPOS.index("ideb")
+        t = self.historico[:, IDX_ANO]
+        esperado = np.polyfit(t, self.historico[:, j], 1)[0]
+        self.assertAlmostEqual(self.tend.inclinacao[self.codigo, j], esperado, places=6)
+        self.assertEqual(self.tend.inclinacao[self.codigo, IDX_ANO], 0.0)
+
+    def test_last_value_repeats_last_year(self):
+        t, X = self.tend.tensor([self.codigo], 3, ULTIMO)
+        ultimo = self.historico[np.argmax(self.historico[:, IDX_ANO])]
+        self.assertEqual(X.shape, (3, len(CAMPOS)))
+        outras = [j for j in range(len(CAMPOS)) if j != IDX_ANO]
+        np.testing.assert_allclose(X[:, outras], np.tile(ultimo[outras], (3, 1)))
+        np.testing.assert_allclose(np.diff(t[0]), self.tend.passo)
+        self.assertAlmostEqual(t[0, 0], ultimo[IDX_ANO] + self.tend.passo)
+
+    def test_tensor_is_municipio_major(self):
+        codigos = np.unique(self.store.codigos)[:4]
+        t, X = self.tend.tensor(codigos, 5)
+        self.assertEqual((t.shape, X.shape), ((4, 5), (20, len(CAMPOS))))
+        np.testing.assert_array_equal(X[:, IDX_MUNICIPIO], np.repeat(codigos, 5))
+        np.testing.assert_allclose(X[:, IDX_ANO], t.ravel())
+
+    def test_rates_are_per_year(self):
+        j = CAMPOS.index("ideb")
+        _, base = self.tend.tensor([self.codigo], 2, ULTIMO)
+        _, X = self.tend.tensor([self.codigo], 2, TAXAS, {"ideb": 0.25})
+        np.testing.assert_allclose(X[:, j] - base[:, j], [0.25, 0.5])
+        outras = [k for k in range(len(CAMPOS)) if k != j]
+        np.testing.assert_allclose(X[:, outras], base[:, outras])
+        with self.assertRaises(ValueError):
+            self.tend.tensor([self.codigo], 2, "exponencial")
@@ -0,0 +1,36 @@
+"""Tests for `mlops_deploy.metrics`."""
+
+
+import unittest
+
+from mlops_deploy.metrics import Metricas
+
+
+class TestMetricas(unittest.TestCase):
+    """Tests for histograms, counters and the Prometheus text export."""
+
+    def test_histograma_cumulativo(self):
+        m = Metricas(buckets=(0.001, 0.01))
+        for v in (0.0005, 0.001, 0.005, 1.0):
+            m.observar("lat", v, stage="x")
+        texto = m.exportar()
+        self.assertIn('lat_bucket{stage="x",le="0.001"} 2', texto)
+        self.assertIn('lat_bucket{stage="x",le="0.01"} 3', texto)
+        self.assertIn('lat_bucket{stage="x",le="+Inf"} 4', texto)
+        self.assertIn('lat_count{stage="x"} 4', texto)
+        self.assertIn("# TYPE lat histogram", texto)
+
+    def test_span_e_contador(self):
+        m = Metricas()
+        with m.span("lat", stage="predict"):
+            pass
+        m.incrementar("req", endpoint="/a", status=200)
+        m.incrementar("req", endpoint="/a", status=200)
+        self.assertEqual(m.histograma("lat", stage="predict").total, 1)
+        self.assertEqual(m.valor("req", status=200, endpoint="/a"), 2)
+        self.assertIn('req{endpoint="/a",status="200"} 2', m.exportar())
+
+    def test_escapa_labels(self):
+        m = Metricas()
+        m.incrementar("req", endpoint='a"b')
+        self.assertIn('req{endpoint="a\\"b"} 1', m.exportar())
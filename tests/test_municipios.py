@@ -0,0 +1,29 @@
+"""Tests for `mlops_deploy.municipios`."""
+
+
+import unittest
+
+from mlops_deploy.municipios import MUNICIPIOS, MunicipioInvalido, encoder, normalizar
+
+
+class TestMunicipioEncoder(unittest.TestCase):
+    """Tests for the municipality label encoder."""
+
+    def test_codes_follow_training_order(self):
+        for i, nome in enumerate(MUNICIPIOS):
+            self.assertEqual(encoder.encode(nome), i)
+            self.assertEqual(encoder.decode(i), nome)
+
+    def test_normalization(self):
+        self.assertEqual(normalizar("  Santa  Cruz do\tCapibaribe "), "santa cruz do capibaribe")
+        self.assertEqual(encoder.encode("Afogados da Ingazeira"), encoder.encode("AFÓGADOS  DA INGAZEIRA"))
+        self.assertEqual(encoder.canonico("Iatí"), "iati")
+
+    def test_invalid(self):
+        with self.assertRaises(MunicipioInvalido):
+            encoder.encode("Atlantida")
+        self.assertNotIn("Atlantida", encoder)
+
+    def test_encode_many(self):
+        codigos = encoder.encode_many(["Recife", "Atlantida", "olinda", None])
+        self.assertEqual(codigos.tolist(), [encoder.encode("recife"), -1, encoder.encode("olinda"), -1])
@@ -0,0 +1,58 @@
+"""Tests for `mlops_deploy.ranking`."""
+
+
+import os
+import unittest
+
+import numpy as np
+
+from mlops_deploy.ranking import MatrizPrevisoes
+from mlops_deploy.store import FeatureStore
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "processed", "data_set.csv")
+
+
+class ModeloFalso:
+    """Previsão = IDEB + código do município / 1000 (determinística, com poucos empates)."""
+
+    versao = "falso"
+
+    def predict(self, X):
+        X = np.asarray(X)
+        return X[:, 2] + X[:, 1] / 1000.0
+
+
+class TestMatrizPrevisoes(unittest.TestCase):
+    """Tests for the precomputed matrix and top-k ranking."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.store = FeatureStore.from_csv(DATA_PATH)
+        cls.matriz = MatrizPrevisoes(cls.store, ModeloFalso())
+
+    def esperado(self, ano, municipios=None):
+        pares = []
+        for codigo in np.unique(self.store.codigos).tolist():
+            linha = self.store.linha(codigo, ano)
+            if linha is not None and (municipios is None or codigo in municipios):
+                pares.append((codigo, float(ModeloFalso().predict([linha])[0])))
+        return pares
+
+    def test_desc_e_asc_conferem_com_ordenacao_completa(self):
+        ano = self.store.anos[1]
+        pares = self.esperado(ano)
+        desc = sorted(pares, key=lambda p: (-p[1], p[0]))[:10]
+        asc = sorted(pares, key=lambda p: (p[1], p[0]))[:7]
+        self.assertEqual(self.matriz.ranking(ano, 10, "desc"), desc)
+        self.assertEqual(self.matriz.ranking(ano, 7, "asc"), asc)
+
+    def test_subconjunto_e_k_maior_que_n(self):
+        ano = self.store.anos[0]
+        subset = np.unique(self.store.codigos)[:5].tolist()
+        topo = self.matriz.ranking(ano, 50, "desc", subset)
+        self.assertEqual(topo, sorted(self.esperado(ano, subset), key=lambda p: (-p[1], p[0])))
+
+    def test_ano_ausente(self):
+        with self.assertRaises(KeyError):
+            self.matriz.ranking(99.0, 5)
+        self.assertEqual(self.matriz.info()["cells"], len(self.store))
@@ -0,0 +1,93 @@
+"""Tests for `mlops_deploy.registry`."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeRegressor
+
+from mlops_deploy.features import COLUNAS
+from mlops_deploy.registry import ModelRegistry, hash_arquivo
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "model.pkl")
+
+
+def treinar_outro(path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, len(COLUNAS))), columns=list(COLUNAS))
+    modelo = DecisionTreeRegressor(max_depth=4, random_state=0).fit(X, X["IDEB"] * 3)
+    joblib.dump(modelo, path)
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Tests for versioned loading and atomic swap."""
+
+    def setUp(self):
+        avisos = warnings.catch_warnings()
+        avisos.__enter__()
+        self.addCleanup(avisos.__exit__, None, None, None)
+        warnings.simplefilter("ignore")
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "model.pkl")
+        shutil.copyfile(MODEL_PATH, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_reload_swaps_only_when_artifact_changes(self):
+        reg = ModelRegistry(self.path)
+        trocas = []
+        reg.ao_trocar(trocas.append)
+        self.assertTrue(reg.recarregar())
+        antigo = reg.atual
+        self.assertTrue(antigo.info()["compiled"])
+        self.assertFalse(reg.recarregar())
+
+        treinar_outro(self.path)
+        os.utime(self.path, (antigo.mtime + 10, antigo.mtime + 10))
+        self.assertTrue(reg.recarregar())
+        self.assertNotEqual(reg.atual.sha256, antigo.sha256)
+        self.assertEqual([m.versao for m in trocas], [antigo.versao, reg.atual.versao])
+        # Quem segurou a referência antiga continua prevendo com ela
+        self.assertEqual(antigo.predict(np.zeros((1, 12))).shape, (1,))
+
+    def test_broken_artifact_keeps_previous_model(self):
+        reg = ModelRegistry(self.path)
+        reg.recarregar()
+        antigo = reg.atual
+        with open(self.path, "wb") as f:
+            f.write(b"nao e um pickle")
+        self.assertFalse(reg.recarregar(forcar=True))
+        self.assertIs(reg.atual, antigo)
+        self.assertIsNotNone(reg.info()["last_error"])
+        # O watcher não tenta de novo o mesmo artefato quebrado nem apaga o erro
+        self.assertFalse(reg.recarregar())
+        self.assertEqual(reg.falhas, 1)
+        self.assertIsNotNone(reg.info()["last_error"])
+
+    def test_source_uri_local_directory(self):
+        origem = os.path.join(self.tmp, "bucket")
+        os.makedirs(origem)
+        treinar_outro(os.path.join(origem, "model.pkl"))
+        destino = os.path.join(self.tmp, "cache", "model.pkl")
+        reg = ModelRegistry(self.path, source_uri="file://" + origem, download_path=destino)
+        self.assertTrue(reg.recarregar(forcar=True, baixar=True))
+        self.assertEqual(reg.atual.path, destino)
+        self.assertEqual(reg.atual.sha256, hash_arquivo(os.path.join(origem, "model.pkl")))
+
+    def test_failed_download_falls_back_to_local_artifact(self):
+        destino = os.path.join(self.tmp, "cache", "model.pkl")
+        reg = ModelRegistry(self.path, source_uri=os.path.join(self.tmp, "nao-existe"), download_path=destino)
+        self.assertTrue(reg.recarregar(forcar=True, baixar=True))
+        self.assertEqual(reg.atual.path, self.path)
+        info = reg.info()
+        self.assertIsNone(info["last_error"])
+        self.assertIsNotNone(info["download_error"])
+        self.assertFalse(reg.recarregar(baixar=True))
+        self.assertEqual(reg.falhas, 0)
@@ -0,0 +1,74 @@
+"""Tests for `mlops_deploy.scoring` and the `score` command."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+from typer.testing import CliRunner
+
+from mlops_deploy.cli import app
+from mlops_deploy.features import CAMPOS, COLUNAS
+from mlops_deploy.registry import carregar_modelo
+from mlops_deploy.scoring import COLUNA_ERRO, COLUNA_PREVISAO, pontuar_arquivo
+
+RAIZ = os.path.dirname(os.path.dirname(__file__))
+MODEL_PATH = os.path.join(RAIZ, "models", "model.pkl")
+DATA_PATH = os.path.join(RAIZ, "data", "processed", "data_set.csv")
+
+
+class TestScoring(unittest.TestCase):
+    """Tests for offline chunked scoring."""
+
+    @classmethod
+    def setUpClass(cls):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cls.modelo = carregar_modelo(MODEL_PATH)
+        cls.df = pd.read_csv(DATA_PATH)
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def esperado(self):
+        from mlops_deploy.municipios import encoder
+
+        X = self.df[list(COLUNAS)].copy()
+        X["Municipio"] = encoder.encode_many(X["Municipio"].tolist())
+        return np.round(self.modelo.predict(X.to_numpy(dtype=np.float64)), 2)
+
+    def test_csv_em_blocos_preserva_ordem(self):
+        saida = os.path.join(self.dir, "out.csv")
+        n = pontuar_arquivo(DATA_PATH, saida, MODEL_PATH, chunk_size=50, workers=1)
+        self.assertEqual(n, len(self.df))
+        out = pd.read_csv(saida, keep_default_na=False)
+        np.testing.assert_allclose(out[COLUNA_PREVISAO].to_numpy(dtype=float), self.esperado())
+        self.assertTrue((out[COLUNA_ERRO] == "").all())
+
+    def test_ndjson_campos_dados_em_processos(self):
+        entrada = os.path.join(self.dir, "in.ndjson")
+        df = self.df[list(COLUNAS)].set_axis(list(CAMPOS), axis=1)
+        df.loc[3, "municipio"] = "Atlantida"
+        df.to_json(entrada, orient="records", lines=True, force_ascii=False)
+        saida = os.path.join(self.dir, "out.ndjson")
+        n = pontuar_arquivo(entrada, saida, MODEL_PATH, chunk_size=100, workers=2)
+        self.assertEqual(n, len(df))
+        out = pd.read_json(saida, lines=True)
+        esperado = self.esperado()
+        self.assertEqual(out.loc[3, COLUNA_ERRO], "municipio invalido")
+        self.assertTrue(np.isnan(out.loc[3, COLUNA_PREVISAO]))
+        ok = np.arange(len(df)) != 3
+        np.testing.assert_allclose(out[COLUNA_PREVISAO].to_numpy()[ok], esperado[ok])
+
+    def test_cli_score(self):
+        saida = os.path.join(self.dir, "out.csv")
+        resultado = CliRunner().invoke(
+            app, ["score", DATA_PATH, saida, "--model-path", MODEL_PATH, "--workers", "1", "--chunk-size", "200"]
+        )
+        self.assertEqual(resultado.exit_code, 0, resultado.output)
+        self.assertEqual(len(pd.read_csv(saida)), len(self.df))
@@ -0,0 +1,73 @@
+"""Tests for `mlops_deploy.singleflight`."""
+
+
+import asyncio
+import unittest
+
+from mlops_deploy.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests for coalescing identical in-flight calls."""
+
+    def test_identical_calls_share_one_computation(self):
+        chamadas = []
+
+        async def calcular(chave):
+            chamadas.append(chave)
+            await asyncio.sleep(0.01)
+            return chave * 2
+
+        async def cenario():
+            sf = SingleFlight()
+            chaves = [1] * 5 + [2] * 3
+            resultados = await asyncio.gather(*(sf.executar(c, lambda c=c: calcular(c)) for c in chaves))
+            return sf, resultados
+
+        sf, resultados = asyncio.run(cenario())
+        self.assertEqual(resultados, [2] * 5 + [4] * 3)
+        self.assertEqual(sorted(chamadas), [1, 2])
+        self.assertEqual(sf.stats(), {"leaders": 2, "followers": 6, "in_flight": 0, "coalescing_ratio": 0.75})
+
+    def test_no_caching_after_completion(self):
+        chamadas = []
+
+        async def calcular():
+            chamadas.append(1)
+            return "ok"
+
+        async def cenario():
+            sf = SingleFlight()
+            await sf.executar("k", calcular)
+            await sf.executar("k", calcular)
+
+        asyncio.run(cenario())
+        self.assertEqual(len(chamadas), 2)
+
+    def test_exception_reaches_every_waiter(self):
+        async def falha():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        async def cenario():
+            sf = SingleFlight()
+            return await asyncio.gather(*(sf.executar("k", falha) for _ in range(3)), return_exceptions=True)
+
+        resultados = asyncio.run(cenario())
+        self.assertTrue(all(isinstance(r, ValueError) for r in resultados))
+
+    def test_leader_cancellation_does_not_cancel_followers(self):
+        async def calcular():
+            await asyncio.sleep(0.02)
+            return 42
+
+        async def cenario():
+            sf = SingleFlight()
+            lider = asyncio.ensure_future(sf.executar("k", calcular))
+            await asyncio.sleep(0)
+            seguidora = asyncio.ensure_future(sf.executar("k", calcular))
+            await asyncio.sleep(0)
+            lider.cancel()
+            return await seguidora, lider.cancelled()
+
+        self.assertEqual(asyncio.run(cenario()), (42, True))
@@ -0,0 +1,57 @@
+"""Tests for `mlops_deploy.sombra`."""
+
+
+import unittest
+
+import numpy as np
+
+from mlops_deploy.sombra import CANDIDATO, PRINCIPAL, Sombra
+
+
+class Modelo:
+    """Soma uma constante à primeira coluna e conta as chamadas de predict."""
+
+    def __init__(self, deslocamento):
+        self.deslocamento = deslocamento
+        self.chamadas = []
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        self.chamadas.append(len(X))
+        return X[:, 0] + self.deslocamento
+
+
+class TestSombra(unittest.TestCase):
+    """Shadow scoring and the candidate-vs-primary comparison."""
+
+    def test_deltas_are_candidate_minus_primary_whoever_served(self):
+        principal, candidato = Modelo(0.0), Modelo(0.5)
+        sombra = Sombra()
+        X = np.array([[1.0], [2.0], [3.0]])
+        sombra.processar([
+            ("batch", PRINCIPAL, candidato, X, principal.predict(X)),
+            ("post", CANDIDATO, principal, [4.0], 4.5),
+        ])
+        st = sombra.stats()
+        self.assertEqual(st["rows"], 4)
+        self.assertEqual((st["mean_delta"], st["max_abs_delta"], st["disagreement_rate"]), (0.5, 0.5, 1.0))
+        self.assertEqual(st["rows_by_endpoint"], {"batch": 3, "post": 1})
+
+    def test_single_rows_share_one_predict(self):
+        candidato = Modelo(0.0)
+        sombra = Sombra()
+        sombra.processar([("post", PRINCIPAL, candidato, [float(i)], float(i)) for i in range(10)])
+        self.assertEqual(candidato.chamadas, [10])
+        self.assertEqual(sombra.stats()["disagreement_rate"], 0.0)
+
+    def test_full_queue_drops_and_stop_drains(self):
+        candidato = Modelo(0.01)
+        sombra = Sombra(capacidade=2)
+        for i in range(3):
+            sombra.enviar("post", PRINCIPAL, candidato, [float(i)], float(i))
+        self.assertEqual(sombra.stats()["dropped"], 1)
+        sombra.iniciar()
+        sombra.parar()
+        st = sombra.stats()
+        self.assertEqual((st["rows"], st["pending"], st["failures"]), (2, 0, 0))
+        self.assertAlmostEqual(st["mean_abs_delta"], 0.01)
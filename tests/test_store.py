@@ -0,0 +1,47 @@
+"""Tests for `mlops_deploy.store`."""
+
+
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from mlops_deploy.features import COLUNAS
+from mlops_deploy.municipios import encoder
+from mlops_deploy.store import FeatureStore
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "processed", "data_set.csv")
+
+
+class TestFeatureStore(unittest.TestCase):
+    """Tests for the columnar (municipio, ano) index."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.store = FeatureStore.from_csv(DATA_PATH)
+        cls.df = pd.read_csv(DATA_PATH)
+
+    def test_todas_as_linhas_indexadas(self):
+        self.assertEqual(len(self.store), len(self.df))
+        self.assertEqual(len(self.store.anos), self.df["Ano"].nunique())
+        self.assertEqual(self.store.colunas.dtype, np.float32)
+
+    def test_linha_confere_com_csv(self):
+        registro = self.df.iloc[123]
+        codigo = encoder.encode(registro["Municipio"])
+        linha = self.store.linha(codigo, registro["Ano"])
+        esperado = [codigo if c == "Municipio" else registro[c] for c in COLUNAS]
+        np.testing.assert_allclose(linha, np.asarray(esperado, dtype=np.float32), rtol=0, atol=0)
+
+    def test_ano_arredondado_e_ausente(self):
+        registro = self.df.iloc[0]
+        codigo = encoder.encode(registro["Municipio"])
+        self.assertIsNotNone(self.store.linha(codigo, round(registro["Ano"], 5)))
+        self.assertIsNone(self.store.linha(codigo, 42.0))
+
+    def test_matriz_float64_na_ordem(self):
+        X = self.store.matriz([0, 1])
+        self.assertEqual(X.shape, (2, len(COLUNAS)))
+        self.assertEqual(X.dtype, np.float64)
+        np.testing.assert_array_equal(X[1], self.store.colunas[:, 1])
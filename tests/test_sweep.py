@@ -0,0 +1,55 @@
+"""Tests for `mlops_deploy.sweep`."""
+
+
+import os
+import unittest
+
+import numpy as np
+
+from mlops_deploy import sweep
+from mlops_deploy.artefato import carregar
+from mlops_deploy.registry import hash_arquivo
+from mlops_deploy.store import FeatureStore
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "models", "model.pkl")
+DATA_PATH = os.path.join(BASE_DIR, "data", "processed", "data_set.csv")
+
+
+class TestSweep(unittest.TestCase):
+    """Grid construction and tree breakpoints."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tree, _ = carregar(MODEL_PATH, hash_arquivo(MODEL_PATH))
+        cls.store = FeatureStore.from_csv(DATA_PATH)
+
+    def test_grade_is_cartesian_product(self):
+        base = [float(i) for i in range(12)]
+        X = sweep.grade(base, [(2, np.array([0.0, 1.0])), (5, np.array([7.0, 8.0, 9.0]))])
+        self.assertEqual(X.shape, (6, 12))
+        np.testing.assert_array_equal(X[:, 2], [0, 0, 0, 1, 1, 1])
+        np.testing.assert_array_equal(X[:, 5], [7, 8, 9, 7, 8, 9])
+        np.testing.assert_array_equal(X[:, 0], 0.0)
+
+    def test_degraus_match_dense_sampling(self):
+        for i in range(0, len(self.store), 53):
+            base = self.store.colunas[:, i].astype(np.float64).tolist()
+            for coluna in (0, 2, 11):
+                degraus = sweep.degraus(self.tree, base, coluna, -3.0, 3.0)
+                x = np.linspace(-3.0, 3.0, 4001)
+                y = self.tree.predict(sweep.grade(base, [(coluna, x)]))
+                mudancas = np.flatnonzero(np.diff(y) != 0)
+                for k in mudancas:
+                    self.assertTrue(any(x[k] <= t <= x[k + 1] for t, _, _ in degraus))
+                for t, antes, depois in degraus:
+                    self.assertNotEqual(antes, depois)
+                    lados = self.tree.predict(sweep.grade(base, [(coluna, np.array([t - 1e-6, t + 1e-6]))]))
+                    self.assertEqual(lados.tolist(), [antes, depois])
+
+    def test_cortes_restricted_to_range(self):
+        base = self.store.colunas[:, 0].astype(np.float64).tolist()
+        todos = sweep.cortes(self.tree, base, [0, 2], 2, -np.inf, np.inf)
+        dentro = sweep.cortes(self.tree, base, [0, 2], 2, 0.0, 1.0)
+        self.assertEqual(dentro, [t for t in todos if 0.0 <= t <= 1.0])
+        self.assertEqual(todos, sorted(set(todos)))
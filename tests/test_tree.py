@@ -0,0 +1,66 @@
+"""Tests for `mlops_deploy.tree`."""
+
+
+import os
+import unittest
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from mlops_deploy.tree import CompiledTree, checar_paridade
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "model.pkl")
+
+
+class TestCompiledTree(unittest.TestCase):
+    """Parity between the compiled tree and the sklearn estimator."""
+
+    @classmethod
+    def setUpClass(cls):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cls.model = joblib.load(MODEL_PATH)
+        cls.tree = CompiledTree.from_sklearn(cls.model)
+
+    def predict_sklearn(self, X):
+        return self.model.predict(pd.DataFrame(X, columns=self.model.feature_names_in_))
+
+    def test_parity_on_threshold_probe(self):
+        X = self.tree.amostra_paridade(n=512, seed=1)
+        self.assertTrue(checar_paridade(self.tree, self.predict_sklearn, X))
+
+    def test_predict_one_matches_matrix(self):
+        X = self.tree.amostra_paridade(n=16)[:16]
+        np.testing.assert_array_equal(self.tree.predict(X), [self.tree.predict_one(x) for x in X])
+        np.testing.assert_array_equal(self.tree.apply(X), [self.tree.apply_one(x) for x in X])
+
+    def test_predict_one_without_lists(self):
+        t = self.tree
+        sem_listas = CompiledTree(
+            t.children_left, t.children_right, t.feature, t.threshold, t.value,
+            n_features=t.n_features, missing_go_to_left=t.missing_go_to_left, listas=False,
+        )
+        X = t.amostra_paridade(n=32)[:32]
+        self.assertEqual([sem_listas.predict_one(x) for x in X], [t.predict_one(x) for x in X])
+        self.assertEqual(sem_listas.max_depth, t.max_depth)
+
+    def test_nan_follows_missing_go_to_left(self):
+        X = np.zeros((self.model.n_features_in_, self.model.n_features_in_))
+        np.fill_diagonal(X, np.nan)
+        np.testing.assert_array_equal(self.tree.predict(X), self.predict_sklearn(X))
+        np.testing.assert_array_equal([self.tree.predict_one(x) for x in X], self.predict_sklearn(X))
+
+    def test_rejects_infinite(self):
+        x = np.zeros(self.model.n_features_in_)
+        for v in (np.inf, -np.inf, 1e300):
+            x[3] = v
+            with self.assertRaises(ValueError):
+                self.tree.predict(x)
+            with self.assertRaises(ValueError):
+                self.tree.predict_one(x)
+
+    def test_rejects_non_tree(self):
+        with self.assertRaises(TypeError):
+            CompiledTree.from_sklearn(object())
@@ -0,0 +1,80 @@
+"""Tests for `mlops_deploy.treino` and the `train` command."""
+
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from typer.testing import CliRunner
+
+from mlops_deploy import treino
+from mlops_deploy.cli import app
+from mlops_deploy.features import COLUNAS
+from mlops_deploy.registry import carregar_modelo
+
+RAIZ = os.path.dirname(os.path.dirname(__file__))
+DATA_PATH = os.path.join(RAIZ, "data", "processed", "data_set.csv")
+
+GRADE = {"max_depth": [3, 5], "min_samples_split": [2], "min_samples_leaf": [1, 4]}
+
+
+class TestTreino(unittest.TestCase):
+    """Tests for the cached grid search and the training job."""
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.pasta)
+
+    def test_carregar_dados_uses_serving_columns(self):
+        X, y = treino.carregar_dados(DATA_PATH)
+        self.assertEqual(X.shape, (434, len(COLUNAS)))
+        self.assertEqual(len(y), 434)
+        self.assertTrue(np.all(X[:, 1] == np.round(X[:, 1])))
+
+    def test_combinacoes_follow_parameter_grid_order(self):
+        from sklearn.model_selection import ParameterGrid
+
+        self.assertEqual(treino.combinacoes(treino.GRADE_PADRAO), list(ParameterGrid(treino.GRADE_PADRAO)))
+
+    def test_busca_matches_gridsearchcv_and_reuses_cache(self):
+        from sklearn.model_selection import GridSearchCV
+        from sklearn.tree import DecisionTreeRegressor
+
+        X, y = treino.carregar_dados(DATA_PATH)
+        cache = os.path.join(self.pasta, "cache")
+        busca = treino.busca_em_grade(X, y, GRADE, cv=3, cache_dir=cache)
+        self.assertEqual((busca.ajustes_novos, busca.ajustes_cache), (12, 0))
+
+        gs = GridSearchCV(DecisionTreeRegressor(random_state=treino.SEMENTE), GRADE, cv=3,
+                          scoring="neg_mean_squared_error").fit(X, y)
+        self.assertEqual(busca.melhores, gs.best_params_)
+        np.testing.assert_allclose([r["mse_medio"] for r in busca.resultados],
+                                   -gs.cv_results_["mean_test_score"])
+
+        maior = {**GRADE, "min_samples_leaf": [1, 4, 8]}
+        de_novo = treino.busca_em_grade(X, y, maior, cv=3, cache_dir=cache)
+        self.assertEqual((de_novo.ajustes_novos, de_novo.ajustes_cache), (6, 12))
+
+    def test_train_command_writes_model_and_manifest(self):
+        model_path = os.path.join(self.pasta, "model.pkl")
+        r = CliRunner().invoke(app, [
+            "train", "--data", DATA_PATH, "--model-path", model_path,
+            "--max-depth", "3,none", "--min-samples-split", "2", "--min-samples-leaf", "2",
+            "--cv", "3", "--workers", "1", "--cache-dir", os.path.join(self.pasta, "cache"),
+        ])
+        self.assertEqual(r.exit_code, 0, r.output)
+        with open(os.path.join(self.pasta, "model.json"), encoding="utf-8") as f:
+            manifesto = json.load(f)
+        self.assertEqual(manifesto["features"], list(COLUNAS))
+        relatorio = manifesto["training"]
+        self.assertEqual(relatorio["fits"], {"new": 6, "cached": 0})
+        self.assertIn(relatorio["best_params"]["max_depth"], (3, None))
+        self.assertGreater(relatorio["metrics"]["test"]["r2"], 0)
+
+        modelo = carregar_modelo(model_path)
+        self.assertEqual(modelo.formato, "npz")
@@ -0,0 +1,36 @@
+"""Tests for `mlops_deploy.ui`."""
+
+
+import gzip
+import unittest
+
+from mlops_deploy import ui
+
+
+class TestUi(unittest.TestCase):
+    """Tests for the precompiled page and its HTTP helpers."""
+
+    def test_render_preenche_campos_na_ordem(self):
+        pagina = ui.Pagina(["recife", "olinda"]).render({"ano": 2024.0, "ideb": 5.2}, ui.DICA)
+        self.assertIn('name="ano" value="2024.0"', pagina)
+        self.assertIn('name="ideb" value="5.2"', pagina)
+        self.assertIn('name="ensino_medio_matriculas" value=""', pagina)
+        self.assertIn("<option value='Olinda'>", pagina)
+        self.assertLess(pagina.index('name="ano"'), pagina.index('name="municipio"'))
+
+    def test_variante_gzip_e_etag_estavel(self):
+        a, b = ui.Variante.de_html("<p>oi</p>"), ui.Variante.de_html("<p>oi</p>")
+        self.assertEqual(a.etag, b.etag)
+        self.assertEqual(a.gzip, b.gzip)
+        self.assertEqual(gzip.decompress(a.gzip), b"<p>oi</p>")
+        self.assertEqual(a.codificada("deflate, gzip;q=0.5")[1], "gzip")
+        self.assertEqual(a.codificada("gzip;q=0")[1], None)
+        self.assertEqual(a.codificada(None), (a.corpo, None))
+
+    def test_etag_confere(self):
+        etag = '"abc"'
+        self.assertTrue(ui.etag_confere('"x", "abc"', etag))
+        self.assertTrue(ui.etag_confere('W/"abc"', etag))
+        self.assertTrue(ui.etag_confere("*", etag))
+        self.assertFalse(ui.etag_confere('"abd"', etag))
+        self.assertFalse(ui.etag_confere(None, etag))